@@ -0,0 +1,155 @@
+"""In-process stand-ins for Google STT, TTS and Firestore with latency and error injection.
+
+They block their calling thread like the real gRPC clients, so executor
+sizing and backpressure behave as in production.
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List
+
+from core import config
+from core.time_utils import get_time_bucket
+from services.storage import StorageBackend
+
+
+class FakeBackendError(Exception):
+    pass
+
+
+class FaultInjector:
+    """Sleeps for latency_ms +/- jitter_ms, then fails with probability error_rate"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def __call__(self, operation: str) -> None:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay:
+            time.sleep(delay / 1000)
+        if fail:
+            raise FakeBackendError(f"injected {operation} failure")
+
+
+class _Alternative:
+    def __init__(self, transcript: str):
+        self.transcript = transcript
+
+
+class _Result:
+    def __init__(self, transcript: str):
+        self.alternatives = [_Alternative(transcript)]
+
+
+class _RecognizeResponse:
+    def __init__(self, transcript: str):
+        self.results = [_Result(transcript)]
+
+
+class FakeSpeechClient:
+    def __init__(self, injector: FaultInjector, transcript: str = "hello how are you today"):
+        self.injector = injector
+        self.transcript = transcript
+
+    def recognize(self, config, audio):
+        self.injector("recognize")
+        return _RecognizeResponse(self.transcript)
+
+
+class _SynthesizeResponse:
+    def __init__(self, audio_content: bytes):
+        self.audio_content = audio_content
+
+
+class FakeTTSClient:
+    """Returns the checked-in hello.mp3 for every request"""
+
+    def __init__(self, injector: FaultInjector):
+        self.injector = injector
+        with open(os.path.join(config.STATIC_DIR, "hello.mp3"), "rb") as f:
+            self.audio = f.read()
+
+    def synthesize_speech(self, input, voice, audio_config):
+        self.injector("synthesize_speech")
+        return _SynthesizeResponse(self.audio)
+
+
+async def fake_verify_id_token(id_token: str, access_token=None, jwks=None) -> Dict:
+    """Stands in for services.google_oauth.verify_google_id_token: the token is the user id"""
+    return {"sub": id_token}
+
+
+class FakeStorage(StorageBackend):
+    """In-memory emoji click storage with Firestore-like latency"""
+
+    name = "fake"
+
+    def __init__(self, injector: FaultInjector):
+        self.injector = injector
+        self._lock = threading.Lock()
+        self.clicks: List[Dict] = []
+        self.counters: Dict[tuple, Counter] = defaultdict(Counter)
+        self.progress: Dict[str, Dict[str, Dict]] = {}
+
+    def save_emoji_clicks(self, events: Iterable) -> None:
+        self.injector("save_emoji_clicks")
+        with self._lock:
+            for event in events:
+                self.clicks.append({"user_id": event.user_id, "emoji": event.emoji, "timestamp": event.timestamp.isoformat()})
+                self.counters[(event.user_id, get_time_bucket(event.timestamp))][event.emoji] += 1
+
+    def get_user_emoji_clicks(self, user_id: str) -> List[Dict]:
+        self.injector("get_user_emoji_clicks")
+        with self._lock:
+            return [click for click in self.clicks if click["user_id"] == user_id]
+
+    def get_emoji_counts(self, user_id: str, bucket: str) -> Dict[str, int]:
+        self.injector("get_emoji_counts")
+        with self._lock:
+            return dict(self.counters.get((user_id, bucket), {}))
+
+    def stream_all_emoji_clicks(self) -> Iterator[Dict]:
+        with self._lock:
+            return iter(list(self.clicks))
+
+    def set_emoji_counts(self, user_id: str, bucket: str, counts: Dict[str, int]) -> None:
+        self.injector("set_emoji_counts")
+        with self._lock:
+            self.counters[(user_id, bucket)] = Counter(counts)
+
+    def get_population_counts(self) -> Dict[str, Dict[str, int]]:
+        self.injector("get_population_counts")
+        population: Dict[str, Counter] = defaultdict(Counter)
+        with self._lock:
+            for (_, bucket), counts in self.counters.items():
+                population[bucket].update(counts)
+        return {bucket: dict(counts) for bucket, counts in population.items()}
+
+    def set_population_counts(self, bucket: str, counts: Dict[str, int]) -> None:
+        pass
+
+    def update_progress(self, user_id, record, scopes, fold):
+        self.injector("update_progress")
+        with self._lock:
+            user_stats = self.progress.setdefault(user_id, {})
+            updated = {scope: fold(user_stats.get(scope)) for scope in scopes}
+            user_stats.update(updated)
+            return updated
+
+    def get_progress_stats(self, user_id):
+        self.injector("get_progress_stats")
+        with self._lock:
+            return dict(self.progress.get(user_id, {}))
@@ -0,0 +1,272 @@
+"""Offline load test of the main endpoints against fake Google backends.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --requests 300 --concurrency 32 \\
+        --stt-latency 400 --tts-latency 150 --firestore-latency 25 --error-rate 0.01 \\
+        --output results.json [--compare previous.json]
+
+The real app (main.py, middleware and lifespan included) is served
+in-process over httpx's ASGI transport. Speech, TTS and storage are
+replaced by the fakes in benchmarks/fakes.py, which sleep for the
+configured latency (+/- jitter) and fail at the given rate. Each endpoint
+is driven on its own at a fixed concurrency, using the checked-in
+recording*.wav files as audio payloads. The STT and TTS caches are
+bypassed unless --with-caches is given, so every request reaches the fake
+backends. The run prints p50/p95/p99 latency and requests per second per
+endpoint. With --output it also writes them to JSON, and --compare diffs
+the run against an earlier JSON file.
+"""
+import argparse
+import asyncio
+import base64
+import glob
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+# No background channel warmup: the fakes are installed before startup
+os.environ.setdefault("WARMUP_CLIENTS", "")
+
+import httpx
+
+from benchmarks.fakes import FakeSpeechClient, FakeStorage, FakeTTSClient, FaultInjector, fake_verify_id_token
+from benchmarks.storage_latency import percentile
+from core import admission, clients, config
+from services.storage import set_storage
+from services.stt_cache import TranscriptCache
+from services.tts_cache import TTSCache
+
+PRACTICE_WORDS = ["hello", "world", "coffee", "computer", "language", "practice"]
+EMOJIS = ["😀", "🍎", "🚗", "🏠", "💧", "😢", "🎵", "📚"]
+USERS = 50
+
+
+class NullTTSCache(TTSCache):
+    """Never hits and never writes, so every request synthesizes"""
+
+    def get(self, key, encoding="MP3"):
+        self.misses += 1
+        return None
+
+    def contains(self, key, encoding="MP3"):
+        return False
+
+    def put(self, key, audio, encoding="MP3"):
+        return self.path_for(key, encoding)
+
+
+def load_recordings():
+    recordings = []
+    for path in sorted(glob.glob(os.path.join(config.BASE_DIR, "recording*.wav"))):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data:
+            recordings.append(data)
+    if not recordings:
+        raise SystemExit("No non-empty recording*.wav files found")
+    return recordings
+
+
+def make_endpoints(recordings):
+    encoded = [base64.b64encode(r).decode("ascii") for r in recordings]
+    now = datetime.now(timezone.utc).isoformat()
+
+    def emoji_click(i):
+        event = {"user_id": f"user{i % USERS}", "emoji": EMOJIS[i % len(EMOJIS)], "timestamp": now}
+        return "POST", "/emoji/click", {"json": event}
+
+    def recommend(i):
+        return "GET", "/recommend", {"params": {"user_id": f"user{i % USERS}"}}
+
+    # The paid endpoints are rate limited per signed-in user (core/admission.py);
+    # install_fakes accepts the user id itself as the ID token
+    def user_header(i):
+        return {"Authorization": f"Bearer user{i % USERS}"}
+
+    def speech_analyze(i):
+        body = {"audio_base64": encoded[i % len(encoded)], "target_text": "Hello, how are you today?"}
+        return "POST", "/speech/analyze", {"json": body, "headers": user_header(i)}
+
+    def word_check(i):
+        files = {"audio": ("recording.wav", recordings[i % len(recordings)], "audio/wav")}
+        data = {"word": PRACTICE_WORDS[i % len(PRACTICE_WORDS)]}
+        return "POST", "/practice/word-check", {"data": data, "files": files, "headers": user_header(i)}
+
+    def tts(i):
+        return "POST", "/tts", {"json": {"text": f"Practice sentence number {i}"}, "headers": user_header(i)}
+
+    return {
+        "emoji_click": emoji_click,
+        "recommend": recommend,
+        "speech_analyze": speech_analyze,
+        "word_check": word_check,
+        "tts": tts,
+    }
+
+
+def install_fakes(args, workdir):
+    injectors = {
+        "stt": FaultInjector(args.stt_latency, args.jitter * args.stt_latency, args.error_rate, seed=1),
+        "tts": FaultInjector(args.tts_latency, args.jitter * args.tts_latency, args.error_rate, seed=2),
+        "firestore": FaultInjector(args.firestore_latency, args.jitter * args.firestore_latency, args.error_rate, seed=3),
+    }
+    clients.set_client("speech", FakeSpeechClient(injectors["stt"]))
+    clients.set_client("tts", FakeTTSClient(injectors["tts"]))
+    set_storage(FakeStorage(injectors["firestore"]))
+    admission.verify_google_id_token = fake_verify_id_token
+
+    # Keep cache files out of static/ and, by default, make every request miss
+    from routes import speech, tts
+    from services import speech_to_text, text_to_speech
+
+    cache_class = TTSCache if args.with_caches else NullTTSCache
+    tts_cache = cache_class(workdir, config.TTS_CACHE_MAX_DISK_BYTES, config.TTS_CACHE_MAX_MEMORY_BYTES, config.TTS_CACHE_MAX_MEMORY_ENTRIES)
+    stt_cache = TranscriptCache(
+        max_entries=config.STT_CACHE_MAX_ENTRIES if args.with_caches else 0,
+        max_bytes=config.STT_CACHE_MAX_BYTES,
+        ttl=config.STT_CACHE_TTL,
+    )
+    tts.tts_cache = text_to_speech.tts_cache = tts_cache
+    speech.stt_cache = speech_to_text.stt_cache = stt_cache
+    return injectors
+
+
+async def drive(client, build, total, concurrency):
+    latencies = []
+    statuses = Counter()
+    indexes = itertools.count()
+
+    async def worker():
+        for i in indexes:
+            if i >= total:
+                return
+            method, url, kwargs = build(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "max_ms": round(max(latencies), 2),
+        "errors": errors,
+        "status_counts": dict(statuses),
+    }
+
+
+async def run(args, endpoints):
+    import main
+
+    app = main.app
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+            for name in args.endpoints:
+                # A short warmup so first-call costs (executor start, lexicon load) don't skew p99
+                await drive(client, endpoints[name], min(args.concurrency, args.requests), args.concurrency)
+                results[name] = await drive(client, endpoints[name], args.requests, args.concurrency)
+                print_row(name, results[name])
+    return results
+
+
+def print_row(name, row):
+    print(
+        f"{name:<15} {row['requests']:>6} {row['rps']:>9.1f} {row['p50_ms']:>9.1f} "
+        f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['errors']:>7}"
+    )
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=config.BASE_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(previous_path, results):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)["endpoints"]
+    print(f"\nvs {previous_path}")
+    print(f"{'endpoint':<15} {'rps':>10} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for name, row in results.items():
+        old = previous.get(name)
+        if old is None:
+            continue
+
+        def change(field):
+            return f"{(row[field] - old[field]) / old[field] * 100:+.1f}%" if old[field] else "n/a"
+
+        print(f"{name:<15} {change('rps'):>10} {change('p50_ms'):>10} {change('p95_ms'):>10} {change('p99_ms'):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", nargs="+", default=["emoji_click", "recommend", "speech_analyze", "word_check", "tts"])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--stt-latency", type=float, default=300.0, help="Fake STT latency in ms")
+    parser.add_argument("--tts-latency", type=float, default=150.0, help="Fake TTS latency in ms")
+    parser.add_argument("--firestore-latency", type=float, default=20.0, help="Fake Firestore latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency jitter as a fraction of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability each fake backend call fails")
+    parser.add_argument("--with-caches", action="store_true", help="Leave the STT/TTS caches on")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    endpoints = make_endpoints(load_recordings())
+    unknown = set(args.endpoints) - set(endpoints)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        injectors = install_fakes(args, workdir)
+        print(f"{'endpoint':<15} {'n':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        results = asyncio.run(run(args, endpoints))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "args": vars(args),
+        },
+        "endpoints": results,
+        "backend_calls": {name: {"calls": inj.calls, "injected_errors": inj.errors} for name, inj in injectors.items()},
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Compare JSON serialization time and wire size for the main response shapes.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization --repeat 200
+
+For each shape (exercise catalog page, /speech/analyze result, score-batch
+response, progress summary) prints the render time with Starlette's
+JSONResponse, FastJSONResponse (orjson) and, for response_model routes,
+pydantic's model_dump_json, followed by raw/gzip/brotli body sizes.
+"""
+import argparse
+import gzip
+import statistics
+import time
+
+from fastapi.responses import JSONResponse
+
+from benchmarks.storage_latency import percentile
+from core import config
+from core.compression import brotli, compress
+from core.responses import FastJSONResponse, orjson
+from logic.progress_stats import add_score, summarize
+from schemas.practice import ScoreBatchResponse, ScoredPair
+from services.exercise_catalog import get_catalog
+from utils.speech_analysis import analyze_transcription, compare_words_batch
+
+WORDS = ["apple", "banana", "butterfly", "elephant", "umbrella", "hospital", "computer", "yesterday"]
+
+
+def exercise_page(limit):
+    catalog = get_catalog()
+    items, _ = catalog.page(catalog.query(), None, limit)
+    return items
+
+
+def analyze_result(words):
+    target = " ".join(WORDS[i % len(WORDS)] for i in range(words))
+    spoken = " ".join(WORDS[(i * 3) % len(WORDS)] if i % 4 == 0 else WORDS[i % len(WORDS)] for i in range(words))
+    return analyze_transcription(target, spoken)
+
+
+def score_batch(pairs):
+    pairs = [(WORDS[i % len(WORDS)], WORDS[(i + i // 3) % len(WORDS)]) for i in range(pairs)]
+    return ScoreBatchResponse(results=[
+        ScoredPair(
+            expected=expected,
+            spoken=spoken,
+            feedback=feedback["message"],
+            syllable_feedback=feedback["syllable_feedback"],
+            score=feedback["score"],
+            status=feedback["status"],
+        )
+        for (expected, spoken), feedback in zip(pairs, compare_words_batch(pairs))
+    ])
+
+
+def progress_summary(exercises):
+    progress = {"user_id": "benchmark", "overall": None, "sessions": summarize(None), "exercises": {}}
+    overall = None
+    for e in range(exercises):
+        stats = None
+        for attempt in range(config.PROGRESS_WINDOW):
+            score = 40 + (e * 7 + attempt * 3) % 60
+            stats = add_score(stats, score, f"2026-01-01T00:{attempt:02d}:00+00:00")
+            overall = add_score(overall, score, f"2026-01-01T00:{attempt:02d}:00+00:00")
+        progress["exercises"][f"ex{e}"] = summarize(stats)
+    progress["overall"] = summarize(overall)
+    return progress
+
+
+def measure(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return body, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=config.EXERCISES_MAX_PAGE_SIZE)
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--pairs", type=int, default=500)
+    parser.add_argument("--exercises", type=int, default=50)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed: FastJSONResponse falls back to the stdlib encoder")
+    shapes = [
+        ("exercises page", exercise_page(args.page_size)),
+        ("analyze", analyze_result(args.words)),
+        ("score-batch", score_batch(args.pairs)),
+        ("progress", progress_summary(args.exercises)),
+    ]
+
+    print(f"{'shape':<16} {'encoder':<12} {'p50 us':>9} {'p95 us':>9} {'mean us':>9} {'raw B':>8} {'gzip B':>8} {'br B':>8}")
+    for name, payload in shapes:
+        if isinstance(payload, ScoreBatchResponse):
+            # response_model routes: include the model -> dict step the response class would need
+            encoders = [
+                ("pydantic", lambda: payload.model_dump_json().encode("utf-8")),
+                ("stdlib", lambda: JSONResponse(payload.model_dump(mode="json")).body),
+                ("orjson", lambda: FastJSONResponse(payload.model_dump(mode="json")).body),
+            ]
+        else:
+            encoders = [
+                ("stdlib", lambda: JSONResponse(payload).body),
+                ("orjson", lambda: FastJSONResponse(payload).body),
+            ]
+
+        for encoder, fn in encoders:
+            body, samples = measure(fn, args.repeat)
+            gzip_size = len(gzip.compress(body, compresslevel=config.GZIP_LEVEL))
+            br_size = len(compress(body, "br", brotli_quality=config.BROTLI_QUALITY)) if brotli is not None else "-"
+            print(
+                f"{name:<16} {encoder:<12} {percentile(samples, 50):>9.1f} {percentile(samples, 95):>9.1f} "
+                f"{statistics.mean(samples):>9.1f} {len(body):>8} {gzip_size:>8} {br_size:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
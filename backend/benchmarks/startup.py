@@ -0,0 +1,82 @@
+"""Measure cold-start cost: importing main.py, running startup, and the first requests.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --runs 10 [--warmup speech,tts]
+
+Each run is a fresh interpreter, like a newly autoscaled instance. It
+reports the time to import the app, to run the lifespan startup, and the
+latency of the first request to each endpoint. With --warmup, the
+first requests are sent after the background client warmup has finished,
+which shows how much latency warming saves (it needs real credentials).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+warmup, requests = json.loads(sys.argv[1])
+
+from fastapi.testclient import TestClient
+
+timings = {"import": (imported - started) * 1000}
+with TestClient(main.app) as client:
+    timings["startup"] = (time.perf_counter() - imported) * 1000
+    if warmup:
+        from core import clients
+        # Built or given up on
+        while not set(warmup) <= set(clients._clients) | set(clients._failed_at) and time.perf_counter() - imported < 30:
+            time.sleep(0.05)
+    for name, method, path, body in requests:
+        t = time.perf_counter()
+        client.request(method, path, json=body)
+        timings[name] = (time.perf_counter() - t) * 1000
+print(json.dumps(timings))
+"""
+
+FIRST_REQUESTS = [
+    ("health", "GET", "/health", None),
+    ("exercises", "GET", "/speech/exercises", None),
+    ("tts", "POST", "/tts", {"text": "hello"}),
+    ("analyze", "POST", "/speech/analyze", {"audio_base64": "", "target_text": "hello"}),
+]
+
+
+def run_once(warmup):
+    env = dict(os.environ, WARMUP_CLIENTS=",".join(warmup))
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps([warmup, FIRST_REQUESTS])],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", default="", help="Comma-separated clients to warm up before the first requests")
+    args = parser.parse_args()
+
+    warmup = [name for name in args.warmup.split(",") if name]
+    runs = [run_once(warmup) for _ in range(args.runs)]
+
+    print(f"{'stage':<12} {'median ms':>10} {'min ms':>9} {'max ms':>9}")
+    for stage in runs[0]:
+        samples = [run[stage] for run in runs]
+        print(f"{stage:<12} {statistics.median(samples):>10.1f} {min(samples):>9.1f} {max(samples):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare emoji click storage latency across engines.
+
+Run from the backend directory:
+
+    python -m benchmarks.storage_latency --engines sqlite firestore --clicks 2000
+
+Writes single clicks and batches, then reads counters and full histories,
+and prints p50/p95/p99 per operation and engine. The sqlite engine uses a
+throwaway database file; firestore needs real credentials and writes to
+the configured project under a random benchmark user id.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from core.time_utils import get_time_bucket
+from schemas.emoji_click import EmojiClickEvent
+
+EMOJIS = ["😀", "🍎", "🚗", "🏠", "💧", "😢", "🎵", "📚", "🛏️", "🚽"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def timed(samples, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    samples.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+def make_storage(engine, workdir):
+    if engine == "sqlite":
+        from services.sqlite_store import SQLiteStorage
+        return SQLiteStorage(os.path.join(workdir, "bench.db"))
+    from services.storage import create_storage
+    return create_storage(engine)
+
+
+def run(engine, clicks, batch_size, workdir):
+    storage = make_storage(engine, workdir)
+    user_id = f"bench-{uuid.uuid4().hex[:8]}"
+    start = datetime(2025, 1, 1, 8, 0)
+    events = [
+        EmojiClickEvent(user_id=user_id, emoji=EMOJIS[i % len(EMOJIS)], timestamp=start + timedelta(seconds=i))
+        for i in range(clicks)
+    ]
+
+    results = {"save_one": [], "save_batch": [], "counts": [], "history": []}
+    half = clicks // 2
+    for event in events[:half]:
+        timed(results["save_one"], storage.save_emoji_click, event)
+    for i in range(half, clicks, batch_size):
+        timed(results["save_batch"], storage.save_emoji_clicks, events[i:i + batch_size])
+    bucket = get_time_bucket(start)
+    for _ in range(200):
+        timed(results["counts"], storage.get_emoji_counts, user_id, bucket)
+    for _ in range(20):
+        timed(results["history"], storage.get_user_emoji_clicks, user_id)
+    storage.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engines", nargs="+", default=["sqlite"], choices=["sqlite", "firestore"])
+    parser.add_argument("--clicks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{'engine':<10} {'operation':<12} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+        for engine in args.engines:
+            for operation, samples in run(engine, args.clicks, args.batch_size, workdir).items():
+                print(
+                    f"{engine:<10} {operation:<12} {len(samples):>6} {percentile(samples, 50):>9.3f} "
+                    f"{percentile(samples, 95):>9.3f} {percentile(samples, 99):>9.3f} {statistics.mean(samples):>9.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
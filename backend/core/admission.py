@@ -0,0 +1,226 @@
+"""Admission control for the endpoints that call paid, slow Google backends.
+
+Two layers, both answering 429 with a Retry-After header when they refuse:
+
+- `rate_limit` is a route dependency giving every user a token bucket, so
+  one client hammering /speech/analyze can't use up everyone's share.
+- `admit(backend)` wraps the backend call itself. As many calls as the
+  backend's executor has workers run at once, a bounded number wait in
+  FIFO order for at most the backend's queue timeout, and the rest are
+  turned away immediately instead of piling up in the executor's
+  unbounded queue. That keeps latency for admitted requests flat under
+  overload.
+
+Callers presenting a Google ID token (`Authorization: Bearer <id_token>`,
+see services/google_oauth.py) get a bucket per verified account. Everyone
+else shares one bucket per client address, with a larger allowance for
+households and classrooms behind one NAT. Nothing the client merely claims
+(such as an X-User-Id header) picks the bucket, so it can't be rotated to
+get fresh tokens or to push real users' buckets out of the LRU.
+
+Buckets and queues live in this process: with several uvicorn workers each
+one enforces its own limits, so the effective per-user rate and backend
+concurrency are multiplied by the worker count.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from core import config, metrics
+from core.executor import BACKEND_LIMITS
+from services.google_oauth import InvalidIDToken, verify_google_id_token
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_REJECTIONS = metrics.counter(
+    "neurospeak_admission_rejections_total", "Requests refused with 429 by admission control", ("scope", "reason")
+)
+ADMISSION_QUEUE_DEPTH = metrics.gauge(
+    "neurospeak_admission_queue_depth", "Requests waiting for a backend slot", ("backend",)
+)
+ADMISSION_WAIT_SECONDS = metrics.histogram(
+    "neurospeak_admission_wait_seconds", "Time admitted requests waited for a backend slot", ("backend",)
+)
+
+
+class AdmissionRejected(HTTPException):
+    def __init__(self, scope: str, reason: str, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        ADMISSION_REJECTIONS.labels(scope, reason).inc()
+        super().__init__(
+            status_code=429,
+            detail=f"Too many requests ({scope}: {reason}), retry in {self.retry_after}s",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 if granted, otherwise seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class UserRateLimiter:
+    """Token buckets per user; the least recently seen users are forgotten past `max_users`"""
+
+    def __init__(self, rate: float, burst: int, max_users: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_users = max_users
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, user: str) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        bucket = self._buckets.get(user)
+        if bucket is None:
+            bucket = self._buckets[user] = TokenBucket(self.rate, self.burst, now)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user)
+        wait = bucket.take(now)
+        if wait > 0:
+            raise AdmissionRejected("user", "rate_limited", wait)
+
+
+class BackendQueue:
+    """At most `max_concurrency` holders, `max_queue` FIFO waiters, `timeout` seconds of waiting"""
+
+    def __init__(self, backend: str, max_concurrency: int, max_queue: int, timeout: float):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Smoothed time a slot is held, for the Retry-After estimate
+        self._hold_seconds = 1.0
+
+    def retry_after(self) -> float:
+        return self._hold_seconds * (len(self._waiters) + 1) / max(1, self.max_concurrency)
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected(self.backend, "queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.labels(self.backend).set(len(self._waiters))
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejected(self.backend, "queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            # Client went away just as the slot was handed to us
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            ADMISSION_QUEUE_DEPTH.labels(self.backend).set(len(self._waiters))
+        ADMISSION_WAIT_SECONDS.labels(self.backend).observe(time.perf_counter() - started)
+
+    def release(self) -> None:
+        # Hand the slot straight to the oldest live waiter, so in_flight is unchanged
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * (time.perf_counter() - started)
+            self.release()
+
+
+QUEUE_LIMITS: Dict[str, tuple] = {
+    "stt": (config.STT_MAX_QUEUE, config.STT_QUEUE_TIMEOUT),
+    "tts": (config.TTS_MAX_QUEUE, config.TTS_QUEUE_TIMEOUT),
+    # A stream holds its slot for minutes, so there's no point waiting for one
+    "stt_stream": (0, 0.0),
+}
+
+user_limiter = UserRateLimiter(config.ADMISSION_USER_RATE, config.ADMISSION_USER_BURST, config.ADMISSION_MAX_TRACKED_USERS)
+address_limiter = UserRateLimiter(
+    config.ADMISSION_ADDRESS_RATE, config.ADMISSION_ADDRESS_BURST, config.ADMISSION_MAX_TRACKED_USERS
+)
+_queues: Dict[str, BackendQueue] = {}
+
+
+def get_queue(backend: str) -> BackendQueue:
+    queue = _queues.get(backend)
+    if queue is None:
+        max_queue, timeout = QUEUE_LIMITS[backend]
+        queue = _queues[backend] = BackendQueue(backend, BACKEND_LIMITS.get(backend, 8), max_queue, timeout)
+    return queue
+
+
+def configure_queue(backend: str, max_queue: int, timeout: float) -> None:
+    """Change a backend's queue limits; the queue is rebuilt on next use"""
+    QUEUE_LIMITS[backend] = (max_queue, timeout)
+    _queues.pop(backend, None)
+
+
+def reset() -> None:
+    """Forget all buckets and queues (tests)"""
+    user_limiter._buckets.clear()
+    address_limiter._buckets.clear()
+    _queues.clear()
+
+
+def admit(backend: str):
+    """`async with admit("stt"):` around a paid backend call"""
+    return get_queue(backend).slot()
+
+
+async def client_identity(request: Request) -> str:
+    """Rate-limit key: user:<sub> for a verified Google ID token, otherwise ip:<client address>"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            claims = await verify_google_id_token(token.strip())
+            return f"user:{claims['sub']}"
+        except InvalidIDToken as e:
+            logger.info(f"Rate limiting by address, ID token rejected: {str(e)}")
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def rate_limit(request: Request) -> Optional[str]:
+    """Route dependency: spend one token from the caller's bucket or answer 429"""
+    identity = await client_identity(request)
+    limiter = user_limiter if identity.startswith("user:") else address_limiter
+    limiter.check(identity)
+    return identity
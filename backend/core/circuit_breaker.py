@@ -0,0 +1,220 @@
+"""Circuit breakers for the Google STT/TTS backends.
+
+Each backend's breaker looks at its last `window` calls. A call counts as
+failed if it raised, missed its deadline, or took longer than the slow-call
+threshold. Once at least `min_calls` have been seen and the failed share
+reaches `failure_rate`, the circuit opens. While open, `guard()` raises
+CircuitOpen immediately, and the routes answer from their degraded path
+(mock analysis / mock audio, or a 503) instead of stacking up on timeouts.
+After `open_seconds` the circuit goes half-open and lets up to
+`half_open_probes` calls through. If they all succeed it closes, and any
+failure opens it again.
+
+`guard()` yields an Attempt whose `call()` runs the backend call under its
+deadline. Only that call is timed against the slow-call threshold, so time
+spent waiting for an admission slot inside the guard doesn't make a healthy
+backend look slow. The deadline bounds how long a request waits for the
+backend. The worker thread running the blocking client call is not
+interrupted, but the executor size caps how many of those there can be.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+from core import config, metrics
+from core.admission import AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = metrics.gauge(
+    "neurospeak_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("backend",)
+)
+CIRCUIT_SHORT_CIRCUITS = metrics.counter(
+    "neurospeak_circuit_short_circuits_total", "Calls failed fast because the circuit was open", ("backend",)
+)
+CIRCUIT_TRANSITIONS = metrics.counter(
+    "neurospeak_circuit_transitions_total", "Circuit breaker state changes", ("backend", "state")
+)
+
+
+class CircuitOpen(HTTPException):
+    def __init__(self, backend: str, retry_after: float):
+        self.backend = backend
+        self.retry_after = max(1, int(retry_after + 0.999))
+        super().__init__(
+            status_code=503,
+            detail=f"{backend} is temporarily unavailable, retry in {self.retry_after}s",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class DeadlineExceeded(HTTPException):
+    """503 for routes without a degraded path when a backend call misses its deadline"""
+
+    def __init__(self, backend: str, retry_after: float):
+        self.backend = backend
+        self.retry_after = max(1, int(retry_after + 0.999))
+        super().__init__(
+            status_code=503,
+            detail=f"{backend} did not answer in time, retry in {self.retry_after}s",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class Attempt:
+    """One call through a breaker's guard"""
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.elapsed: Optional[float] = None
+
+    async def call(self, awaitable: Awaitable):
+        """Await `awaitable` under the per-call deadline (raises asyncio.TimeoutError when missed)"""
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(awaitable, self.deadline)
+        finally:
+            self.elapsed = time.perf_counter() - started
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        backend: str,
+        deadline: float,
+        slow_call_seconds: float,
+        window: int = config.BREAKER_WINDOW,
+        min_calls: int = config.BREAKER_MIN_CALLS,
+        failure_rate: float = config.BREAKER_FAILURE_RATE,
+        open_seconds: float = config.BREAKER_OPEN_SECONDS,
+        half_open_probes: int = config.BREAKER_HALF_OPEN_PROBES,
+    ):
+        self.backend = backend
+        self.deadline = deadline
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._probes = 0
+        self._probe_successes = 0
+        CIRCUIT_STATE.labels(backend).set(0)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit for {self.backend} {self.state} -> {state}")
+        self.state = state
+        CIRCUIT_STATE.labels(self.backend).set(STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(self.backend, state).inc()
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        elif state == HALF_OPEN:
+            self._probes = self._probe_successes = 0
+        else:
+            self._outcomes.clear()
+
+    def available(self) -> bool:
+        """Whether a call would be let through right now (no side effects)"""
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds
+        if self.state == HALF_OPEN:
+            return self._probes < self.half_open_probes
+        return True
+
+    def _before_call(self) -> None:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        if self.state == OPEN or (self.state == HALF_OPEN and self._probes >= self.half_open_probes):
+            CIRCUIT_SHORT_CIRCUITS.labels(self.backend).inc()
+            raise CircuitOpen(self.backend, self.retry_after())
+        if self.state == HALF_OPEN:
+            self._probes += 1
+
+    def _record(self, ok: bool) -> None:
+        if self.state == HALF_OPEN:
+            if not ok:
+                self._transition(OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._transition(CLOSED)
+            return
+        if self.state == OPEN:
+            # A call admitted before the circuit opened finished late
+            return
+        self._outcomes.append(ok)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures >= self.failure_rate * len(self._outcomes):
+            self._transition(OPEN)
+
+    def _release_probe(self) -> None:
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def retry_after(self) -> float:
+        """Seconds until a retry is worth making"""
+        if self.state == OPEN:
+            return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+        return 1.0
+
+    @asynccontextmanager
+    async def guard(self):
+        """Fail fast while open, otherwise record the outcome and latency of the Attempt's call"""
+        self._before_call()
+        attempt = Attempt(self.deadline)
+        started = time.perf_counter()
+        try:
+            yield attempt
+        except (AdmissionRejected, asyncio.CancelledError):
+            # Turned away by our own admission control or abandoned by the client: says nothing about the backend
+            self._release_probe()
+            raise
+        except Exception:
+            self._record(False)
+            raise
+        elapsed = attempt.elapsed if attempt.elapsed is not None else time.perf_counter() - started
+        self._record(elapsed <= self.slow_call_seconds)
+
+    def snapshot(self) -> Dict:
+        return {
+            "state": self.state,
+            "recent_calls": len(self._outcomes),
+            "recent_failures": self._outcomes.count(False),
+            "open_for_seconds": round(max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)), 1)
+            if self.state == OPEN
+            else 0.0,
+        }
+
+
+breakers: Dict[str, CircuitBreaker] = {
+    "stt": CircuitBreaker("stt", config.STT_DEADLINE, config.STT_SLOW_CALL_SECONDS),
+    "tts": CircuitBreaker("tts", config.TTS_DEADLINE, config.TTS_SLOW_CALL_SECONDS),
+}
+
+
+def get_breaker(backend: str) -> CircuitBreaker:
+    return breakers[backend]
+
+
+def reset() -> None:
+    """Close every circuit and forget recent calls (tests)"""
+    for backend, breaker in list(breakers.items()):
+        breakers[backend] = CircuitBreaker(backend, breaker.deadline, breaker.slow_call_seconds)
+
+
+def health() -> Dict[str, Dict]:
+    return {backend: breaker.snapshot() for backend, breaker in breakers.items()}
@@ -0,0 +1,198 @@
+"""Google Cloud clients shared by the whole app, built on first use.
+
+Nothing here talks to Google at import time, so importing main.py is fast
+and works without credentials; endpoints fall back to their mock responses
+when a client can't be built. `warmup()` builds clients and opens their
+gRPC channels ahead of the first request.
+
+Each client is built at most once at a time: whoever starts a build
+publishes a future that concurrent callers wait on, and builds of different
+clients never wait on each other. Routes use `load_optional_client()`,
+which awaits an in-progress build (e.g. the startup warmup) or starts one
+on the backend's executor, so the event loop is never blocked; the mock
+path is only taken when a build actually failed.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from core import config
+from core.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+def _speech_client():
+    from google.cloud import speech
+    return speech.SpeechClient()
+
+
+def _tts_client():
+    from google.cloud import texttospeech
+    return texttospeech.TextToSpeechClient()
+
+
+def _firestore_client():
+    from google.cloud import firestore
+    return firestore.Client()
+
+
+FACTORIES: Dict[str, Callable[[], Any]] = {
+    "speech": _speech_client,
+    "tts": _tts_client,
+    "firestore": _firestore_client,
+}
+
+# Executor pool a client is built on (see core/executor.py)
+BACKENDS: Dict[str, str] = {"speech": "stt", "tts": "tts", "firestore": "firestore"}
+
+_clients: Dict[str, Any] = {}
+_failed_at: Dict[str, float] = {}
+# Builds in progress by client name; the lock only guards these dicts, never a build
+_builds: Dict[str, Future] = {}
+_lock = threading.Lock()
+_credentials_configured = False
+
+
+def configure_credentials() -> None:
+    """Point GOOGLE_APPLICATION_CREDENTIALS at service-account-key.json if it isn't set"""
+    global _credentials_configured
+    if _credentials_configured:
+        return
+    _credentials_configured = True
+    if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+        logger.info(f"Using Google credentials from: {os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')}")
+        return
+    credentials_path = os.path.join(config.BASE_DIR, "service-account-key.json")
+    if os.path.exists(credentials_path):
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
+        logger.info(f"Set Google credentials to: {credentials_path}")
+    else:
+        logger.warning("Google credentials file not found!")
+
+
+def get_client(name: str) -> Any:
+    """The shared client for `name`, building it on first use; raises if that fails"""
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(name)
+        if client is not None:
+            return client
+        build = _builds.get(name)
+        owner = build is None
+        if owner:
+            build = _builds[name] = Future()
+    if not owner:
+        return build.result()
+
+    try:
+        configure_credentials()
+        started = time.perf_counter()
+        client = FACTORIES[name]()
+    except Exception as e:
+        with _lock:
+            _failed_at[name] = time.monotonic()
+            del _builds[name]
+        build.set_exception(e)
+        raise
+    with _lock:
+        _clients[name] = client
+        _failed_at.pop(name, None)
+        del _builds[name]
+    build.set_result(client)
+    logger.info(f"Initialized {name} client in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return client
+
+
+def _recently_failed(name: str) -> bool:
+    failed_at = _failed_at.get(name)
+    return failed_at is not None and time.monotonic() - failed_at < config.CLIENT_RETRY_SECONDS
+
+
+def get_optional_client(name: str) -> Optional[Any]:
+    """Like get_client, but returns None when the client is unavailable.
+
+    After a failure the build isn't retried for CLIENT_RETRY_SECONDS, so
+    requests served by mocks don't each pay for another credentials lookup.
+    """
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    if _recently_failed(name):
+        return None
+    try:
+        return get_client(name)
+    except Exception as e:
+        logger.error(f"Error initializing {name} client: {str(e)}")
+        return None
+
+
+async def load_optional_client(name: str) -> Optional[Any]:
+    """get_optional_client for the request path.
+
+    Waits for a build already in progress instead of starting another, and
+    otherwise builds on the client's backend executor so the event loop is
+    never blocked. None only after the build failed.
+    """
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    if _recently_failed(name):
+        return None
+    build = _builds.get(name)
+    if build is None:
+        return await run_blocking(BACKENDS[name], get_optional_client, name)
+    try:
+        # Shielded: a caller that goes away must not cancel the shared build
+        return await asyncio.shield(asyncio.wrap_future(build))
+    except Exception:
+        return None
+
+
+def set_client(name: str, client: Any) -> None:
+    """Install a client (e.g. a fake in tests); None forgets it so the next use rebuilds it"""
+    with _lock:
+        if client is None:
+            _clients.pop(name, None)
+        else:
+            _clients[name] = client
+        _failed_at.pop(name, None)
+
+
+def reset() -> None:
+    for name in FACTORIES:
+        set_client(name, None)
+
+
+def _open_channel(client: Any, timeout: float) -> None:
+    channel = getattr(getattr(client, "transport", None), "grpc_channel", None)
+    if channel is None:
+        return
+    import grpc
+    grpc.channel_ready_future(channel).result(timeout=timeout)
+
+
+def warmup_client(name: str, timeout: float = 10.0) -> bool:
+    started = time.perf_counter()
+    try:
+        _open_channel(get_client(name), timeout)
+    except Exception as e:
+        logger.warning(f"Warmup of {name} client failed: {str(e)}")
+        return False
+    logger.info(f"Warmed up {name} client in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return True
+
+
+async def warmup(names: Iterable[str], timeout: float = 10.0) -> Dict[str, bool]:
+    """Build and connect the named clients concurrently, each on its own backend's pool"""
+    names = [name for name in names if name in FACTORIES]
+    results = await asyncio.gather(
+        *(run_blocking(BACKENDS[name], warmup_client, name, timeout) for name in names)
+    )
+    return dict(zip(names, results))
@@ -0,0 +1,141 @@
+"""Response compression with Accept-Encoding negotiation (brotli, then gzip).
+
+Only complete bodies at least `minimum_size` bytes long are compressed;
+audio, images and other already-compressed types, responses that already
+carry a Content-Encoding, and streamed bodies (static files) pass through
+untouched. brotli is optional: without it only gzip is offered.
+"""
+import gzip
+from typing import Optional, Sequence
+
+from core import config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+EXCLUDED_CONTENT_TYPES = (
+    "audio/",
+    "image/",
+    "video/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/octet-stream",
+    "text/event-stream",
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header: str, available: Sequence[str]) -> Optional[str]:
+    """Best of `available` (in server preference order) the client accepts"""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = config.COMPRESSION_MIN_BYTES,
+        gzip_level: int = config.GZIP_LEVEL,
+        brotli_quality: int = config.BROTLI_QUALITY,
+        exclude_content_types: Sequence[str] = EXCLUDED_CONTENT_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_content_types = tuple(exclude_content_types)
+        self.available = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept, self.available) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = dict((k.lower(), v) for k, v in start_message.get("headers", ()))
+            content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or b"content-encoding" in headers
+                or content_type.startswith(self.exclude_content_types)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            raw_headers = [
+                (k, v) for k, v in start_message.get("headers", ()) if k.lower() not in (b"content-length", b"vary")
+            ]
+            vary = headers.get(b"vary")
+            raw_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            passthrough = True
+            await send(dict(start_message, headers=raw_headers))
+            await send(dict(message, body=compressed))
+
+        await self.app(scope, receive, compressing_send)
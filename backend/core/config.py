@@ -1,3 +1,128 @@
 import os
 from dotenv import load_dotenv
-load_dotenv()
\ No newline at end of file
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+
+# TTS audio cache
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(STATIC_DIR, "tts"))
+TTS_CACHE_MAX_DISK_BYTES = int(os.getenv("TTS_CACHE_MAX_DISK_BYTES", 256 * 1024 * 1024))
+TTS_CACHE_MAX_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MAX_MEMORY_BYTES", 32 * 1024 * 1024))
+TTS_CACHE_MAX_MEMORY_ENTRIES = int(os.getenv("TTS_CACHE_MAX_MEMORY_ENTRIES", 1024))
+
+# Concurrency limits for blocking calls to external backends (see core/executor.py)
+STT_MAX_CONCURRENCY = int(os.getenv("STT_MAX_CONCURRENCY", 16))
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", 16))
+FIRESTORE_MAX_CONCURRENCY = int(os.getenv("FIRESTORE_MAX_CONCURRENCY", 32))
+AUDIO_MAX_CONCURRENCY = int(os.getenv("AUDIO_MAX_CONCURRENCY", os.cpu_count() or 4))
+# Local file reads and writes, e.g. the TTS audio cache
+DISK_MAX_CONCURRENCY = int(os.getenv("DISK_MAX_CONCURRENCY", 8))
+
+# Live recognition over /speech/stream (see services/streaming_stt.py). Each
+# open stream holds one recognizer thread; streams beyond the limit are
+# refused. Buffered chunks bound the memory of a stream whose recognizer
+# falls behind, and a stream ends after the idle timeout or maximum duration.
+STT_STREAM_MAX_CONCURRENCY = int(os.getenv("STT_STREAM_MAX_CONCURRENCY", 8))
+STT_STREAM_MAX_BUFFERED_CHUNKS = int(os.getenv("STT_STREAM_MAX_BUFFERED_CHUNKS", 64))
+STT_STREAM_IDLE_TIMEOUT = float(os.getenv("STT_STREAM_IDLE_TIMEOUT", 10))
+STT_STREAM_MAX_SECONDS = float(os.getenv("STT_STREAM_MAX_SECONDS", 300))
+
+# Admission control for the paid STT/TTS endpoints (see core/admission.py)
+# Per-user token bucket: sustained requests per second and burst size; 0 rate disables it
+ADMISSION_USER_RATE = float(os.getenv("ADMISSION_USER_RATE", 1.0))
+ADMISSION_USER_BURST = int(os.getenv("ADMISSION_USER_BURST", 10))
+ADMISSION_MAX_TRACKED_USERS = int(os.getenv("ADMISSION_MAX_TRACKED_USERS", 10000))
+# Bucket shared by unauthenticated callers from one client address
+ADMISSION_ADDRESS_RATE = float(os.getenv("ADMISSION_ADDRESS_RATE", 5.0))
+ADMISSION_ADDRESS_BURST = int(os.getenv("ADMISSION_ADDRESS_BURST", 50))
+# Requests allowed to wait for a busy backend, and for how long, before getting 429
+STT_MAX_QUEUE = int(os.getenv("STT_MAX_QUEUE", 32))
+TTS_MAX_QUEUE = int(os.getenv("TTS_MAX_QUEUE", 32))
+STT_QUEUE_TIMEOUT = float(os.getenv("STT_QUEUE_TIMEOUT", 2.0))
+TTS_QUEUE_TIMEOUT = float(os.getenv("TTS_QUEUE_TIMEOUT", 2.0))
+
+# Circuit breakers and per-call deadlines for Google STT/TTS (see core/circuit_breaker.py)
+STT_DEADLINE = float(os.getenv("STT_DEADLINE", 15))
+TTS_DEADLINE = float(os.getenv("TTS_DEADLINE", 8))
+# Calls slower than this count as failures
+STT_SLOW_CALL_SECONDS = float(os.getenv("STT_SLOW_CALL_SECONDS", 8))
+TTS_SLOW_CALL_SECONDS = float(os.getenv("TTS_SLOW_CALL_SECONDS", 4))
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", 20))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", 10))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", 0.5))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", 30))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", 2))
+
+# Write-behind emoji click ingestion (see services/click_ingest.py)
+CLICK_INGEST_BATCH_SIZE = int(os.getenv("CLICK_INGEST_BATCH_SIZE", 200))
+CLICK_INGEST_FLUSH_INTERVAL = float(os.getenv("CLICK_INGEST_FLUSH_INTERVAL", 1.0))
+CLICK_INGEST_MAX_PENDING = int(os.getenv("CLICK_INGEST_MAX_PENDING", 10000))
+CLICK_INGEST_ENQUEUE_TIMEOUT = float(os.getenv("CLICK_INGEST_ENQUEUE_TIMEOUT", 2.0))
+CLICK_BULK_MAX_EVENTS = int(os.getenv("CLICK_BULK_MAX_EVENTS", 1000))
+
+# Largest batch accepted by /practice/score-batch, in pairs, characters per
+# string and characters across the whole batch
+SCORE_BATCH_MAX_PAIRS = int(os.getenv("SCORE_BATCH_MAX_PAIRS", 10000))
+SCORE_PAIR_MAX_CHARS = int(os.getenv("SCORE_PAIR_MAX_CHARS", 200))
+SCORE_BATCH_MAX_CHARS = int(os.getenv("SCORE_BATCH_MAX_CHARS", 400000))
+
+# Precomputed syllable lexicon (see utils/lexicon.py, scripts/build_lexicon.py)
+LEXICON_PATH = os.getenv("LEXICON_PATH", os.path.join(BASE_DIR, "data", "lexicon.json"))
+LEXICON_CACHE_SIZE = int(os.getenv("LEXICON_CACHE_SIZE", 4096))
+
+# Storage engine for emoji clicks and counters: "firestore" or "sqlite"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firestore")
+SQLITE_PATH = os.getenv("SQLITE_PATH", os.path.join(BASE_DIR, "neurospeak.db"))
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", 8))
+
+# Population top-k emojis used to fill in sparse recommendations (see logic/population.py); 0 disables the job
+POPULATION_REFRESH_SECONDS = float(os.getenv("POPULATION_REFRESH_SECONDS", 900))
+POPULATION_TOP_K = int(os.getenv("POPULATION_TOP_K", 10))
+
+# Scores kept per user and scope for the progress trend (see logic/progress_stats.py)
+PROGRESS_WINDOW = int(os.getenv("PROGRESS_WINDOW", 20))
+
+# Response compression (see core/compression.py); smaller bodies are sent as-is
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 500))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+
+# Speech exercise catalog (see services/exercise_catalog.py)
+EXERCISES_PATH = os.getenv("EXERCISES_PATH", os.path.join(BASE_DIR, "data", "exercises.json"))
+EXERCISES_MAX_PAGE_SIZE = int(os.getenv("EXERCISES_MAX_PAGE_SIZE", 500))
+# Single words practised on the word-check page, read by the lexicon build and the TTS prewarm
+PRACTICE_WORDS_PATH = os.getenv("PRACTICE_WORDS_PATH", os.path.join(BASE_DIR, "data", "practice_words.json"))
+
+# Limits for raw audio uploads to /speech/analyze/binary
+SPEECH_UPLOAD_MAX_BYTES = int(os.getenv("SPEECH_UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+SPEECH_UPLOAD_MAX_SECONDS = float(os.getenv("SPEECH_UPLOAD_MAX_SECONDS", 60))
+SPEECH_UPLOAD_SPOOL_BYTES = int(os.getenv("SPEECH_UPLOAD_SPOOL_BYTES", 1024 * 1024))
+
+# Local acoustic analysis on /speech/acoustics (see utils/acoustics.py); memory stays constant, so only duration is capped
+ACOUSTICS_MAX_SECONDS = float(os.getenv("ACOUSTICS_MAX_SECONDS", 1800))
+ACOUSTICS_CHUNK_BYTES = int(os.getenv("ACOUSTICS_CHUNK_BYTES", 64 * 1024))
+
+# Transcripts of recently recognized audio, so client retries skip the STT call (see services/stt_cache.py)
+STT_CACHE_MAX_ENTRIES = int(os.getenv("STT_CACHE_MAX_ENTRIES", 4096))
+STT_CACHE_MAX_BYTES = int(os.getenv("STT_CACHE_MAX_BYTES", 4 * 1024 * 1024))
+STT_CACHE_TTL = float(os.getenv("STT_CACHE_TTL", 600))
+
+# Google client registry (see core/clients.py)
+CLIENT_RETRY_SECONDS = float(os.getenv("CLIENT_RETRY_SECONDS", 30))
+# Comma-separated clients to connect in the background at startup, e.g. "speech,tts,firestore"
+WARMUP_CLIENTS = [name.strip() for name in os.getenv("WARMUP_CLIENTS", "speech,tts").split(",") if name.strip()]
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", 10))
+
+# Shared outbound HTTP client (see core/http.py)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 10))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 60))
+
+# Google ID-token signing keys (see services/google_oauth.py)
+GOOGLE_JWKS_URL = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+# Used when the JWKS response has no Cache-Control max-age
+JWKS_DEFAULT_TTL = float(os.getenv("JWKS_DEFAULT_TTL", 3600))
+# Unknown key ids refetch the JWKS at most this often, so bogus tokens can't hammer Google
+JWKS_MIN_REFRESH_SECONDS = float(os.getenv("JWKS_MIN_REFRESH_SECONDS", 60))
@@ -0,0 +1,78 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from core import config
+from core.metrics import BACKEND_QUEUE_SECONDS, backend_timer
+
+logger = logging.getLogger(__name__)
+
+# Max number of blocking calls in flight per external backend. Each backend
+# gets its own pool so a slow STT call can never starve TTS or Firestore.
+BACKEND_LIMITS: Dict[str, int] = {
+    "stt": config.STT_MAX_CONCURRENCY,
+    "tts": config.TTS_MAX_CONCURRENCY,
+    "firestore": config.FIRESTORE_MAX_CONCURRENCY,
+    # CPU-bound audio preprocessing, kept off the event loop
+    "audio": config.AUDIO_MAX_CONCURRENCY,
+    # Cache file reads, atomic writes and eviction scans
+    "disk": config.DISK_MAX_CONCURRENCY,
+    # Long-lived /speech/stream recognizers, one thread per open stream
+    "stt_stream": config.STT_STREAM_MAX_CONCURRENCY,
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_executor(backend: str) -> ThreadPoolExecutor:
+    executor = _executors.get(backend)
+    if executor is None:
+        with _lock:
+            executor = _executors.get(backend)
+            if executor is None:
+                max_workers = BACKEND_LIMITS.get(backend, 8)
+                executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{backend}-io")
+                _executors[backend] = executor
+                logger.info(f"Started {backend} executor with {max_workers} workers")
+    return executor
+
+
+def configure_backend(backend: str, max_concurrency: int) -> None:
+    """Change a backend's concurrency limit; the pool is rebuilt on next use"""
+    with _lock:
+        BACKEND_LIMITS[backend] = max_concurrency
+        executor = _executors.pop(backend, None)
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+async def run_blocking(backend: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a synchronous client call on the backend's dedicated pool without blocking the event loop.
+
+    The wait for a free worker and the call itself are recorded separately,
+    so a saturated pool shows up as queueing rather than a slow backend.
+    """
+    loop = asyncio.get_running_loop()
+    operation = getattr(fn, "__name__", "call")
+    call = functools.partial(fn, *args, **kwargs)
+    submitted = time.perf_counter()
+
+    def timed_call():
+        BACKEND_QUEUE_SECONDS.labels(backend).observe(time.perf_counter() - submitted)
+        with backend_timer(backend, operation):
+            return call()
+
+    return await loop.run_in_executor(get_executor(backend), timed_call)
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,53 @@
+"""One connection-pooled httpx.AsyncClient for outbound HTTP calls.
+
+main.py opens it in the app lifespan and closes it on shutdown, so the
+OAuth token exchange and JWKS fetches reuse warm TCP/TLS connections
+instead of paying the handshake on every login. Outside the app (scripts,
+tests) it is created on first use; tests can install their own client,
+e.g. one backed by httpx.MockTransport, with `set_http_client`.
+"""
+import logging
+from typing import Optional
+
+import httpx
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(config.HTTP_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def set_http_client(client: Optional[httpx.AsyncClient]) -> None:
+    global _client
+    _client = client
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    return get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Closed shared HTTP client")
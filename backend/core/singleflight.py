@@ -0,0 +1,95 @@
+"""Coalesce concurrent identical calls into one in-flight call.
+
+A class pushing the same exercise, or a client reconnecting in a loop,
+sends many identical requests at once. Within a single-flight group the
+first caller for a key runs the call, and everyone arriving while it is in
+flight waits for that one result (or exception) instead of making their
+own backend call. Nothing is cached: once the call finishes, the next
+caller for the key starts a new one.
+
+`SingleFlight` is for blocking code running on executor threads (storage
+reads); `AsyncSingleFlight` is for coroutines on the event loop. Results
+are shared between callers, so treat them as read-only.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from core import metrics
+
+SINGLEFLIGHT_CALLS = metrics.counter(
+    "neurospeak_singleflight_calls_total",
+    "Calls made through a single-flight group, by whether they ran or joined one already in flight",
+    ("group", "result"),
+)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._executed = SINGLEFLIGHT_CALLS.labels(name, "executed")
+        self._coalesced = SINGLEFLIGHT_CALLS.labels(name, "coalesced")
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._coalesced.inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._executed.inc()
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._executed = SINGLEFLIGHT_CALLS.labels(name, "executed")
+        self._coalesced = SINGLEFLIGHT_CALLS.labels(name, "coalesced")
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            self._coalesced.inc()
+        else:
+            self._executed.inc()
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda finished: self._finished(key, finished))
+        # A caller that gives up (client disconnect) must not cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
@@ -1,5 +1,7 @@
 from datetime import datetime
 
+TIME_BUCKETS = ("morning", "afternoon", "evening", "night")
+
 def get_time_bucket(timestamp: datetime) -> str:
     hour = timestamp.hour
     if 5 <= hour < 12:
@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    """Collects per-stage wall-clock timings for one request and renders a Server-Timing header"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.descriptions: Dict[str, str] = {}
+
+    async def measure(self, name: str, awaitable: Awaitable[T]) -> T:
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stages[name] = (time.perf_counter() - started) * 1000
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = (time.perf_counter() - started) * 1000
+
+    def describe(self, name: str, description: str) -> None:
+        self.descriptions[name] = description
+
+    def header(self, total: Optional[str] = "total") -> str:
+        parts = []
+        for name, ms in self.stages.items():
+            part = f"{name};dur={ms:.1f}"
+            if name in self.descriptions:
+                part += f';desc="{self.descriptions[name]}"'
+            parts.append(part)
+        if total:
+            parts.append(f"{total};dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
@@ -0,0 +1,103 @@
+"""Population-level emoji rankings used to fill in sparse personal recommendations.
+
+A background job reads the all-user population counters (one small
+aggregate per time bucket, kept up to date as clicks are saved) every
+POPULATION_REFRESH_SECONDS and builds an immutable PopulationSnapshot (top-k emojis per time bucket, plus
+an all-day ranking). Publishing is a single reference assignment, so
+request handlers always see one complete snapshot and never touch storage.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from core import config
+from core.executor import run_blocking
+from services.storage import get_population_counts
+
+logger = logging.getLogger(__name__)
+
+ALL_BUCKETS = "all"
+
+
+@dataclass(frozen=True)
+class PopulationSnapshot:
+    top_by_bucket: Mapping[str, Tuple[str, ...]] = field(default_factory=lambda: MappingProxyType({}))
+    clicks: int = 0
+    built_at: Optional[float] = None
+
+    def top(self, bucket: str) -> Tuple[str, ...]:
+        """Ranking for `bucket`, followed by the all-day ranking"""
+        ranked = self.top_by_bucket.get(bucket, ())
+        overall = self.top_by_bucket.get(ALL_BUCKETS, ())
+        return ranked + tuple(emoji for emoji in overall if emoji not in ranked)
+
+
+def build_snapshot(population: Mapping[str, Mapping[str, int]], k: int = config.POPULATION_TOP_K) -> PopulationSnapshot:
+    """Snapshot from {bucket: {emoji: count}} over all users"""
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    for bucket, bucket_counts in population.items():
+        counts[bucket].update(bucket_counts)
+        counts[ALL_BUCKETS].update(bucket_counts)
+    total = sum(counts[ALL_BUCKETS].values())
+
+    top = {bucket: tuple(emoji for emoji, _ in counter.most_common(k)) for bucket, counter in counts.items()}
+    return PopulationSnapshot(MappingProxyType(top), total, time.time())
+
+
+_snapshot = PopulationSnapshot()
+
+
+def get_snapshot() -> PopulationSnapshot:
+    return _snapshot
+
+
+def publish(snapshot: PopulationSnapshot) -> None:
+    global _snapshot
+    _snapshot = snapshot
+
+
+def refresh_snapshot() -> PopulationSnapshot:
+    started = time.perf_counter()
+    snapshot = build_snapshot(get_population_counts())
+    publish(snapshot)
+    logger.info(
+        f"Published population snapshot from {snapshot.clicks} clicks in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return snapshot
+
+
+class SnapshotRefresher:
+    """Rebuilds the population snapshot now and then every `interval` seconds"""
+
+    def __init__(self, interval: float = config.POPULATION_REFRESH_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await run_blocking("firestore", refresh_snapshot)
+            except Exception as e:
+                # Keep serving the previous snapshot
+                logger.error(f"Population snapshot refresh failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+snapshot_refresher = SnapshotRefresher()
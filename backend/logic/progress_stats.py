@@ -0,0 +1,103 @@
+"""Incrementally maintained practice statistics.
+
+Every scored attempt is folded into the user's stats for a few scopes
+("overall", "exercise:<id>", "sessions") inside one storage transaction.
+Reading a user's progress is then a single lookup of those aggregates,
+whatever the length of their history.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from core import config
+from services.storage import update_progress, get_progress_stats
+
+OVERALL = "overall"
+SESSIONS = "sessions"
+EXERCISE_PREFIX = "exercise:"
+
+
+def empty_stats() -> Dict:
+    return {"count": 0, "mean": 0.0, "m2": 0.0, "best": None, "last": None, "recent": [], "updated_at": None}
+
+
+def add_score(stats: Optional[Dict], score: float, timestamp: str, window: int = config.PROGRESS_WINDOW) -> Dict:
+    """Fold one score into a stats dict with Welford's update (returns a new dict)"""
+    stats = dict(stats or empty_stats())
+    count = stats["count"] + 1
+    delta = score - stats["mean"]
+    mean = stats["mean"] + delta / count
+    stats.update(
+        count=count,
+        mean=mean,
+        m2=stats["m2"] + delta * (score - mean),
+        best=score if stats["best"] is None else max(stats["best"], score),
+        last=score,
+        recent=(list(stats["recent"]) + [score])[-window:],
+        updated_at=timestamp,
+    )
+    return stats
+
+
+def trend(recent) -> float:
+    """Least-squares slope of the recent scores, in points per attempt"""
+    n = len(recent)
+    if n < 2:
+        return 0.0
+    x_mean = (n - 1) / 2
+    y_mean = sum(recent) / n
+    covariance = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(recent))
+    variance = sum((i - x_mean) ** 2 for i in range(n))
+    return covariance / variance
+
+
+def summarize(stats: Optional[Dict]) -> Dict:
+    stats = stats or empty_stats()
+    count = stats["count"]
+    variance = stats["m2"] / (count - 1) if count > 1 else 0.0
+    recent = stats["recent"]
+    return {
+        "attempts": count,
+        "mean": round(stats["mean"], 2),
+        "variance": round(variance, 2),
+        "stddev": round(variance ** 0.5, 2),
+        "best": stats["best"],
+        "last": stats["last"],
+        "recent": recent,
+        "recent_mean": round(sum(recent) / len(recent), 2) if recent else 0.0,
+        "trend": round(trend(recent), 3),
+        "updated_at": stats["updated_at"],
+    }
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def record_exercise_score(user_id: str, exercise_id: str, score: float, timestamp: Optional[str] = None) -> Dict:
+    timestamp = timestamp or _now()
+    record = {"user_id": user_id, "kind": "exercise", "exercise_id": exercise_id, "score": score, "timestamp": timestamp}
+    updated = update_progress(
+        user_id, record, [OVERALL, EXERCISE_PREFIX + exercise_id], lambda stats: add_score(stats, score, timestamp)
+    )
+    return summarize(updated[EXERCISE_PREFIX + exercise_id])
+
+
+def record_session(user_id: str, total_score: float, num_exercises: int, timestamp: Optional[str] = None) -> Dict:
+    timestamp = timestamp or _now()
+    record = {"user_id": user_id, "kind": "session", "score": total_score, "num_exercises": num_exercises, "timestamp": timestamp}
+    updated = update_progress(user_id, record, [SESSIONS], lambda stats: add_score(stats, total_score, timestamp))
+    return summarize(updated[SESSIONS])
+
+
+def get_progress(user_id: str) -> Dict:
+    scopes = get_progress_stats(user_id)
+    return {
+        "user_id": user_id,
+        "overall": summarize(scopes.get(OVERALL)),
+        "sessions": summarize(scopes.get(SESSIONS)),
+        "exercises": {
+            scope[len(EXERCISE_PREFIX):]: summarize(stats)
+            for scope, stats in sorted(scopes.items())
+            if scope.startswith(EXERCISE_PREFIX)
+        },
+    }
@@ -1,13 +1,30 @@
-from services.firestore import get_user_emoji_clicks
+from services.storage import get_emoji_counts
 from core.time_utils import get_time_bucket
-from collections import Counter
+from logic.population import get_snapshot
+from core.singleflight import SingleFlight
 from datetime import datetime
+import heapq
 
-def get_recommended_emojis(user_id: str) -> list[str]:
-    all_clicks = get_user_emoji_clicks(user_id)
-    now = datetime.now()
-    current_bucket = get_time_bucket(now)
+# A reconnecting client often fires the same /recommend several times at once
+recommend_flight = SingleFlight("recommend")
 
-    filtered = [c["emoji"] for c in all_clicks if get_time_bucket(datetime.fromisoformat(c["timestamp"])) == current_bucket]
-    most_common = Counter(filtered).most_common(5)
-    return [emoji for emoji, _ in most_common]
\ No newline at end of file
+def get_recommended_emojis(user_id: str, k: int = 5) -> list[str]:
+    current_bucket = get_time_bucket(datetime.now())
+    # Callers get their own copy of the shared result
+    return list(recommend_flight.do((user_id, current_bucket, k), _recommend, user_id, current_bucket, k))
+
+def _recommend(user_id: str, current_bucket: str, k: int) -> list[str]:
+    # Counters are maintained per (user, time bucket) on every click, so this
+    # is one document read no matter how long the user's history is
+    counts = get_emoji_counts(user_id, current_bucket)
+    top_k = heapq.nlargest(k, counts.items(), key=lambda item: item[1])
+    recommended = [emoji for emoji, _ in top_k]
+
+    # New or light users: fill the remaining slots from the in-memory population snapshot
+    if len(recommended) < k:
+        for emoji in get_snapshot().top(current_bucket):
+            if emoji not in recommended:
+                recommended.append(emoji)
+                if len(recommended) == k:
+                    break
+    return recommended
@@ -1,11 +1,25 @@
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from routes import auth, emoji_click, recommend, user, practice, speech, tts
 from fastapi.staticfiles import StaticFiles
 import os
+import asyncio
 import logging
 import uvicorn
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from core import config
+from core.clients import warmup
+from core.metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware
+from core.compression import CompressionMiddleware
+from core.circuit_breaker import health as circuit_health
+from core.responses import FastJSONResponse
+from core.executor import shutdown_executors
+from core.http import start_http_client, close_http_client
+from services.click_ingest import click_ingestor
+from logic.population import snapshot_refresher
+from services.stt_cache import stt_cache
 
 # Load environment variables
 load_dotenv()
@@ -20,8 +34,26 @@ logger = logging.getLogger(__name__)
 # Get port from environment or use default
 PORT = int(os.getenv("PORT", 8083))
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    click_ingestor.start()
+    snapshot_refresher.start()
+    # Open the Google channels in the background; requests are served (or mocked) meanwhile
+    warmup_task = asyncio.create_task(warmup(config.WARMUP_CLIENTS, config.WARMUP_TIMEOUT)) if config.WARMUP_CLIENTS else None
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await snapshot_refresher.stop()
+    # Flush buffered emoji clicks while the Firestore pool is still up
+    await click_ingestor.stop()
+    # Let in-flight STT/TTS/Firestore calls finish before the worker exits
+    shutdown_executors()
+    await close_http_client()
+
 # Create FastAPI app
-app = FastAPI(title="NeuroSpeak API")
+# orjson-rendered JSON for every route that doesn't set its own response_class
+app = FastAPI(title="NeuroSpeak API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -32,6 +64,12 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# gzip/brotli for JSON and text bodies over COMPRESSION_MIN_BYTES; audio is sent as-is
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency, status, in-flight and (wire) payload size metrics, served on /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(emoji_click.router)
@@ -58,7 +96,13 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    circuits = circuit_health()
+    status = "degraded" if any(circuit["state"] != "closed" for circuit in circuits.values()) else "healthy"
+    return {"status": status, "circuits": circuits, "stt_cache": stt_cache.stats()}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
 
 # Run the application
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import RedirectResponse
-from services.google_oauth import get_google_oauth_url, exchange_code_for_tokens, decode_google_id_token
+from services.google_oauth import get_google_oauth_url, exchange_code_for_tokens, verify_google_id_token, InvalidIDToken
 from urllib.parse import urlencode
 import os
 
@@ -23,5 +23,10 @@ def login():
 async def auth_callback(request: Request):
     code = request.query_params.get("code")
     tokens = await exchange_code_for_tokens(code)
-    user_info = decode_google_id_token(tokens["id_token"])
+    if "id_token" not in tokens:
+        raise HTTPException(status_code=400, detail=tokens.get("error_description") or tokens.get("error") or "No ID token returned")
+    try:
+        user_info = await verify_google_id_token(tokens["id_token"], tokens.get("access_token"))
+    except InvalidIDToken as e:
+        raise HTTPException(status_code=401, detail=f"Invalid ID token: {str(e)}")
     return {"user": user_info}
\ No newline at end of file
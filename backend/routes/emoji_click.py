@@ -1,10 +1,25 @@
-from fastapi import APIRouter
-from schemas.emoji_click import EmojiClickEvent
-from services.firestore import save_emoji_click
+from fastapi import APIRouter, HTTPException
+from schemas.emoji_click import EmojiClickEvent, EmojiClickBatch
+from services.click_ingest import click_ingestor, IngestQueueFull
+from core import config
 
 router = APIRouter()
 
-@router.post("/emoji/click")
-def track_emoji_click(event: EmojiClickEvent):
-    save_emoji_click(event)
-    return {"status": "saved"}
\ No newline at end of file
+@router.post("/emoji/click", status_code=202)
+async def track_emoji_click(event: EmojiClickEvent):
+    try:
+        await click_ingestor.submit(event)
+    except IngestQueueFull:
+        raise HTTPException(status_code=503, detail="Click buffer is full, retry later", headers={"Retry-After": "1"})
+    return {"status": "queued"}
+
+@router.post("/emoji/clicks", status_code=202)
+async def track_emoji_clicks(batch: EmojiClickBatch):
+    """Bulk upload, e.g. the PWA flushing clicks it queued while offline"""
+    if len(batch.events) > config.CLICK_BULK_MAX_EVENTS:
+        raise HTTPException(status_code=413, detail=f"At most {config.CLICK_BULK_MAX_EVENTS} events per request")
+    try:
+        await click_ingestor.submit_many(batch.events)
+    except IngestQueueFull:
+        raise HTTPException(status_code=503, detail="Click buffer is full, retry later", headers={"Retry-After": "1"})
+    return {"status": "queued", "count": len(batch.events)}
\ No newline at end of file
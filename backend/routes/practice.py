@@ -1,18 +1,68 @@
-from fastapi import APIRouter, UploadFile, Form, Body
-from typing import List, Dict
-from services.speech_to_text import transcribe_audio
-from utils.speech_analysis import compare_words
-from schemas.practice import WordPracticeFeedback, PracticeSessionResult
-from services.text_to_speech import synthesize_pronunciation
+from fastapi import APIRouter, Depends, UploadFile, Form, Body, HTTPException, Query, Response
+from typing import List, Dict, Optional
+from services.speech_to_text import prepare_transcription, recognize_prepared
+from services.stt_cache import stt_cache
+from utils.speech_analysis import compare_words, compare_words_batch
+from schemas.practice import WordPracticeFeedback, PracticeSessionResult, ScoreBatchRequest, ScoreBatchResponse, ScoredPair
+from services.text_to_speech import synthesize_pronunciation, lookup_pronunciation
+from core.executor import run_blocking
+from core.admission import admit, rate_limit
+from core.circuit_breaker import DeadlineExceeded, get_breaker
+from logic.progress_stats import record_session
+from core import config
+from core.timing import StageTimer
+from utils.audio_preprocess import UnsupportedAudio
+import asyncio
 
 router = APIRouter()
 
-@router.post("/practice/word-check", response_model=WordPracticeFeedback)
-async def check_pronunciation(word: str = Form(...), audio: UploadFile = Form(...)):
+# No mock fallback on the practice page: an open circuit or a missed deadline
+# answers 503 with Retry-After right away
+async def guarded_call(backend: str, fn, *args):
+    breaker = get_breaker(backend)
+    try:
+        async with breaker.guard() as attempt:
+            async with admit(backend):
+                return await attempt.call(run_blocking(backend, fn, *args))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(backend, breaker.retry_after())
+
+@router.post("/practice/word-check", response_model=WordPracticeFeedback, dependencies=[Depends(rate_limit)])
+async def check_pronunciation(response: Response, word: str = Form(...), audio: UploadFile = Form(...)):
+    timer = StageTimer()
     audio_bytes = await audio.read()
-    transcript = transcribe_audio(audio_bytes)
-    feedback = compare_words(word, transcript)
-    audio_url = synthesize_pronunciation(word, filename=f"{word}.mp3")
+
+    # The reference audio depends only on the word, so fetch it while the
+    # attempt is being transcribed; a cached pronunciation skips synthesis
+    async def reference_audio():
+        cached_url = await run_blocking("disk", lookup_pronunciation, word)
+        if cached_url is not None:
+            timer.describe("tts", "cache")
+            return cached_url
+        timer.describe("tts", "synthesized")
+        return await guarded_call("tts", synthesize_pronunciation, word)
+
+    # A resubmitted recording is answered from the transcript cache without
+    # taking an STT slot or counting towards the circuit breaker
+    async def transcribe():
+        try:
+            prepared, recognition_config, cache_key = await run_blocking("audio", prepare_transcription, audio_bytes)
+        except UnsupportedAudio as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        cached = stt_cache.get(cache_key)
+        if cached is not None:
+            timer.describe("stt", "cache")
+            return cached
+        timer.describe("stt", "recognized")
+        return await guarded_call("stt", recognize_prepared, prepared, recognition_config, cache_key)
+
+    transcript, audio_url = await asyncio.gather(
+        timer.measure("stt", transcribe()),
+        timer.measure("tts", reference_audio()),
+    )
+    with timer.stage("score"):
+        feedback = compare_words(word, transcript)
+    response.headers["Server-Timing"] = timer.header()
 
     return WordPracticeFeedback(
         expected=word,
@@ -24,9 +74,33 @@ async def check_pronunciation(word: str = Form(...), audio: UploadFile = Form(..
         tts_audio=audio_url
     )
 
+# Re-score many attempts at once, e.g. a whole session after a threshold change.
+# Plain def so FastAPI runs the CPU-bound scoring off the event loop.
+@router.post("/practice/score-batch", response_model=ScoreBatchResponse)
+def score_batch(request: ScoreBatchRequest):
+    if len(request.pairs) > config.SCORE_BATCH_MAX_PAIRS:
+        raise HTTPException(status_code=413, detail=f"At most {config.SCORE_BATCH_MAX_PAIRS} pairs per request")
+    if sum(len(pair.expected) + len(pair.spoken) for pair in request.pairs) > config.SCORE_BATCH_MAX_CHARS:
+        raise HTTPException(status_code=413, detail=f"At most {config.SCORE_BATCH_MAX_CHARS} characters per request")
+
+    feedbacks = compare_words_batch([(pair.expected, pair.spoken) for pair in request.pairs])
+    return ScoreBatchResponse(results=[
+        ScoredPair(
+            expected=pair.expected,
+            spoken=pair.spoken,
+            feedback=feedback["message"],
+            syllable_feedback=feedback["syllable_feedback"],
+            score=feedback["score"],
+            status=feedback["status"]
+        )
+        for pair, feedback in zip(request.pairs, feedbacks)
+    ])
+
 @router.post("/practice/session-complete")
-async def complete_session(results: List[Dict] = Body(...)):
+async def complete_session(results: List[Dict] = Body(...), user_id: Optional[str] = Query(None)):
     total_score = sum(result["score"] for result in results) / len(results)
+    if user_id:
+        await run_blocking("firestore", record_session, user_id, total_score, len(results))
     
     # Generate personalized tips based on performance
     tips = []
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Query
 from logic.recommend_engine import get_recommended_emojis
+from core.executor import run_blocking
 
 router = APIRouter()
 
 @router.get("/recommend")
-def recommend_emojis(user_id: str = Query(...)):
-    return {"recommended": get_recommended_emojis(user_id)}
\ No newline at end of file
+async def recommend_emojis(user_id: str = Query(...)):
+    return {"recommended": await run_blocking("firestore", get_recommended_emojis, user_id)}
\ No newline at end of file
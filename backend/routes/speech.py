@@ -1,18 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Request, Query
+from fastapi.responses import Response
+from email.utils import format_datetime, parsedate_to_datetime
 from typing import List, Optional
-import os
 import tempfile
 import uuid
 import json
 from pydantic import BaseModel
-import difflib
 import random
 import base64
+import asyncio
 from google.cloud import speech
 import io
 from dotenv import load_dotenv
 import logging
+from core.executor import run_blocking
+from core.admission import AdmissionRejected, admit, rate_limit
+from core.circuit_breaker import get_breaker
+from core.clients import load_optional_client
+from core.responses import FastJSONResponse
+from utils.audio_preprocess import UnsupportedAudio, prepare_audio
+from utils.upload import receive_audio_upload, UploadRejected
+from utils.speech_analysis import analyze_transcription, analyze_words, get_suggestions
+from services.streaming_stt import GoogleStreamingRecognizer, StreamingSession
+from services.stt_cache import stt_cache, make_transcript_key
+from services.exercise_catalog import get_catalog, InvalidCursor
+from logic.progress_stats import record_exercise_score, get_progress
+from core.config import EXERCISES_MAX_PAGE_SIZE, ACOUSTICS_MAX_SECONDS, ACOUSTICS_CHUNK_BYTES
+from core.config import STT_STREAM_IDLE_TIMEOUT, STT_STREAM_MAX_SECONDS
+from utils.acoustics import WavStream
 
 # Load environment variables
 load_dotenv()
@@ -21,31 +36,21 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Set Google credentials environment variable
-if os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'):
-    logger.info(f"Using Google credentials from: {os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')}")
-else:
-    # Try to use the relative path if absolute path is not set
-    credentials_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'service-account-key.json')
-    if os.path.exists(credentials_path):
-        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-        logger.info(f"Set Google credentials to: {credentials_path}")
-    else:
-        logger.warning("Google credentials file not found!")
-
 router = APIRouter(
     prefix="/speech",
     tags=["speech"],
     responses={404: {"description": "Not found"}},
 )
 
-# Initialize Google Cloud Speech client
-try:
-    speech_client = speech.SpeechClient()
-    logger.info("Successfully initialized Google Cloud Speech client")
-except Exception as e:
-    logger.error(f"Error initializing Google Cloud Speech client: {str(e)}")
-    speech_client = None
+# A fake recognizer for the /speech/stream WebSocket can be installed here in
+# tests; by default one is built around the shared speech client
+streaming_recognizer = None
+
+async def get_streaming_recognizer():
+    if streaming_recognizer is not None:
+        return streaming_recognizer
+    speech_client = await load_optional_client("speech")
+    return GoogleStreamingRecognizer(speech_client) if speech_client is not None else None
 
 # Models
 class SpeechExercise(BaseModel):
@@ -64,72 +69,77 @@ class SpeechAnalysisRequest(BaseModel):
     audio_base64: str
     target_text: str
 
-# Mock database of exercises
-EXERCISES = [
-    {
-        "id": "ex1",
-        "title": "Basic Greeting",
-        "text": "Hello, how are you today?",
-        "difficulty": "easy",
-        "category": "general"
-    },
-    {
-        "id": "ex2",
-        "title": "Weather Description",
-        "text": "It's a beautiful sunny day outside.",
-        "difficulty": "medium",
-        "category": "general"
-    },
-    {
-        "id": "ex3",
-        "title": "Medical Appointment",
-        "text": "I need to schedule a doctor's appointment.",
-        "difficulty": "medium",
-        "category": "medical"
-    },
-    {
-        "id": "ex4",
-        "title": "Emergency Phrase",
-        "text": "I need help immediately, please.",
-        "difficulty": "easy",
-        "category": "emergency"
-    },
-    {
-        "id": "ex5",
-        "title": "Complex Sentence",
-        "text": "The quick brown fox jumps over the lazy dog.",
-        "difficulty": "hard",
-        "category": "general"
+# Get speech exercises.
+#
+# Returns the (filtered) list as before. With `limit`, only one page is
+# returned and the cursor for the next page is sent in X-Next-Cursor and a
+# Link header. ETag/Last-Modified let clients revalidate with a 304.
+@router.get("/exercises")
+async def get_exercises(
+    request: Request,
+    difficulty: Optional[str] = None,
+    category: Optional[str] = None,
+    word: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=EXERCISES_MAX_PAGE_SIZE),
+):
+    catalog = get_catalog()
+    headers = {
+        "ETag": catalog.etag,
+        "Last-Modified": format_datetime(catalog.last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
     }
-]
+    if is_not_modified(request, catalog):
+        return Response(status_code=304, headers=headers)
 
-# Get speech exercises
-@router.get("/exercises")
-async def get_exercises(difficulty: Optional[str] = None, category: Optional[str] = None):
-    filtered_exercises = EXERCISES
-    
-    if difficulty:
-        filtered_exercises = [ex for ex in filtered_exercises if ex["difficulty"] == difficulty]
-    
-    if category:
-        filtered_exercises = [ex for ex in filtered_exercises if ex["category"] == category]
-    
-    return filtered_exercises
+    try:
+        items, next_cursor = catalog.page(catalog.query(difficulty, category, word), cursor, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-# Save user progress
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return FastJSONResponse(content=items, headers=headers)
+
+def is_not_modified(request: Request, catalog) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or catalog.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return catalog.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+# Save user progress; the user's aggregates are updated in the same write
 @router.post("/progress")
 async def save_progress(progress: ProgressRecord):
-    # In a real app, this would save to a database
-    return {"status": "success", "message": "Progress saved successfully"}
+    stats = await run_blocking(
+        "firestore", record_exercise_score, progress.user_id, progress.exercise_id, progress.score
+    )
+    return {"status": "success", "message": "Progress saved successfully", "exercise": stats}
+
+# Progress page summary: overall, per-exercise and per-session stats from the
+# stored aggregates (one read, independent of how many attempts there were)
+@router.get("/progress/{user_id}")
+async def read_progress(user_id: str):
+    return await run_blocking("firestore", get_progress, user_id)
 
 # Analyze speech audio using Google Cloud Speech-to-Text API
-@router.post("/analyze")
+@router.post("/analyze", dependencies=[Depends(rate_limit)])
 async def analyze_speech(request: SpeechAnalysisRequest):
     try:
-        if speech_client is None:
+        if await load_optional_client("speech") is None:
             # Fallback to mock response if Google Cloud client is not available
             logger.warning("Using mock response as Google Cloud Speech client is not available")
             return mock_speech_analysis(request.target_text)
+        if not get_breaker("stt").available():
+            logger.warning("Using mock response as the Speech-to-Text circuit is open")
+            return mock_speech_analysis(request.target_text)
             
         # Decode the base64 audio
         try:
@@ -138,108 +148,244 @@ async def analyze_speech(request: SpeechAnalysisRequest):
         except Exception as e:
             logger.error(f"Error decoding base64 audio: {str(e)}")
             return mock_speech_analysis(request.target_text)
-        
+
+        return await analyze_audio(audio_data, request.target_text)
+
+    except (AdmissionRejected, HTTPException):
+        raise
+    except Exception as e:
+        logger.error(f"Error analyzing speech: {str(e)}")
+        # Return mock response in case of error
+        return mock_speech_analysis(request.target_text)
+
+# Same analysis for a raw audio body (Content-Type audio/wav, audio/webm, ...)
+# with the target phrase in the query string. Avoids the base64 inflation and
+# the extra decoded copy of the JSON variant; the body is read in chunks and
+# rejected early when it is over the size or duration limit.
+@router.post("/analyze/binary", dependencies=[Depends(rate_limit)])
+async def analyze_speech_binary(request: Request, target_text: str = Query(...)):
+    try:
+        async with receive_audio_upload(request) as audio_data:
+            logger.info(f"Received binary audio upload, size: {len(audio_data)} bytes")
+            return await analyze_audio(audio_data, target_text)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+async def analyze_audio(audio_data, target_text: str):
+    try:
+        speech_client = await load_optional_client("speech")
+        if speech_client is None:
+            logger.warning("Using mock response as Google Cloud Speech client is not available")
+            return mock_speech_analysis(target_text)
+        stt_breaker = get_breaker("stt")
+        if not stt_breaker.available():
+            logger.warning("Using mock response as the Speech-to-Text circuit is open")
+            return mock_speech_analysis(target_text)
+
+        # Sniff the format, trim silence and downsample before sending
+        try:
+            prepared = await run_blocking("audio", prepare_audio, audio_data)
+        except UnsupportedAudio as e:
+            raise HTTPException(status_code=415, detail=str(e))
+
         # Configure the speech recognition request
-        audio = speech.RecognitionAudio(content=audio_data)
-        config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-            sample_rate_hertz=48000,  # Standard sample rate for web audio
+        recognition_config = dict(
+            **prepared.config_kwargs(),
             language_code="en-US",
             enable_word_time_offsets=True,  # Get timing information for each word
             enable_automatic_punctuation=True,
             model="default"  # Use the default model for general speech recognition
         )
-        
-        # Perform speech recognition
-        try:
-            logger.info("Sending request to Google Cloud Speech-to-Text API")
-            response = speech_client.recognize(config=config, audio=audio)
-            logger.info(f"Received response from Google Cloud Speech-to-Text API: {response}")
-        except Exception as e:
-            logger.error(f"Error with WEBM_OPUS format, trying LINEAR16: {str(e)}")
-            # If there's an issue with the audio format, try with LINEAR16 encoding
-            try:
-                config = speech.RecognitionConfig(
-                    encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                    sample_rate_hertz=48000,
-                    language_code="en-US",
-                    enable_word_time_offsets=True,
-                    enable_automatic_punctuation=True,
-                    model="default"
-                )
-                response = speech_client.recognize(config=config, audio=audio)
-            except Exception as e2:
-                logger.error(f"Error with LINEAR16 format as well: {str(e2)}")
-                return mock_speech_analysis(request.target_text)
-        
-        # Extract the transcription
-        transcription = ""
-        if response.results:
-            transcription = response.results[0].alternatives[0].transcript
-            logger.info(f"Transcription: {transcription}")
+
+        # A resubmitted recording is scored against the transcript we already have
+        cache_key = await run_blocking("audio", make_transcript_key, prepared.content, recognition_config)
+        transcription = stt_cache.get(cache_key)
+        if transcription is not None:
+            logger.info(f"Using cached transcription for key {cache_key[:12]}")
         else:
-            logger.warning("No transcription results returned")
-            return mock_speech_analysis(request.target_text)
-        
-        # Calculate similarity score
-        similarity_ratio = difflib.SequenceMatcher(None, transcription.lower(), request.target_text.lower()).ratio()
-        score = int(similarity_ratio * 100)
-        logger.info(f"Similarity score: {score}")
-        
-        # Generate phoneme analysis
-        words_target = request.target_text.lower().split()
-        words_transcribed = transcription.lower().split()
-        
-        phoneme_analysis = []
-        
-        # Word-by-word comparison
-        for i, target_word in enumerate(words_target):
-            if i < len(words_transcribed):
-                transcribed_word = words_transcribed[i]
-                word_similarity = difflib.SequenceMatcher(None, target_word, transcribed_word).ratio()
-                
-                if word_similarity > 0.8:
-                    phoneme_analysis.append({
-                        "phoneme": target_word,
-                        "correct": True,
-                        "feedback": "Good pronunciation"
-                    })
-                else:
-                    phoneme_analysis.append({
-                        "phoneme": target_word,
-                        "correct": False,
-                        "feedback": f"Heard '{transcribed_word}' instead of '{target_word}'"
-                    })
+            # The request needs bytes; pass-through audio is copied here, once, and only on a cache miss
+            audio = speech.RecognitionAudio(content=bytes(prepared.content))
+            config = speech.RecognitionConfig(**recognition_config)
+
+            # Perform speech recognition: waits for a free STT slot (or answers 429), then
+            # falls back to the mock analysis if the call fails, misses STT_DEADLINE or
+            # the circuit opened meanwhile
+            try:
+                async with stt_breaker.guard() as attempt:
+                    async with admit("stt"):
+                        logger.info(f"Sending {prepared.encoding} request to Google Cloud Speech-to-Text API")
+                        response = await attempt.call(
+                            run_blocking("stt", speech_client.recognize, config=config, audio=audio)
+                        )
+                logger.info(f"Received response from Google Cloud Speech-to-Text API: {response}")
+            except AdmissionRejected:
+                raise
+            except Exception as e:
+                logger.error(f"Error with {prepared.encoding} format: {type(e).__name__}: {str(e)}")
+                return mock_speech_analysis(target_text)
+
+            # Extract the transcription
+            if response.results:
+                transcription = response.results[0].alternatives[0].transcript
+                logger.info(f"Transcription: {transcription}")
             else:
-                phoneme_analysis.append({
-                    "phoneme": target_word,
-                    "correct": False,
-                    "feedback": "Word was not detected"
-                })
+                logger.warning("No transcription results returned")
+                return mock_speech_analysis(target_text)
+            stt_cache.put(cache_key, transcription)
         
-        # Generate suggestions based on score
-        suggestions = []
-        if score < 60:
-            suggestions.append("Try speaking more slowly and clearly.")
-            suggestions.append("Practice each word individually before saying the full phrase.")
-        elif score < 80:
-            suggestions.append("Your pronunciation is good, but try to enunciate more clearly.")
-            suggestions.append("Focus on the words that were misheard.")
-        else:
-            suggestions.append("Excellent pronunciation! Keep practicing to maintain your skills.")
-        
-        # Return the analysis results
-        return {
-            "transcription": transcription,
-            "score": score,
-            "phonemeAnalysis": phoneme_analysis,
-            "suggestions": suggestions
-        }
+        # Score the transcript against the target phrase
+        analysis = await run_blocking("audio", analyze_transcription, target_text, transcription)
+        logger.info(f"Similarity score: {analysis['score']}")
+        return analysis
         
+    except (AdmissionRejected, HTTPException):
+        raise
     except Exception as e:
         logger.error(f"Error analyzing speech: {str(e)}")
         # Return mock response in case of error
-        return mock_speech_analysis(request.target_text)
+        return mock_speech_analysis(target_text)
+
+# Loudness, voicing, pauses, speaking rate and pitch contour for a raw PCM WAV
+# body, computed locally so pacing and volume feedback doesn't wait for a
+# transcription. The body is analysed as it arrives, in constant memory.
+@router.post("/acoustics")
+async def acoustic_features(request: Request):
+    stream = WavStream()
+    pending = bytearray()
+    try:
+        async for chunk in request.stream():
+            pending += chunk
+            if len(pending) < ACOUSTICS_CHUNK_BYTES:
+                continue
+            await run_blocking("audio", stream.feed, bytes(pending))
+            pending.clear()
+            analyzer = stream.analyzer
+            if analyzer is not None and analyzer.input_samples > ACOUSTICS_MAX_SECONDS * analyzer.sample_rate:
+                raise HTTPException(status_code=413, detail=f"Audio is longer than {ACOUSTICS_MAX_SECONDS:g} seconds")
+        if pending:
+            await run_blocking("audio", stream.feed, bytes(pending))
+        return stream.summary()
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=f"Expected a PCM WAV body: {str(e)}")
+
+# Stream audio chunks for live recognition and incremental feedback.
+#
+# Protocol: the client sends a JSON setup message
+#   {"target_text": "...", "encoding": "WEBM_OPUS", "sample_rate": 48000}
+# then binary audio frames as they are recorded, then {"event": "end"}.
+# The server replies with {"type": "interim", ...} messages carrying the
+# transcript so far and word-by-word scores for the words heard, and a
+# final {"type": "final", ...} message with the /speech/analyze payload.
+# The utterance also ends after STT_STREAM_IDLE_TIMEOUT seconds without a
+# message or STT_STREAM_MAX_SECONDS in total. When all recognizer slots are
+# taken the server sends {"type": "error", "detail": ..., "retry_after": ...}
+# and closes with code 1013 (try again later).
+async def receive_stream_message(websocket: WebSocket, deadline: float):
+    """The next message, or None once the client has gone idle or the stream is over its maximum duration"""
+    timeout = min(STT_STREAM_IDLE_TIMEOUT, deadline - asyncio.get_running_loop().time())
+    if timeout <= 0:
+        logger.warning(f"Ending speech stream after {STT_STREAM_MAX_SECONDS:g} seconds")
+        return None
+    try:
+        return await asyncio.wait_for(websocket.receive(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Ending idle or overlong speech stream")
+        return None
+
+@router.websocket("/stream")
+async def stream_speech(websocket: WebSocket):
+    await websocket.accept()
+    deadline = asyncio.get_running_loop().time() + STT_STREAM_MAX_SECONDS
+    try:
+        setup = await asyncio.wait_for(websocket.receive_json(), STT_STREAM_IDLE_TIMEOUT)
+    except asyncio.TimeoutError:
+        await websocket.close()
+        return
+    except (WebSocketDisconnect, ValueError):
+        return
+    target_text = setup.get("target_text", "")
+
+    recognizer = await get_streaming_recognizer()
+    if recognizer is None:
+        logger.warning("Using mock response as streaming recognition is not available")
+        try:
+            while True:
+                message = await receive_stream_message(websocket, deadline)
+                if message is None:
+                    break
+                if message["type"] == "websocket.disconnect":
+                    return
+                if message.get("text"):
+                    break
+        except WebSocketDisconnect:
+            return
+        await websocket.send_json({"type": "final", **mock_speech_analysis(target_text)})
+        await websocket.close()
+        return
+
+    try:
+        async with admit("stt_stream"):
+            transcription, connected = await run_stream(websocket, recognizer, setup, target_text, deadline)
+    except AdmissionRejected as e:
+        await websocket.send_json({"type": "error", "detail": e.detail, "retry_after": e.retry_after})
+        await websocket.close(code=1013)
+        return
+    if not connected:
+        return
+
+    if transcription:
+        analysis = await run_blocking("audio", analyze_transcription, target_text, transcription)
+    else:
+        logger.warning("No transcription results returned from stream")
+        analysis = mock_speech_analysis(target_text)
+    await websocket.send_json({"type": "final", **analysis})
+    await websocket.close()
+
+async def run_stream(websocket: WebSocket, recognizer, setup: dict, target_text: str, deadline: float):
+    """Feed the client's audio to the recognizer until the utterance ends; returns (transcript, still connected)"""
+    session = StreamingSession(recognizer, setup)
+    session.start()
+    await websocket.send_json({"type": "ready"})
+
+    async def forward_results():
+        transcript = ""
+        async for transcript, is_final in session.results():
+            await websocket.send_json({
+                "type": "interim",
+                "transcript": transcript,
+                "is_final": is_final,
+                "phonemeAnalysis": analyze_words(target_text, transcript, partial=True)
+            })
+        return transcript
+
+    sender = asyncio.create_task(forward_results())
+    connected = True
+    try:
+        while True:
+            message = await receive_stream_message(websocket, deadline)
+            if message is None:
+                break
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                break
+            if message.get("bytes"):
+                if not session.feed(message["bytes"]):
+                    logger.warning("Ending speech stream: the recognizer has fallen behind the audio")
+                    break
+            elif message.get("text"):
+                # Any text frame after setup ends the utterance
+                break
+    except WebSocketDisconnect:
+        connected = False
+    finally:
+        session.close()
+
+    try:
+        transcription = await sender
+    except Exception as e:
+        logger.error(f"Error in streaming speech analysis: {str(e)}")
+        transcription = ""
+    return transcription, connected
 
 # Generate a mock speech analysis response for testing or when API is unavailable
 def mock_speech_analysis(target_text):
@@ -291,15 +437,7 @@ def mock_speech_analysis(target_text):
     transcription = " ".join(transcription_words)
     
     # Generate suggestions based on score
-    suggestions = []
-    if score < 60:
-        suggestions.append("Try speaking more slowly and clearly.")
-        suggestions.append("Practice each word individually before saying the full phrase.")
-    elif score < 80:
-        suggestions.append("Your pronunciation is good, but try to enunciate more clearly.")
-        suggestions.append("Focus on the words that were misheard.")
-    else:
-        suggestions.append("Excellent pronunciation! Keep practicing to maintain your skills.")
+    suggestions = get_suggestions(score)
     
     return {
         "transcription": transcription,
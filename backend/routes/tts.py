@@ -1,13 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import Response
 from pydantic import BaseModel
 import os
 import tempfile
 import uuid
 import base64
-from google.cloud import texttospeech
 from dotenv import load_dotenv
 import logging
+from services.tts_cache import tts_cache, make_cache_key
+from services.text_to_speech import DEFAULT_VOICE, synthesize_audio
+from core.executor import run_blocking
+from core.admission import AdmissionRejected, admit, rate_limit
+from core.singleflight import AsyncSingleFlight
+from core.circuit_breaker import get_breaker
+from core.clients import load_optional_client
 
 # Load environment variables
 load_dotenv()
@@ -16,102 +22,89 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Set Google credentials environment variable
-if os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'):
-    logger.info(f"Using Google credentials from: {os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')}")
-else:
-    # Try to use the relative path if absolute path is not set
-    credentials_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'service-account-key.json')
-    if os.path.exists(credentials_path):
-        os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-        logger.info(f"Set Google credentials to: {credentials_path}")
-    else:
-        logger.warning("Google credentials file not found!")
-
 router = APIRouter(
     prefix="/tts",
     tags=["tts"],
     responses={404: {"description": "Not found"}},
 )
 
-# Initialize Google Cloud Text-to-Speech client
-try:
-    tts_client = texttospeech.TextToSpeechClient()
-    logger.info("Successfully initialized Google Cloud Text-to-Speech client")
-except Exception as e:
-    logger.error(f"Error initializing Google Cloud Text-to-Speech client: {str(e)}")
-    tts_client = None
+# Identical requests arriving together (a class given the same exercise) share one synthesis
+tts_flight = AsyncSingleFlight("tts")
 
 class TTSRequest(BaseModel):
     text: str
-    voice: str = "en-US-Neural2-F"  # Default voice
+    voice: str = DEFAULT_VOICE
     speaking_rate: float = 1.0
     pitch: float = 0.0
 
-@router.post("")
+@router.post("", dependencies=[Depends(rate_limit)])
 async def text_to_speech(request: TTSRequest):
     try:
+        cache_key = make_cache_key(request.text, request.voice, request.speaking_rate, request.pitch, "MP3")
+        cached_audio = tts_cache.get_from_memory(cache_key)
+        if cached_audio is None:
+            cached_audio = await run_blocking("disk", tts_cache.get, cache_key)
+        if cached_audio is not None:
+            logger.info(f"Serving cached TTS audio for key {cache_key[:12]}")
+            return Response(
+                content=cached_audio,
+                media_type="audio/mp3",
+                headers={
+                    "Content-Disposition": f"attachment; filename=tts_{cache_key[:16]}.mp3",
+                    "X-Cache": "HIT"
+                }
+            )
+
+        tts_client = await load_optional_client("tts")
         if tts_client is None:
             # Fallback to mock response if Google Cloud client is not available
             logger.warning("Using mock TTS response as Google Cloud TTS client is not available")
             return generate_mock_audio_response(request.text)
+        if not get_breaker("tts").available():
+            logger.warning("Using mock TTS response as the TTS circuit is open")
+            return generate_mock_audio_response(request.text)
             
-        # Set up the TTS request
-        synthesis_input = texttospeech.SynthesisInput(text=request.text)
-        
-        # Parse the voice name
-        voice_parts = request.voice.split("-")
-        if len(voice_parts) < 3:
-            # Default to US English female voice if format is incorrect
-            language_code = "en-US"
-            name = "en-US-Neural2-F"
-            ssml_gender = texttospeech.SsmlVoiceGender.FEMALE
-            logger.info(f"Using default voice: {name}")
-        else:
-            language_code = f"{voice_parts[0]}-{voice_parts[1]}"
-            name = request.voice
-            # Determine gender from voice name
-            if "Female" in request.voice or "F" in voice_parts[2]:
-                ssml_gender = texttospeech.SsmlVoiceGender.FEMALE
-            else:
-                ssml_gender = texttospeech.SsmlVoiceGender.MALE
-            logger.info(f"Using specified voice: {name}")
-        
-        # Configure voice
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=language_code,
-            name=name,
-            ssml_gender=ssml_gender
-        )
-        
-        # Configure audio output
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=request.speaking_rate,
-            pitch=request.pitch
-        )
-        
         # Generate speech
-        logger.info(f"Sending TTS request for text: '{request.text[:50]}...' (truncated)")
-        response = tts_client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-        logger.info(f"Received TTS response, audio size: {len(response.audio_content)} bytes")
+        audio_content = await tts_flight.do(cache_key, synthesize_and_cache, tts_client, request, cache_key)
         
         # Return the audio content
         return Response(
-            content=response.audio_content,
+            content=audio_content,
             media_type="audio/mp3",
-            headers={"Content-Disposition": f"attachment; filename=tts_{uuid.uuid4()}.mp3"}
+            headers={
+                "Content-Disposition": f"attachment; filename=tts_{cache_key[:16]}.mp3",
+                "X-Cache": "MISS"
+            }
         )
         
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error generating speech: {str(e)}")
         # Return mock audio response in case of error
         return generate_mock_audio_response(request.text)
 
+async def synthesize_and_cache(tts_client, request: TTSRequest, cache_key: str) -> bytes:
+    logger.info(f"Sending TTS request for text: '{request.text[:50]}...' (truncated)")
+    breaker = get_breaker("tts")
+    async with breaker.guard() as attempt:
+        async with admit("tts"):
+            audio_content = await attempt.call(run_blocking(
+                "tts",
+                synthesize_audio,
+                tts_client,
+                request.text,
+                request.voice,
+                request.speaking_rate,
+                request.pitch
+            ))
+    logger.info(f"Received TTS response, audio size: {len(audio_content)} bytes")
+    try:
+        await run_blocking("disk", tts_cache.put, cache_key, audio_content)
+    except OSError as e:
+        logger.error(f"Failed to write TTS cache entry: {str(e)}")
+    return audio_content
+
 # Generate a mock audio response for testing or when API is unavailable
 def generate_mock_audio_response(text):
     logger.info("Generating mock TTS response")
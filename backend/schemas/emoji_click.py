@@ -1,7 +1,11 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List
 
 class EmojiClickEvent(BaseModel):
     user_id: str
     emoji: str
-    timestamp: datetime
\ No newline at end of file
+    timestamp: datetime
+
+class EmojiClickBatch(BaseModel):
+    events: List[EmojiClickEvent]
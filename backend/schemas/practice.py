@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict
 
+from core import config
+
 class SyllableFeedback(BaseModel):
     syllable: str
     status: str
@@ -18,4 +20,22 @@ class WordPracticeFeedback(BaseModel):
 class PracticeSessionResult(BaseModel):
     total_score: float
     num_exercises: int
-    improvement_tips: List[str]
\ No newline at end of file
+    improvement_tips: List[str]
+
+class ScorePair(BaseModel):
+    expected: str = Field(max_length=config.SCORE_PAIR_MAX_CHARS)
+    spoken: str = Field(max_length=config.SCORE_PAIR_MAX_CHARS)
+
+class ScoreBatchRequest(BaseModel):
+    pairs: List[ScorePair]
+
+class ScoredPair(BaseModel):
+    expected: str
+    spoken: str
+    feedback: str
+    syllable_feedback: List[SyllableFeedback]
+    score: int
+    status: str
+
+class ScoreBatchResponse(BaseModel):
+    results: List[ScoredPair]
@@ -0,0 +1,67 @@
+"""Rebuild the per-user, per-time-bucket emoji counters, and the all-user
+population counters, from raw emoji_clicks.
+
+Run from the backend directory:
+
+    python -m scripts.backfill_emoji_counters [--dry-run]
+
+Counters are overwritten (not incremented), so the command is safe to re-run.
+Clicks recorded while it runs may be dropped from the rebuilt totals, so run
+it before routing traffic to code that increments the counters.
+"""
+import argparse
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from core.time_utils import get_time_bucket
+from services.storage import set_emoji_counts, set_population_counts, stream_all_emoji_clicks
+
+logger = logging.getLogger(__name__)
+
+
+def count_clicks_by_bucket(clicks):
+    """Aggregate click dicts into {(user_id, bucket): Counter(emoji -> count)}"""
+    counters = defaultdict(Counter)
+    for click in clicks:
+        bucket = get_time_bucket(datetime.fromisoformat(click["timestamp"]))
+        counters[(click["user_id"], bucket)][click["emoji"]] += 1
+    return counters
+
+
+def sum_by_bucket(counters):
+    """Fold {(user_id, bucket): Counter} into {bucket: Counter} over all users"""
+    population = defaultdict(Counter)
+    for (_, bucket), counts in counters.items():
+        population[bucket].update(counts)
+    return population
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Print the counters instead of writing them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    counters = count_clicks_by_bucket(stream_all_emoji_clicks())
+    logger.info(f"Aggregated clicks into {len(counters)} (user, bucket) counters")
+
+    for (user_id, bucket), counts in counters.items():
+        if args.dry_run:
+            print(user_id, bucket, dict(counts.most_common()))
+        else:
+            set_emoji_counts(user_id, bucket, counts)
+
+    for bucket, counts in sum_by_bucket(counters).items():
+        if args.dry_run:
+            print("*", bucket, dict(counts.most_common()))
+        else:
+            set_population_counts(bucket, counts)
+
+    if not args.dry_run:
+        logger.info("Backfill complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Rebuild the precomputed syllable lexicon from the exercise catalog and practice words.
+
+Run from the backend directory:
+
+    python -m scripts.build_lexicon [--output data/lexicon.json]
+
+Restart the API afterwards; the lexicon is loaded once at startup.
+"""
+import argparse
+import json
+import logging
+
+from core import config
+from services.exercise_catalog import get_catalog
+from utils.lexicon import extract_words, write_lexicon
+
+logger = logging.getLogger(__name__)
+
+
+def collect_words():
+    words = set()
+    for exercise in get_catalog().exercises:
+        words.update(extract_words(exercise["text"]))
+    with open(config.PRACTICE_WORDS_PATH, encoding="utf-8") as f:
+        for word in json.load(f):
+            words.update(extract_words(word))
+    return words
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=config.LEXICON_PATH, help="Where to write the lexicon")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    count = write_lexicon(args.output, collect_words())
+    logger.info(f"Wrote {count} words to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
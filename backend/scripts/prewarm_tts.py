@@ -0,0 +1,123 @@
+"""Pre-render TTS audio for every exercise text and practice word.
+
+Run from the backend directory:
+
+    python -m scripts.prewarm_tts [--concurrency 8] [--dry-run]
+
+Audio is written into the TTS cache directory and listed in its
+manifest.json, which the API consults before calling Google TTS, so
+pre-rendered phrases cost no API calls and are never evicted. Re-runs only
+synthesize entries that are new, changed, or whose file is missing or
+corrupt; entries no longer in the vocabulary are dropped from the manifest.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Tuple
+
+from core import config
+from core.clients import get_client
+from core.executor import configure_backend, run_blocking
+from services.exercise_catalog import get_catalog
+from services.text_to_speech import DEFAULT_VOICE, PRACTICE_VOICE, synthesize_audio
+from services.tts_cache import tts_cache, make_cache_key
+from utils.audio_preprocess import mp3_duration_ms
+
+logger = logging.getLogger(__name__)
+
+
+def collect_phrases() -> Dict[str, dict]:
+    """Manifest stubs for everything the app asks TTS for, keyed by cache key.
+
+    Exercise texts use the /tts defaults; practice words use the voice
+    /practice/word-check synthesizes its reference audio with.
+    """
+    phrases = {}
+    texts = [(ex["text"], DEFAULT_VOICE) for ex in get_catalog().exercises]
+    with open(config.PRACTICE_WORDS_PATH, encoding="utf-8") as f:
+        texts += [(word, PRACTICE_VOICE) for word in json.load(f)]
+    for text, voice in texts:
+        key = make_cache_key(text, voice, 1.0, 0.0, "MP3")
+        phrases[key] = {"text": text, "voice": voice, "speaking_rate": 1.0, "pitch": 0.0, "encoding": "MP3"}
+    return phrases
+
+
+def is_current(key: str, entry: dict) -> bool:
+    path = tts_cache.path_for(key, entry.get("encoding", "MP3"))
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest() == entry.get("sha256")
+    except FileNotFoundError:
+        return False
+
+
+def plan(phrases: Dict[str, dict]) -> Tuple[Dict[str, dict], List[str], List[str]]:
+    """Split the vocabulary into (up-to-date manifest entries, keys to synthesize, stale keys)"""
+    previous = tts_cache.load_manifest()
+    manifest = {key: entry for key, entry in previous.items() if key in phrases and is_current(key, entry)}
+    missing = [key for key in phrases if key not in manifest]
+    stale = [key for key in previous if key not in phrases]
+    return manifest, missing, stale
+
+
+async def synthesize_missing(client, phrases: Dict[str, dict], keys: List[str]) -> Dict[str, dict]:
+    rendered = {}
+
+    async def render(key: str):
+        phrase = phrases[key]
+        try:
+            audio = await run_blocking(
+                "tts", synthesize_audio, client, phrase["text"], phrase["voice"], phrase["speaking_rate"], phrase["pitch"]
+            )
+        except Exception as e:
+            logger.error(f"Failed to synthesize '{phrase['text'][:40]}': {str(e)}")
+            return
+        path = tts_cache.write_pinned(key, audio, phrase["encoding"])
+        rendered[key] = dict(
+            phrase,
+            file=os.path.basename(path),
+            sha256=hashlib.sha256(audio).hexdigest(),
+            bytes=len(audio),
+            duration_ms=mp3_duration_ms(audio),
+        )
+        logger.info(f"Synthesized '{phrase['text'][:40]}' ({len(audio)} bytes)")
+
+    # The tts executor bounds how many requests are in flight at once
+    await asyncio.gather(*(render(key) for key in keys))
+    return rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=config.TTS_MAX_CONCURRENCY, help="Parallel TTS requests")
+    parser.add_argument("--dry-run", action="store_true", help="List what would be synthesized without calling TTS")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    phrases = collect_phrases()
+    manifest, missing, stale = plan(phrases)
+    logger.info(f"{len(phrases)} phrases: {len(manifest)} up to date, {len(missing)} to synthesize, {len(stale)} stale")
+
+    if args.dry_run:
+        for key in missing:
+            print(phrases[key]["voice"], phrases[key]["text"])
+        return
+
+    if missing:
+        configure_backend("tts", args.concurrency)
+        manifest.update(asyncio.run(synthesize_missing(get_client("tts"), phrases, missing)))
+
+    # Stale files lose their pin and age out through normal cache eviction
+    tts_cache.save_manifest(manifest)
+    failed = len(phrases) - len(manifest)
+    logger.info(f"Manifest written with {len(manifest)} entries to {tts_cache.manifest_path}")
+    if failed:
+        logger.warning(f"{failed} phrases failed to synthesize; re-run to retry them")
+
+
+if __name__ == "__main__":
+    main()
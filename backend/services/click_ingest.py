@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from typing import Callable, List, Optional
+
+from core import config
+from core.executor import run_blocking
+from services.storage import PartialWrite, save_emoji_clicks
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """Raised when the buffer stays full for longer than the enqueue timeout"""
+
+
+class ClickIngestor:
+    """Write-behind buffer for emoji click events.
+
+    Events are queued in memory and written by a single background task in
+    batches of up to `batch_size`, at most `flush_interval` seconds after the
+    first event of a batch arrived. The queue holds at most `max_pending`
+    events; once full, producers wait up to `enqueue_timeout` for room and
+    then get IngestQueueFull, which the routes turn into a 503.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List], None],
+        batch_size: int = config.CLICK_INGEST_BATCH_SIZE,
+        flush_interval: float = config.CLICK_INGEST_FLUSH_INTERVAL,
+        max_pending: int = config.CLICK_INGEST_MAX_PENDING,
+        enqueue_timeout: float = config.CLICK_INGEST_ENQUEUE_TIMEOUT,
+        max_retries: int = 3,
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List = []
+        self._inflight: Optional[asyncio.Future] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, event) -> None:
+        if self._task is None:
+            self.start()
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self.queue.put(event), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                raise IngestQueueFull(f"Click buffer full ({self.queue.maxsize} pending events)")
+
+    async def submit_many(self, events) -> None:
+        """Queue all of `events` or none of them: a batch that doesn't fit is refused up front"""
+        if self._task is None:
+            self.start()
+        events = list(events)
+        free = self.queue.maxsize - self.queue.qsize() if self.queue.maxsize > 0 else len(events)
+        if len(events) > free:
+            raise IngestQueueFull(f"Click buffer has room for {free} of {len(events)} events")
+        for event in events:
+            self.queue.put_nowait(event)
+
+    async def stop(self) -> None:
+        """Flush everything still buffered and stop the background task"""
+        if self._task is None:
+            return
+        self._stopping = True
+        # Wake the flusher if it is idle waiting for the first event
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+
+        # Events already taken off the queue for a batch that never got written
+        batch, self._batch = self._batch, []
+        await self._write(batch)
+        while not self.queue.empty():
+            batch = self._drain(self.batch_size)
+            await self._write(batch)
+        logger.info(f"Click ingestor stopped, {self.written} events written, {self.dropped} dropped")
+
+    @property
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._batch.append(await self.queue.get())
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._batch.extend(self._drain(self.batch_size - len(self._batch)))
+            batch, self._batch = self._batch, []
+            # Shielded so a shutdown that lands mid-write doesn't cancel it; stop() awaits it
+            self._inflight = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    def _drain(self, limit: int) -> List:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _write(self, batch: List) -> None:
+        if not batch:
+            return
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await run_blocking("firestore", self.writer, batch)
+                self.written += len(batch)
+                return
+            except PartialWrite as e:
+                # Retry only what wasn't committed, so no counter is incremented twice
+                logger.error(f"Wrote {len(batch) - len(e.remaining)} of {len(batch)} emoji clicks (attempt {attempt}): {str(e)}")
+                self.written += len(batch) - len(e.remaining)
+                batch = e.remaining
+                if attempt < self.max_retries:
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} emoji clicks (attempt {attempt}): {str(e)}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+        self.dropped += len(batch)
+
+
+click_ingestor = ClickIngestor(writer=save_emoji_clicks)
@@ -0,0 +1,110 @@
+import base64
+import bisect
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core import config
+from utils.lexicon import extract_words
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ExerciseCatalog:
+    """Immutable, indexed view of the exercise data file.
+
+    Exercises keep their file order; every index maps a key to the sorted
+    positions of matching exercises, so filters are index intersections and
+    a cursor is just the position of the last exercise returned.
+    """
+
+    def __init__(self, exercises: Sequence[Dict], version: str, last_modified: datetime):
+        self.exercises = list(exercises)
+        self.version = version
+        self.last_modified = last_modified.replace(microsecond=0)
+        self.by_id = {ex["id"]: ex for ex in self.exercises}
+
+        by_difficulty, by_category, by_word = defaultdict(list), defaultdict(list), defaultdict(set)
+        for position, ex in enumerate(self.exercises):
+            by_difficulty[ex["difficulty"]].append(position)
+            by_category[ex["category"]].append(position)
+            for word in extract_words(ex["text"]):
+                by_word[word].add(position)
+        self.by_difficulty = dict(by_difficulty)
+        self.by_category = dict(by_category)
+        self.by_word = {word: sorted(positions) for word, positions in by_word.items()}
+
+    @classmethod
+    def from_file(cls, path: str) -> "ExerciseCatalog":
+        with open(path, "rb") as f:
+            raw = f.read()
+        modified = datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc)
+        catalog = cls(json.loads(raw), hashlib.sha256(raw).hexdigest()[:32], modified)
+        logger.info(f"Loaded {len(catalog.exercises)} exercises from {path}")
+        return catalog
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+    def query(self, difficulty: Optional[str] = None, category: Optional[str] = None, word: Optional[str] = None) -> List[int]:
+        """Sorted positions of exercises matching every given filter"""
+        candidates = []
+        if difficulty:
+            candidates.append(self.by_difficulty.get(difficulty, []))
+        if category:
+            candidates.append(self.by_category.get(category, []))
+        if word:
+            candidates.append(self.by_word.get(word.lower(), []))
+        if not candidates:
+            return list(range(len(self.exercises)))
+
+        candidates.sort(key=len)
+        result = candidates[0]
+        for other in candidates[1:]:
+            other_set = set(other)
+            result = [p for p in result if p in other_set]
+        return result
+
+    def page(self, positions: List[int], cursor: Optional[str], limit: Optional[int]) -> Tuple[List[Dict], Optional[str]]:
+        start = 0
+        if cursor:
+            start = bisect.bisect_right(positions, decode_cursor(cursor))
+        end = len(positions) if limit is None else min(len(positions), start + limit)
+        items = [self.exercises[p] for p in positions[start:end]]
+        next_cursor = encode_cursor(positions[end - 1]) if end < len(positions) and end > start else None
+        return items, next_cursor
+
+
+def encode_cursor(position: int) -> str:
+    return base64.urlsafe_b64encode(str(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+_catalog: Optional[ExerciseCatalog] = None
+
+
+def get_catalog() -> ExerciseCatalog:
+    global _catalog
+    if _catalog is None:
+        _catalog = ExerciseCatalog.from_file(config.EXERCISES_PATH)
+    return _catalog
+
+
+def set_catalog(catalog: Optional[ExerciseCatalog]) -> None:
+    global _catalog
+    _catalog = catalog
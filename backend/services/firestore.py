@@ -1,19 +1,162 @@
 import os
+from urllib.parse import quote
 from google.cloud import firestore
 from dotenv import load_dotenv
+from core.time_utils import TIME_BUCKETS, get_time_bucket
+from services.storage import PartialWrite, StorageBackend
+from core.clients import get_client
+from core.singleflight import SingleFlight
 
 load_dotenv()
 
-db = firestore.Client()
+MAX_BATCH_WRITES = 500
 
-def save_emoji_click(event):
-    doc_ref = db.collection("emoji_clicks").document()
-    doc_ref.set({
-        "user_id": event.user_id,
-        "emoji": event.emoji,
-        "timestamp": event.timestamp.isoformat()
-    })
+class FirestoreStorage(StorageBackend):
+    name = "firestore"
 
-def get_user_emoji_clicks(user_id):
-    clicks_ref = db.collection("emoji_clicks").where("user_id", "==", user_id)
-    return [doc.to_dict() for doc in clicks_ref.stream()]
\ No newline at end of file
+    def __init__(self, client=None):
+        self._db = client
+        # Concurrent identical point reads share one round trip
+        self._reads = SingleFlight("firestore")
+
+    @property
+    def db(self):
+        # The shared client is built on first use, so importing this module never needs credentials
+        if self._db is None:
+            return get_client("firestore")
+        return self._db
+
+    def _counter_ref(self, user_id, bucket):
+        # One document per (user, time bucket) holding an {emoji: count} map
+        return self.db.collection("emoji_counters").document(f"{quote(user_id, safe='')}__{bucket}")
+
+    def _population_ref(self, bucket):
+        # One document per time bucket with the {emoji: count} map summed over all users
+        return self.db.collection("population_counters").document(bucket)
+
+    def save_emoji_click(self, event):
+        batch = self.db.batch()
+        batch.set(self.db.collection("emoji_clicks").document(), {
+            "user_id": event.user_id,
+            "emoji": event.emoji,
+            "timestamp": event.timestamp.isoformat()
+        })
+        batch.set(self._counter_ref(event.user_id, get_time_bucket(event.timestamp)), {
+            "user_id": event.user_id,
+            "bucket": get_time_bucket(event.timestamp),
+            "counts": {event.emoji: firestore.Increment(1)}
+        }, merge=True)
+        batch.set(self._population_ref(get_time_bucket(event.timestamp)), {
+            "bucket": get_time_bucket(event.timestamp),
+            "counts": {event.emoji: firestore.Increment(1)}
+        }, merge=True)
+        batch.commit()
+
+    def save_emoji_clicks(self, events):
+        """Write many clicks with batched commits, folding counter increments per (user, bucket).
+
+        Firestore caps a batch at 500 writes. Each click needs at most two
+        (its document and its counter) and a chunk adds one population
+        counter per time bucket, so clicks are committed in chunks of 248
+        that each carry their own counter increments. A chunk commits
+        atomically: when one fails, the clicks from it onwards are raised in
+        PartialWrite and nothing already committed is applied again on retry.
+        """
+        events = list(events)
+        chunk_size = (MAX_BATCH_WRITES - len(TIME_BUCKETS)) // 2
+        for start in range(0, len(events), chunk_size):
+            try:
+                self._commit_clicks(events[start:start + chunk_size])
+            except Exception as e:
+                if start == 0:
+                    raise
+                raise PartialWrite(events[start:], e) from e
+
+    def _commit_clicks(self, events):
+        batch = self.db.batch()
+        counter_updates = {}
+        population_updates = {}
+        for event in events:
+            bucket = get_time_bucket(event.timestamp)
+            batch.set(self.db.collection("emoji_clicks").document(), {
+                "user_id": event.user_id,
+                "emoji": event.emoji,
+                "timestamp": event.timestamp.isoformat()
+            })
+            counts = counter_updates.setdefault((event.user_id, bucket), {})
+            counts[event.emoji] = counts.get(event.emoji, 0) + 1
+            counts = population_updates.setdefault(bucket, {})
+            counts[event.emoji] = counts.get(event.emoji, 0) + 1
+
+        for (user_id, bucket), counts in counter_updates.items():
+            batch.set(self._counter_ref(user_id, bucket), {
+                "user_id": user_id,
+                "bucket": bucket,
+                "counts": {emoji: firestore.Increment(n) for emoji, n in counts.items()}
+            }, merge=True)
+        for bucket, counts in population_updates.items():
+            batch.set(self._population_ref(bucket), {
+                "bucket": bucket,
+                "counts": {emoji: firestore.Increment(n) for emoji, n in counts.items()}
+            }, merge=True)
+        batch.commit()
+
+    def get_user_emoji_clicks(self, user_id):
+        clicks_ref = self.db.collection("emoji_clicks").where("user_id", "==", user_id)
+        return [doc.to_dict() for doc in clicks_ref.stream()]
+
+    def get_emoji_counts(self, user_id, bucket):
+        return dict(self._reads.do(("emoji_counts", user_id, bucket), self._read_emoji_counts, user_id, bucket))
+
+    def _read_emoji_counts(self, user_id, bucket):
+        snapshot = self._counter_ref(user_id, bucket).get()
+        if not snapshot.exists:
+            return {}
+        return snapshot.to_dict().get("counts", {})
+
+    def stream_all_emoji_clicks(self):
+        for doc in self.db.collection("emoji_clicks").stream():
+            yield doc.to_dict()
+
+    def set_emoji_counts(self, user_id, bucket, counts):
+        self._counter_ref(user_id, bucket).set({
+            "user_id": user_id,
+            "bucket": bucket,
+            "counts": dict(counts)
+        })
+
+    def get_population_counts(self):
+        # A handful of documents, one per time bucket, instead of every click
+        return {doc.id: doc.to_dict().get("counts", {}) for doc in self.db.collection("population_counters").stream()}
+
+    def set_population_counts(self, bucket, counts):
+        self._population_ref(bucket).set({"bucket": bucket, "counts": dict(counts)})
+
+    def _progress_ref(self, user_id):
+        # One document per user holding {scope: stats}, so reading progress is a single get
+        return self.db.collection("progress_stats").document(quote(user_id, safe=''))
+
+    def update_progress(self, user_id, record, scopes, fold):
+        ref = self._progress_ref(user_id)
+        record_ref = self.db.collection("progress_records").document()
+
+        @firestore.transactional
+        def apply(transaction):
+            snapshot = ref.get(transaction=transaction)
+            stats = snapshot.to_dict().get("scopes", {}) if snapshot.exists else {}
+            updated = {scope: fold(stats.get(scope)) for scope in scopes}
+            stats.update(updated)
+            transaction.set(ref, {"user_id": user_id, "scopes": stats})
+            transaction.set(record_ref, record)
+            return updated
+
+        return apply(self.db.transaction())
+
+    def get_progress_stats(self, user_id):
+        return dict(self._reads.do(("progress_stats", user_id), self._read_progress_stats, user_id))
+
+    def _read_progress_stats(self, user_id):
+        snapshot = self._progress_ref(user_id).get()
+        if not snapshot.exists:
+            return {}
+        return snapshot.to_dict().get("scopes", {})
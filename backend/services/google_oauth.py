@@ -1,11 +1,29 @@
+import asyncio
+import logging
 import os
+import re
+import time
 import httpx
-from jose import jwt
+from jose import jwt, JWTError
+from typing import Dict, Optional
 from urllib.parse import urlencode
+from core import config
+from core.http import get_http_client
+from core.metrics import backend_timer
+
+logger = logging.getLogger(__name__)
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class InvalidIDToken(Exception):
+    pass
+
 
 def get_google_oauth_url():
     params = urlencode({
@@ -19,8 +37,8 @@ def get_google_oauth_url():
     return f"https://accounts.google.com/o/oauth2/v2/auth?{params}"
 
 async def exchange_code_for_tokens(code: str):
-    async with httpx.AsyncClient() as client:
-        token_res = await client.post(
+    with backend_timer("oauth", "token_exchange"):
+        token_res = await get_http_client().post(
             "https://oauth2.googleapis.com/token",
             data={
                 "client_id": GOOGLE_CLIENT_ID,
@@ -31,7 +49,94 @@ async def exchange_code_for_tokens(code: str):
             },
             headers={"Content-Type": "application/x-www-form-urlencoded"}
         )
-        return token_res.json()
+    return token_res.json()
+
+
+class JWKSCache:
+    """Google's ID-token signing keys, kept in memory by key id.
+
+    The key set is fetched on first use and again when it expires (per the
+    response's Cache-Control max-age) or when a token names a key id we
+    don't have, which is how Google key rotation shows up. Unknown key ids
+    refetch at most every `min_refresh_interval` seconds. If a refresh
+    fails, the keys we already have keep being used.
+    """
+
+    def __init__(
+        self,
+        url: str = config.GOOGLE_JWKS_URL,
+        default_ttl: float = config.JWKS_DEFAULT_TTL,
+        min_refresh_interval: float = config.JWKS_MIN_REFRESH_SECONDS,
+    ):
+        self.url = url
+        self.default_ttl = default_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.fetches = 0
+        self._keys: Dict[str, Dict] = {}
+        self._expires_at = 0.0
+        self._fetched_at: Optional[float] = None
+        self._lock = asyncio.Lock()
 
-def decode_google_id_token(id_token: str):
-    return jwt.get_unverified_claims(id_token)
\ No newline at end of file
+    def _fresh(self, kid: str) -> Optional[Dict]:
+        if time.monotonic() < self._expires_at:
+            return self._keys.get(kid)
+        return None
+
+    async def get_key(self, kid: str) -> Optional[Dict]:
+        key = self._fresh(kid)
+        if key is not None:
+            return key
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            key = self._fresh(kid)
+            if key is not None:
+                return key
+            now = time.monotonic()
+            expired = now >= self._expires_at
+            if expired or self._fetched_at is None or now - self._fetched_at >= self.min_refresh_interval:
+                try:
+                    await self._refresh()
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    logger.error(f"Failed to refresh Google JWKS, keeping {len(self._keys)} cached keys: {str(e)}")
+            return self._keys.get(kid)
+
+    async def _refresh(self) -> None:
+        with backend_timer("oauth", "jwks_fetch"):
+            response = await get_http_client().get(self.url)
+        response.raise_for_status()
+        keys = {key["kid"]: key for key in response.json()["keys"]}
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        ttl = float(match.group(1)) if match else self.default_ttl
+        now = time.monotonic()
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + ttl
+        self.fetches += 1
+        logger.info(f"Fetched {len(keys)} Google signing keys, valid for {ttl:.0f}s")
+
+
+google_jwks = JWKSCache()
+
+
+async def verify_google_id_token(id_token: str, access_token: Optional[str] = None, jwks: Optional[JWKSCache] = None) -> Dict:
+    """Claims of a Google ID token after checking signature, audience, issuer and expiry locally"""
+    jwks = jwks or google_jwks
+    try:
+        header = jwt.get_unverified_header(id_token)
+    except JWTError as e:
+        raise InvalidIDToken(f"Malformed ID token: {str(e)}")
+
+    key = await jwks.get_key(header.get("kid"))
+    if key is None:
+        raise InvalidIDToken(f"Unknown signing key: {header.get('kid')}")
+    try:
+        return jwt.decode(
+            id_token,
+            key,
+            algorithms=["RS256"],
+            audience=GOOGLE_CLIENT_ID,
+            issuer=GOOGLE_ISSUERS,
+            access_token=access_token,
+        )
+    except JWTError as e:
+        raise InvalidIDToken(str(e))
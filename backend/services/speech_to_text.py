@@ -1,20 +1,37 @@
 import os
+from typing import Tuple
 from google.cloud import speech
 from dotenv import load_dotenv
+from utils.audio_preprocess import PreparedAudio, prepare_audio
+from services.stt_cache import stt_cache, make_transcript_key
+from core.clients import get_client
 
 load_dotenv()
-client = speech.SpeechClient()
 
-def transcribe_audio(audio_bytes: bytes) -> str:
-    audio = speech.RecognitionAudio(content=audio_bytes)
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        language_code="en-US"
-    )
+def prepare_transcription(audio_bytes: bytes) -> Tuple[PreparedAudio, dict, str]:
+    """Preprocessed audio, its recognition config and its STT cache key"""
+    prepared = prepare_audio(audio_bytes)
+    recognition_config = dict(**prepared.config_kwargs(), language_code="en-US")
+    return prepared, recognition_config, make_transcript_key(prepared.content, recognition_config)
+
+def recognize_prepared(prepared: PreparedAudio, recognition_config: dict, cache_key: str) -> str:
+    # The request needs bytes; pass-through audio is copied here, once, and only on a cache miss
+    audio = speech.RecognitionAudio(content=bytes(prepared.content))
+    config = speech.RecognitionConfig(**recognition_config)
 
-    response = client.recognize(config=config, audio=audio)
+    # Timed by run_blocking, which every caller goes through
+    response = get_client("speech").recognize(config=config, audio=audio)
 
     for result in response.results:
-        return result.alternatives[0].transcript
+        transcript = result.alternatives[0].transcript
+        stt_cache.put(cache_key, transcript)
+        return transcript
 
-    return ""
\ No newline at end of file
+    return ""
+
+def transcribe_audio(audio_bytes: bytes) -> str:
+    prepared, recognition_config, cache_key = prepare_transcription(audio_bytes)
+    cached = stt_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    return recognize_prepared(prepared, recognition_config, cache_key)
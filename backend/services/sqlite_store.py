@@ -0,0 +1,188 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from core.time_utils import get_time_bucket
+from services.storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emoji_clicks (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    emoji TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_emoji_clicks_user_timestamp ON emoji_clicks (user_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS emoji_counters (
+    user_id TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    emoji TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, bucket, emoji)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS progress_records (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_progress_records_user_timestamp ON progress_records (user_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS progress_stats (
+    user_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (user_id, scope)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """Embedded storage engine for single-node and edge deployments.
+
+    Runs in WAL mode so readers never block the writer, and hands out
+    connections from a fixed-size pool so the Firestore executor threads
+    can share them without reopening the database per call.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, pool_size: int = 8, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
+        self._created = 0
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self._pool_size
+                if can_create:
+                    self._created += 1
+            conn = self._connect() if can_create else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def save_emoji_clicks(self, events):
+        rows = []
+        counter_updates: Dict[tuple, int] = {}
+        for event in events:
+            rows.append((event.user_id, event.emoji, event.timestamp.isoformat()))
+            key = (event.user_id, get_time_bucket(event.timestamp), event.emoji)
+            counter_updates[key] = counter_updates.get(key, 0) + 1
+
+        with self.transaction() as conn:
+            conn.executemany("INSERT INTO emoji_clicks (user_id, emoji, timestamp) VALUES (?, ?, ?)", rows)
+            conn.executemany(
+                "INSERT INTO emoji_counters (user_id, bucket, emoji, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id, bucket, emoji) DO UPDATE SET count = count + excluded.count",
+                [(*key, n) for key, n in counter_updates.items()],
+            )
+
+    def get_user_emoji_clicks(self, user_id) -> List[Dict]:
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT user_id, emoji, timestamp FROM emoji_clicks WHERE user_id = ? ORDER BY timestamp",
+                (user_id,),
+            ).fetchall()
+        return [{"user_id": u, "emoji": e, "timestamp": t} for u, e, t in rows]
+
+    def get_emoji_counts(self, user_id, bucket) -> Dict[str, int]:
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT emoji, count FROM emoji_counters WHERE user_id = ? AND bucket = ?",
+                (user_id, bucket),
+            ).fetchall()
+        return dict(rows)
+
+    def stream_all_emoji_clicks(self):
+        with self.connection() as conn:
+            for u, e, t in conn.execute("SELECT user_id, emoji, timestamp FROM emoji_clicks"):
+                yield {"user_id": u, "emoji": e, "timestamp": t}
+
+    def set_emoji_counts(self, user_id, bucket, counts):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM emoji_counters WHERE user_id = ? AND bucket = ?", (user_id, bucket))
+            conn.executemany(
+                "INSERT INTO emoji_counters (user_id, bucket, emoji, count) VALUES (?, ?, ?, ?)",
+                [(user_id, bucket, emoji, n) for emoji, n in counts.items()],
+            )
+
+    def get_population_counts(self) -> Dict[str, Dict[str, int]]:
+        population: Dict[str, Dict[str, int]] = {}
+        with self.connection() as conn:
+            for bucket, emoji, n in conn.execute(
+                "SELECT bucket, emoji, SUM(count) FROM emoji_counters GROUP BY bucket, emoji"
+            ):
+                population.setdefault(bucket, {})[emoji] = n
+        return population
+
+    def set_population_counts(self, bucket, counts):
+        # Summed from emoji_counters on read, so there is nothing to store
+        pass
+
+    def update_progress(self, user_id, record, scopes, fold):
+        updated = {}
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO progress_records (user_id, timestamp, record) VALUES (?, ?, ?)",
+                (user_id, record["timestamp"], json.dumps(record)),
+            )
+            for scope in scopes:
+                row = conn.execute(
+                    "SELECT stats FROM progress_stats WHERE user_id = ? AND scope = ?", (user_id, scope)
+                ).fetchone()
+                updated[scope] = fold(json.loads(row[0]) if row else None)
+                conn.execute(
+                    "INSERT INTO progress_stats (user_id, scope, stats) VALUES (?, ?, ?) "
+                    "ON CONFLICT (user_id, scope) DO UPDATE SET stats = excluded.stats",
+                    (user_id, scope, json.dumps(updated[scope])),
+                )
+        return updated
+
+    def get_progress_stats(self, user_id):
+        with self.connection() as conn:
+            rows = conn.execute("SELECT scope, stats FROM progress_stats WHERE user_id = ?", (user_id,)).fetchall()
+        return {scope: json.loads(stats) for scope, stats in rows}
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
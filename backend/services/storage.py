@@ -0,0 +1,136 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+
+class PartialWrite(Exception):
+    """Some of a batch of clicks was stored before a write failed; `remaining` holds the rest.
+
+    Raised by backends that can't commit a whole batch atomically, so a
+    retry writes only what is missing instead of counting clicks twice.
+    """
+
+    def __init__(self, remaining: Sequence, cause: Exception):
+        super().__init__(f"{len(remaining)} clicks not written: {str(cause)}")
+        self.remaining = list(remaining)
+
+
+class StorageBackend(ABC):
+    """Persistence for emoji clicks and the per-(user, time bucket) counters built from them"""
+
+    name = "base"
+
+    @abstractmethod
+    def save_emoji_clicks(self, events: Iterable) -> None:
+        """Store raw clicks and bump the matching counters (raises PartialWrite if only some were stored)"""
+
+    def save_emoji_click(self, event) -> None:
+        self.save_emoji_clicks([event])
+
+    @abstractmethod
+    def get_user_emoji_clicks(self, user_id: str) -> List[Dict]:
+        """All of a user's clicks as {"user_id", "emoji", "timestamp"} dicts"""
+
+    @abstractmethod
+    def get_emoji_counts(self, user_id: str, bucket: str) -> Dict[str, int]:
+        """{emoji: count} for one user and time bucket"""
+
+    @abstractmethod
+    def stream_all_emoji_clicks(self) -> Iterator[Dict]:
+        """Every stored click, used by the counter backfill"""
+
+    @abstractmethod
+    def set_emoji_counts(self, user_id: str, bucket: str, counts: Dict[str, int]) -> None:
+        """Overwrite the counters for one user and time bucket"""
+
+    @abstractmethod
+    def get_population_counts(self) -> Dict[str, Dict[str, int]]:
+        """{bucket: {emoji: count}} over all users, read from aggregates rather than raw clicks"""
+
+    @abstractmethod
+    def set_population_counts(self, bucket: str, counts: Dict[str, int]) -> None:
+        """Overwrite the all-user counters for one time bucket, used by the counter backfill"""
+
+    @abstractmethod
+    def update_progress(
+        self, user_id: str, record: Dict, scopes: Sequence[str], fold: Callable[[Optional[Dict]], Dict]
+    ) -> Dict[str, Dict]:
+        """Store a raw progress record and, in the same transaction, replace the
+        user's stats for each scope with fold(current stats or None).
+
+        Returns the updated stats by scope.
+        """
+
+    @abstractmethod
+    def get_progress_stats(self, user_id: str) -> Dict[str, Dict]:
+        """All of a user's progress stats by scope"""
+
+    def close(self) -> None:
+        pass
+
+
+_storage: Optional[StorageBackend] = None
+_lock = threading.Lock()
+
+
+def create_storage(engine: str) -> StorageBackend:
+    if engine == "sqlite":
+        from services.sqlite_store import SQLiteStorage
+        return SQLiteStorage(config.SQLITE_PATH, pool_size=config.SQLITE_POOL_SIZE)
+    if engine == "firestore":
+        from services.firestore import FirestoreStorage
+        return FirestoreStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND '{engine}', expected 'firestore' or 'sqlite'")
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                _storage = create_storage(config.STORAGE_BACKEND)
+                logger.info(f"Using {_storage.name} storage backend")
+    return _storage
+
+
+def set_storage(storage: Optional[StorageBackend]) -> None:
+    """Replace the active backend (tests, benchmarks); None reverts to the configured one"""
+    global _storage
+    with _lock:
+        _storage = storage
+
+
+def save_emoji_click(event):
+    get_storage().save_emoji_click(event)
+
+def save_emoji_clicks(events):
+    get_storage().save_emoji_clicks(events)
+
+def get_user_emoji_clicks(user_id):
+    return get_storage().get_user_emoji_clicks(user_id)
+
+def get_emoji_counts(user_id, bucket):
+    return get_storage().get_emoji_counts(user_id, bucket)
+
+def stream_all_emoji_clicks():
+    return get_storage().stream_all_emoji_clicks()
+
+def set_emoji_counts(user_id, bucket, counts):
+    get_storage().set_emoji_counts(user_id, bucket, counts)
+
+def get_population_counts():
+    return get_storage().get_population_counts()
+
+def set_population_counts(bucket, counts):
+    get_storage().set_population_counts(bucket, counts)
+
+def update_progress(user_id, record, scopes, fold):
+    return get_storage().update_progress(user_id, record, scopes, fold)
+
+def get_progress_stats(user_id):
+    return get_storage().get_progress_stats(user_id)
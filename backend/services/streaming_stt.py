@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import queue
+from typing import AsyncIterator, Iterable, Iterator, Tuple
+
+from google.cloud import speech
+
+from core import config
+from core.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+ENCODINGS = {
+    "WEBM_OPUS": speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
+    "OGG_OPUS": speech.RecognitionConfig.AudioEncoding.OGG_OPUS,
+    "LINEAR16": speech.RecognitionConfig.AudioEncoding.LINEAR16,
+}
+
+
+class GoogleStreamingRecognizer:
+    """Adapts SpeechClient.streaming_recognize to (transcript, is_final) tuples.
+
+    Google reports one result per utterance segment; interim results only
+    carry the segment in progress, so finalized segments are accumulated
+    here and every tuple holds the full transcript so far.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def recognize(self, settings: dict, audio_chunks: Iterable[bytes]) -> Iterator[Tuple[str, bool]]:
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=ENCODINGS.get(settings.get("encoding", "WEBM_OPUS"), ENCODINGS["WEBM_OPUS"]),
+                sample_rate_hertz=int(settings.get("sample_rate", 48000)),
+                language_code=settings.get("language_code", "en-US"),
+                enable_automatic_punctuation=True,
+            ),
+            interim_results=True,
+        )
+        requests = (speech.StreamingRecognizeRequest(audio_content=chunk) for chunk in audio_chunks)
+
+        finalized = []
+        for response in self.client.streaming_recognize(config=streaming_config, requests=requests):
+            for result in response.results:
+                if not result.alternatives:
+                    continue
+                segment = result.alternatives[0].transcript.strip()
+                if result.is_final:
+                    finalized.append(segment)
+                    yield " ".join(finalized), True
+                else:
+                    yield " ".join(finalized + [segment]), False
+
+
+class StreamingSession:
+    """Bridges a blocking recognizer to asyncio for one WebSocket stream.
+
+    Audio chunks are handed to the recognizer thread through a bounded
+    thread-safe queue; transcripts come back through an asyncio queue. The
+    recognizer runs on the "stt_stream" executor, one thread per open stream.
+    """
+
+    _END = object()
+
+    def __init__(self, recognizer, settings: dict, max_buffered: int = config.STT_STREAM_MAX_BUFFERED_CHUNKS):
+        self.recognizer = recognizer
+        self.settings = settings
+        self._chunks: "queue.Queue" = queue.Queue(maxsize=max_buffered)
+        self._results: asyncio.Queue = asyncio.Queue()
+        self._abandoned = False
+        self._task = None
+
+    def _audio(self) -> Iterator[bytes]:
+        while not self._abandoned:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        def run():
+            try:
+                for item in self.recognizer.recognize(self.settings, self._audio()):
+                    loop.call_soon_threadsafe(self._results.put_nowait, item)
+            except Exception as e:
+                logger.error(f"Streaming recognition failed: {str(e)}")
+                loop.call_soon_threadsafe(self._results.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(self._results.put_nowait, self._END)
+
+        self._task = asyncio.ensure_future(run_blocking("stt_stream", run))
+
+    def feed(self, chunk: bytes) -> bool:
+        """Queue a chunk for the recognizer; False when it has fallen too far behind to take more"""
+        try:
+            self._chunks.put_nowait(chunk)
+        except queue.Full:
+            return False
+        return True
+
+    def close(self) -> None:
+        """Signal end of audio; the recognizer finishes and emits its final results"""
+        try:
+            self._chunks.put_nowait(None)
+        except queue.Full:
+            # Never block the event loop: drop the backlog, the recognizer stops at its next chunk
+            self._abandoned = True
+
+    async def results(self) -> AsyncIterator[Tuple[str, bool]]:
+        while True:
+            item = await self._results.get()
+            if item is self._END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        if self._task is not None:
+            await self._task
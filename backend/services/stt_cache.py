@@ -0,0 +1,68 @@
+import hashlib
+import json
+import threading
+from typing import Optional
+
+from core import config, metrics
+from core.cache import LRUCache
+
+
+def make_transcript_key(audio: bytes, recognition_config: dict) -> str:
+    """Fingerprint of the audio actually sent to STT plus every config field that affects the result.
+
+    Hashing the preprocessed audio rather than the upload means a retry
+    hits even if the client re-encoded the file header differently.
+    """
+    digest = hashlib.sha256(json.dumps(recognition_config, sort_keys=True).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(audio)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """Recently recognized transcripts, bounded by entry count, bytes and age"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.entries = LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl=ttl,
+            sizeof=lambda transcript: len(transcript.encode("utf-8")) + 64,  # + key
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        transcript = self.entries.get(key)
+        with self._lock:
+            if transcript is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return transcript
+
+    def put(self, key: str, transcript: str) -> None:
+        # Empty results are not cached; a retry gets a fresh attempt
+        if transcript:
+            self.entries.put(key, transcript)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.entries.total_bytes,
+        }
+
+
+stt_cache = TranscriptCache(
+    max_entries=config.STT_CACHE_MAX_ENTRIES,
+    max_bytes=config.STT_CACHE_MAX_BYTES,
+    ttl=config.STT_CACHE_TTL,
+)
+
+metrics.counter("neurospeak_stt_cache_hits_total", "Transcripts served from the STT cache").set_function(lambda: stt_cache.hits)
+metrics.counter("neurospeak_stt_cache_misses_total", "STT cache lookups that needed a recognize call").set_function(lambda: stt_cache.misses)
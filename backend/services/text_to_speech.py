@@ -1,32 +1,82 @@
 import os
+import logging
+from typing import Optional
 from google.cloud import texttospeech
 from dotenv import load_dotenv
+from services.tts_cache import tts_cache, make_cache_key
+from core.clients import get_client
 
 load_dotenv()
 
-client = texttospeech.TextToSpeechClient()
+logger = logging.getLogger(__name__)
 
-def synthesize_pronunciation(word: str, filename="output.mp3") -> str:
-    synthesis_input = texttospeech.SynthesisInput(text=word)
+DEFAULT_VOICE = "en-US-Neural2-F"
 
-    voice = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL,
+# Practice pronunciations use the default neutral en-US voice
+PRACTICE_VOICE = "en-US/NEUTRAL"
+
+def voice_selection(voice: str) -> texttospeech.VoiceSelectionParams:
+    if voice == PRACTICE_VOICE:
+        return texttospeech.VoiceSelectionParams(
+            language_code="en-US",
+            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL,
+        )
+
+    # Parse the voice name
+    voice_parts = voice.split("-")
+    if len(voice_parts) < 3:
+        # Default to US English female voice if format is incorrect
+        language_code = "en-US"
+        name = DEFAULT_VOICE
+        ssml_gender = texttospeech.SsmlVoiceGender.FEMALE
+        logger.info(f"Using default voice: {name}")
+    else:
+        language_code = f"{voice_parts[0]}-{voice_parts[1]}"
+        name = voice
+        # Determine gender from voice name
+        if "Female" in voice or "F" in voice_parts[2]:
+            ssml_gender = texttospeech.SsmlVoiceGender.FEMALE
+        else:
+            ssml_gender = texttospeech.SsmlVoiceGender.MALE
+        logger.info(f"Using specified voice: {name}")
+
+    return texttospeech.VoiceSelectionParams(
+        language_code=language_code,
+        name=name,
+        ssml_gender=ssml_gender
     )
 
+def synthesize_audio(client, text: str, voice: str = DEFAULT_VOICE, speaking_rate: float = 1.0, pitch: float = 0.0) -> bytes:
+    """One MP3 synthesis call; callers are responsible for caching the result"""
     audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3
+        audio_encoding=texttospeech.AudioEncoding.MP3,
+        speaking_rate=speaking_rate,
+        pitch=pitch
     )
-
+    # Timed by run_blocking, which every caller goes through
     response = client.synthesize_speech(
-        input=synthesis_input,
-        voice=voice,
+        input=texttospeech.SynthesisInput(text=text),
+        voice=voice_selection(voice),
         audio_config=audio_config
     )
+    return response.audio_content
+
+def pronunciation_cache_key(word: str) -> str:
+    return make_cache_key(word, PRACTICE_VOICE, 1.0, 0.0, "MP3")
+
+def lookup_pronunciation(word: str) -> Optional[str]:
+    """URL of already synthesized reference audio for `word`, without calling the API"""
+    cache_key = pronunciation_cache_key(word)
+    if tts_cache.contains(cache_key):
+        return tts_cache.url_for(cache_key)
+    return None
 
-    path = os.path.join("static", filename)
-    os.makedirs("static", exist_ok=True)
-    with open(path, "wb") as out:
-        out.write(response.audio_content)
+def synthesize_pronunciation(word: str) -> str:
+    cached_url = lookup_pronunciation(word)
+    if cached_url is not None:
+        return cached_url
 
-    return f"/static/{filename}"  # You can serve this file from FastAPI
\ No newline at end of file
+    audio_content = synthesize_audio(get_client("tts"), word, PRACTICE_VOICE)
+    cache_key = pronunciation_cache_key(word)
+    tts_cache.put(cache_key, audio_content)
+    return tts_cache.url_for(cache_key)  # Served by the /static mount in main.py
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from core import config, metrics
+from core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {"MP3": ".mp3", "OGG_OPUS": ".ogg", "LINEAR16": ".wav"}
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# How often request handlers re-stat the manifest to pick up a new prewarm run
+MANIFEST_RECHECK_SECONDS = 5.0
+
+
+def make_cache_key(text: str, voice: str, speaking_rate: float = 1.0, pitch: float = 0.0, encoding: str = "MP3") -> str:
+    """Content address for a synthesis request: identical inputs always map to the same audio"""
+    payload = json.dumps([text, voice, float(speaking_rate), float(pitch), encoding], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Two-tier cache for synthesized audio.
+
+    Hot entries live in an in-memory LRU; everything is also persisted under
+    `directory` as `<key><ext>`. Files are written to a temp file and renamed
+    into place, so concurrent workers never observe a partial file, and since
+    names are content addresses two workers racing on the same key write the
+    same bytes. The directory is kept under `max_disk_bytes` by evicting the
+    least recently used files (hits refresh the mtime).
+
+    `manifest.json` in the same directory lists audio pre-rendered by
+    `scripts.prewarm_tts`. Manifest entries are answered without touching
+    the file system and are never evicted.
+    """
+
+    def __init__(self, directory: str, max_disk_bytes: int, max_memory_bytes: int, max_memory_entries: int):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = LRUCache(max_entries=max_memory_entries, max_bytes=max_memory_bytes)
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self._manifest: Dict[str, dict] = {}
+        self._manifest_mtime: Optional[float] = None
+        self._manifest_checked = 0.0
+
+    def path_for(self, key: str, encoding: str = "MP3") -> str:
+        return os.path.join(self.directory, key + EXTENSIONS.get(encoding, ".bin"))
+
+    def url_for(self, key: str, encoding: str = "MP3") -> str:
+        relative = os.path.relpath(self.path_for(key, encoding), config.STATIC_DIR)
+        return "/static/" + relative.replace(os.sep, "/")
+
+    def load_manifest(self) -> Dict[str, dict]:
+        """Manifest entries by cache key, reloaded when the file changes"""
+        now = time.monotonic()
+        if self._manifest_mtime is not None and now - self._manifest_checked < MANIFEST_RECHECK_SECONDS:
+            return self._manifest
+        self._manifest_checked = now
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            self._manifest, self._manifest_mtime = {}, 0.0
+            return self._manifest
+        if mtime == self._manifest_mtime:
+            return self._manifest
+
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                data = json.load(f)
+            entries = data["entries"] if data.get("version") == MANIFEST_VERSION else {}
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Ignoring unreadable TTS manifest {self.manifest_path}: {str(e)}")
+            entries = {}
+        self._manifest, self._manifest_mtime = entries, mtime
+        logger.info(f"Loaded TTS manifest with {len(entries)} entries")
+        return entries
+
+    def save_manifest(self, entries: Dict[str, dict]) -> None:
+        payload = json.dumps({"version": MANIFEST_VERSION, "entries": entries}, indent=1, sort_keys=True, ensure_ascii=False)
+        self._write_atomic(self.manifest_path, payload.encode("utf-8"))
+        self._manifest_mtime = None
+
+    def get_from_memory(self, key: str) -> Optional[bytes]:
+        """Memory tier only; cheap enough to call on the event loop"""
+        audio = self.memory.get(key)
+        if audio is not None:
+            self.hits += 1
+        return audio
+
+    def get(self, key: str, encoding: str = "MP3") -> Optional[bytes]:
+        """Memory tier, then the file; blocking, so async callers go through run_blocking"""
+        audio = self.get_from_memory(key)
+        if audio is not None:
+            return audio
+
+        pinned = key in self.load_manifest()
+        path = self.path_for(key, encoding)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            if pinned:
+                logger.warning(f"TTS manifest entry {key[:12]} is missing its audio file")
+            self.misses += 1
+            return None
+
+        if not pinned:
+            self._touch(path)
+        self.memory.put(key, audio)
+        self.hits += 1
+        return audio
+
+    def contains(self, key: str, encoding: str = "MP3") -> bool:
+        """Whether url_for(key) can be served, i.e. the file is on disk (used when only a URL is needed).
+
+        The memory tier alone doesn't count, since another worker may have
+        evicted the file; in that case the file is rewritten from memory.
+        """
+        if key in self.load_manifest():
+            return True
+        path = self.path_for(key, encoding)
+        if os.path.exists(path):
+            self._touch(path)
+            return True
+        audio = self.memory.get(key)
+        if audio is None:
+            return False
+        self.put(key, audio, encoding)
+        return True
+
+    def put(self, key: str, audio: bytes, encoding: str = "MP3") -> str:
+        self.memory.put(key, audio)
+        path = self.path_for(key, encoding)
+        if os.path.exists(path):
+            return path
+
+        self._write_atomic(path, audio)
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(audio)
+            needs_eviction = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if needs_eviction:
+            self.evict()
+        return path
+
+    def write_pinned(self, key: str, audio: bytes, encoding: str = "MP3") -> str:
+        """Write a file for a manifest entry, bypassing the memory tier and eviction"""
+        path = self.path_for(key, encoding)
+        self._write_atomic(path, audio)
+        return path
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def evict(self) -> None:
+        """Rescan the directory and drop the oldest files until it fits within 90% of the cap.
+
+        Only cached audio counts towards the cap; files listed in the manifest are kept.
+        """
+        audio_extensions = tuple(EXTENSIONS.values())
+        pinned = self.load_manifest()
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.is_file() or not entry.name.endswith(audio_extensions):
+                        continue
+                    if os.path.splitext(entry.name)[0] in pinned:
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except FileNotFoundError:
+            total = 0
+
+        if total > self.max_disk_bytes:
+            target = int(self.max_disk_bytes * 0.9)
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    # Another worker evicted it first
+                    pass
+                total -= size
+                removed += 1
+            logger.info(f"Evicted {removed} TTS cache files, disk usage now {total} bytes")
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def _touch(self, path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+
+tts_cache = TTSCache(
+    directory=config.TTS_CACHE_DIR,
+    max_disk_bytes=config.TTS_CACHE_MAX_DISK_BYTES,
+    max_memory_bytes=config.TTS_CACHE_MAX_MEMORY_BYTES,
+    max_memory_entries=config.TTS_CACHE_MAX_MEMORY_ENTRIES,
+)
+
+metrics.counter("neurospeak_tts_cache_hits_total", "TTS audio served from the cache").set_function(lambda: tts_cache.hits)
+metrics.counter("neurospeak_tts_cache_misses_total", "TTS cache lookups that needed synthesis").set_function(lambda: tts_cache.misses)
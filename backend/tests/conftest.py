@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Tests import the app modules the same way main.py does (e.g. `from services...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeTTSClient, FaultInjector
+
+
+class RecordingTTSClient(FakeTTSClient):
+    """The benchmark fake, answering b"ID3" + the text so responses can be told apart.
+
+    Records the texts it was asked for and the peak number of overlapping calls.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0):
+        super().__init__(FaultInjector(latency_ms, error_rate=error_rate))
+        self.texts = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        return self.injector.calls
+
+    def synthesize_speech(self, input, voice, audio_config):
+        with self._lock:
+            self.texts.append(input.text)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            response = super().synthesize_speech(input, voice, audio_config)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        response.audio_content = b"ID3" + input.text.encode()
+        return response
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    # Fakes installed with core.clients.set_client, rate-limit buckets and circuit states don't leak between tests
+    yield
+    from core import admission, circuit_breaker, clients
+    clients.reset()
+    admission.reset()
+    circuit_breaker.reset()
+
+
+def _ebml(element_id, body):
+    return element_id + bytes([0x80 | len(body)]) + body
+
+
+def _webm(seconds, cluster_seconds=5):
+    # Just the elements MediaRecorder writes that matter for the duration: unknown-size Segment and Clusters
+    info = _ebml(b"\x15\x49\xa9\x66", _ebml(b"\x2a\xd7\xb1", (1_000_000).to_bytes(3, "big")))
+    clusters = b""
+    for start in range(0, int(seconds * 1000), cluster_seconds * 1000):
+        blocks = b"".join(
+            _ebml(b"\xa3", b"\x81" + offset.to_bytes(2, "big") + b"\x80" + b"\x00" * 20)
+            for offset in range(0, min(cluster_seconds * 1000, int(seconds * 1000) - start), 20)
+        )
+        clusters += b"\x1f\x43\xb6\x75\x01\xff\xff\xff\xff\xff\xff\xff" + _ebml(b"\xe7", start.to_bytes(4, "big")) + blocks
+    return _ebml(b"\x1a\x45\xdf\xa3", b"") + b"\x18\x53\x80\x67\x01\xff\xff\xff\xff\xff\xff\xff" + info + clusters
+
+
+@pytest.fixture
+def make_webm():
+    """Builds a WebM/Opus body of the given length in seconds, with silent 20 ms blocks"""
+    return _webm
+
+
+@pytest.fixture
+def fake_tts():
+    """Installs a RecordingTTSClient as the shared TTS client: fake_tts(latency_ms=..., error_rate=...)"""
+    from core import clients
+
+    def install(latency_ms: float = 0.0, error_rate: float = 0.0) -> RecordingTTSClient:
+        client = RecordingTTSClient(latency_ms, error_rate)
+        clients.set_client("tts", client)
+        return client
+
+    return install
+
+
+@pytest.fixture
+def tts_cache(monkeypatch, tmp_path):
+    """An empty TTS cache in tmp_path behind the /tts route"""
+    from routes import tts
+    from services.tts_cache import TTSCache
+
+    cache = TTSCache(str(tmp_path), 10**6, 10**6, 100)
+    monkeypatch.setattr(tts, "tts_cache", cache)
+    return cache
@@ -0,0 +1,104 @@
+import io
+import os
+import struct
+import wave
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import speech
+from utils.acoustics import AcousticAnalyzer, analyze_wav
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RATE = 48000
+
+
+def tone(ms, f0=180.0, level=0.3):
+    t = np.arange(int(RATE * ms / 1000)) / RATE
+    # A few harmonics with a rise-and-fall envelope, roughly like a sung syllable
+    signal = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 5))
+    return (level * np.hanning(len(t)) ** 0.5 * signal / 2).astype(np.float32)
+
+
+def silence(ms):
+    return np.zeros(int(RATE * ms / 1000), dtype=np.float32)
+
+
+def synthetic_utterance():
+    # 300 ms lead-in, then three 250 ms syllables separated by 400 ms pauses
+    return np.concatenate([silence(300), tone(250), silence(400), tone(250), silence(400), tone(250), silence(200)])
+
+
+def to_wav(samples, rate=RATE):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def test_features_of_a_synthetic_utterance():
+    analyzer = AcousticAnalyzer(RATE)
+    analyzer.feed(synthetic_utterance())
+    features = analyzer.summary()
+
+    assert abs(features["pitch"]["mean"] - 180) < 5
+    assert features["voicing"]["voiced_ratio"] > 0.9
+    assert features["pauses"]["count"] == 2
+    assert all(abs(pause["duration_ms"] - 400) <= 60 for pause in features["pauses"]["items"])
+    assert abs(features["pauses"]["leading_silence_ms"] - 300) <= 60
+    assert features["rate"]["syllables"] == 3
+    assert -30 < features["loudness"]["mean"] < -10
+
+
+def test_chunked_input_matches_whole_file():
+    data = to_wav(synthetic_utterance())
+    whole = analyze_wav(data, chunk_size=len(data))
+    # Odd chunk sizes split samples, frames and the WAV header
+    assert analyze_wav(data, chunk_size=1001) == whole
+    assert analyze_wav(data, chunk_size=7) == whole
+
+
+def test_pitch_contour_stays_bounded_for_long_input():
+    analyzer = AcousticAnalyzer(16000)
+    chunk = np.sin(2 * np.pi * 150 * np.arange(16000) / 16000).astype(np.float32) * 0.3
+    for _ in range(60):
+        analyzer.feed(chunk)
+    features = analyzer.summary()
+    assert features["duration_ms"] == 60000
+    assert len(features["pitch"]["contour"]) < 500
+    assert features["pitch"]["contour_step_ms"] > 10
+
+
+def test_acoustics_endpoint():
+    app = FastAPI()
+    app.include_router(speech.router)
+    client = TestClient(app)
+
+    with open(os.path.join(BACKEND_DIR, "recording.wav"), "rb") as f:
+        response = client.post("/speech/acoustics", content=f.read(), headers={"Content-Type": "audio/wav"})
+    assert response.status_code == 200
+    features = response.json()
+    assert features["duration_ms"] == 2987
+    assert features["speech_ms"] > 0
+    assert features["pitch"]["contour"]
+
+    assert client.post("/speech/acoustics", content=b"OggS" + b"\0" * 100).status_code == 415
+
+
+@pytest.mark.parametrize("rate", [0, 4000])
+def test_sample_rates_below_minimum_are_rejected(rate):
+    with pytest.raises(ValueError):
+        AcousticAnalyzer(rate)
+
+    data = bytearray(to_wav(synthetic_utterance()))
+    # The canonical 44-byte header keeps the sample rate at offset 24
+    struct.pack_into("<I", data, 24, rate)
+    app = FastAPI()
+    app.include_router(speech.router)
+    response = TestClient(app).post("/speech/acoustics", content=bytes(data), headers={"Content-Type": "audio/wav"})
+    assert response.status_code == 415
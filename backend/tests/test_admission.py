@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import admission
+from core.admission import AdmissionRejected, BackendQueue, UserRateLimiter
+from routes import tts
+
+
+@pytest.fixture
+def client(fake_tts, tts_cache):
+    fake_tts()
+    app = FastAPI()
+    app.include_router(tts.router)
+    return TestClient(app)
+
+
+async def accept_any_token(token):
+    return {"sub": token}
+
+
+def test_user_bucket_limits_only_the_noisy_user(client, monkeypatch):
+    monkeypatch.setattr(admission, "verify_google_id_token", accept_any_token)
+    monkeypatch.setattr(admission, "user_limiter", UserRateLimiter(rate=0.5, burst=2, max_users=100))
+
+    noisy = {"Authorization": "Bearer noisy"}
+    statuses = [client.post("/tts", json={"text": f"word {i}"}, headers=noisy) for i in range(3)]
+    assert [r.status_code for r in statuses] == [200, 200, 429]
+    assert statuses[-1].headers["Retry-After"] == "2"
+
+    assert client.post("/tts", json={"text": "hello"}, headers={"Authorization": "Bearer quiet"}).status_code == 200
+
+
+def test_rotating_unverified_ids_share_the_address_bucket(client, monkeypatch):
+    monkeypatch.setattr(admission, "address_limiter", UserRateLimiter(rate=0.5, burst=3, max_users=100))
+
+    statuses = [
+        client.post("/tts", json={"text": f"word {i}"}, headers={"X-User-Id": f"user{i}"}).status_code
+        for i in range(5)
+    ]
+    assert statuses == [200, 200, 200, 429, 429]
+    assert list(admission.address_limiter._buckets) == ["ip:testclient"]
+
+
+def test_full_backend_queue_answers_429_instead_of_mock(client, monkeypatch):
+    monkeypatch.setitem(admission._queues, "tts", BackendQueue("tts", max_concurrency=0, max_queue=0, timeout=1))
+
+    response = client.post("/tts", json={"text": "hello"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_queue_is_bounded_fifo_with_timeout():
+    queue = BackendQueue("stt", max_concurrency=1, max_queue=2, timeout=0.2)
+    order = []
+
+    async def worker(name, hold):
+        async with queue.slot():
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def main():
+        holder = asyncio.create_task(worker("first", 0.1))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(worker(name, 0.3)) for name in ("second", "third")]
+        await asyncio.sleep(0)
+        # Slot taken and both queue places used: turned away immediately
+        with pytest.raises(AdmissionRejected) as rejected:
+            await queue.acquire()
+        assert rejected.value.detail.startswith("Too many requests (stt: queue_full)")
+        results = await asyncio.gather(holder, *waiters, return_exceptions=True)
+        return results
+
+    results = asyncio.run(main())
+    # "second" got the slot handed over; "third" waited past the timeout behind it
+    assert order == ["first", "second"]
+    assert isinstance(results[2], AdmissionRejected)
+    assert "queue_timeout" in results[2].detail
+    assert queue.in_flight == 0
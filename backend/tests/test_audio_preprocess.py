@@ -0,0 +1,107 @@
+import io
+import os
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from utils.audio_preprocess import UnsupportedAudio, compressed_duration_seconds, parse_wav_header, prepare_audio, sniff_container
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_wav(samples, rate, channels=1):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes((np.asarray(samples) * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def test_checked_in_recording_is_trimmed_and_downsampled():
+    with open(os.path.join(BACKEND_DIR, "recording.wav"), "rb") as f:
+        data = f.read()
+
+    prepared = prepare_audio(data)
+
+    assert prepared.container == "wav"
+    assert prepared.config_kwargs() == {"encoding": "LINEAR16", "sample_rate_hertz": 16000}
+    assert prepared.trimmed_ms > 1000
+    assert prepared.bytes_out < prepared.bytes_in / 3
+
+
+def test_silence_padding_removed_around_tone():
+    rate = 48000
+    t = np.arange(rate // 2) / rate
+    tone = 0.5 * np.sin(2 * np.pi * 220 * t)
+    silence = np.zeros(rate)
+    prepared = prepare_audio(make_wav(np.concatenate([silence, tone, silence]), rate))
+
+    kept_seconds = prepared.bytes_out / 2 / 16000
+    assert 0.5 <= kept_seconds <= 0.9
+    assert 1600 <= prepared.trimmed_ms <= 2000
+
+
+def test_stereo_is_downmixed():
+    rate = 16000
+    tone = 0.3 * np.sin(2 * np.pi * 440 * np.arange(rate) / rate)
+    interleaved = np.stack([tone, tone], axis=1).reshape(-1)
+    data = make_wav(interleaved, rate, channels=2)
+
+    assert parse_wav_header(data).channels == 2
+    prepared = prepare_audio(data)
+    assert prepared.channels == 1
+    assert prepared.sample_rate == 16000
+
+
+def test_compressed_formats_pass_through():
+    webm = b"\x1a\x45\xdf\xa3" + b"\x00" * 64
+    assert sniff_container(webm) == "webm"
+    prepared = prepare_audio(webm)
+    assert prepared.content == webm
+    assert prepared.config_kwargs() == {"encoding": "WEBM_OPUS", "sample_rate_hertz": 48000}
+
+    ogg = b"OggS" + b"\x00" * 24 + b"OpusHead\x01\x01\x00\x00" + (16000).to_bytes(4, "little") + b"\x00" * 8
+    assert prepare_audio(ogg).config_kwargs() == {"encoding": "OGG_OPUS", "sample_rate_hertz": 16000}
+
+
+def test_compressed_durations_are_read_from_the_container(make_webm):
+    assert abs(compressed_duration_seconds(make_webm(12)) - 12) < 0.05
+    # A recording cut off mid-block still reports what it got to
+    assert abs(compressed_duration_seconds(make_webm(12)[:-10]) - 12) < 0.05
+
+    opus_head = b"OggS" + b"\x00" * 24 + b"OpusHead\x01\x01" + (312).to_bytes(2, "little") + b"\x00" * 12
+    last_page = b"OggS\x00\x04" + (48000 * 90 + 312).to_bytes(8, "little") + b"\x00" * 30
+    assert compressed_duration_seconds(opus_head + b"\x00" * 1000 + last_page) == 90
+
+    streaminfo = (16000 << 44 | 1 << 41 | 15 << 36 | 16000 * 75).to_bytes(8, "big")
+    flac = b"fLaC\x00\x00\x00\x22" + b"\x00" * 10 + streaminfo + b"\x00" * 16
+    assert compressed_duration_seconds(flac) == 75
+
+    assert compressed_duration_seconds(b"\x1a\x45\xdf\xa3" + b"\x00" * 64) is None
+
+
+def test_pass_through_keeps_the_upload_buffer(make_webm):
+    view = memoryview(make_webm(2))
+    assert prepare_audio(view).content is view
+
+
+def test_undecoded_wav_leaves_the_encoding_to_its_header():
+    fmt = struct.pack("<HHIIHH", 7, 1, 8000, 8000, 1, 8)  # mu-law
+    body = b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", 800) + b"\xff" * 800
+    mulaw = b"RIFF" + struct.pack("<I", 4 + len(body)) + b"WAVE" + body
+    assert prepare_audio(mulaw).config_kwargs() == {}
+
+
+@pytest.mark.parametrize("data", [
+    b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\x00" * 64,  # MP3
+    b"\x00\x00\x00\x20ftypM4A " + b"\x00" * 64,  # MP4/AAC
+    b"not audio at all",
+    b"RIFF\x10\x00\x00\x00WAVEjunk\x00\x00\x00\x00",  # WAV without fmt/data
+])
+def test_unsupported_containers_are_rejected(data):
+    with pytest.raises(UnsupportedAudio):
+        prepare_audio(data)
@@ -0,0 +1,157 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwk, jwt
+
+from core import http
+from core.admission import rate_limit
+from routes import auth
+from services import google_oauth
+from services.google_oauth import InvalidIDToken, JWKSCache, verify_google_id_token
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+
+def make_key(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = dict(jwk.construct(public_pem, "RS256").to_dict(), kid=kid, use="sig")
+    return private_pem, public_jwk
+
+
+def sign(private_pem, kid, **overrides):
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "1234",
+        "email": "learner@example.com",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+class FakeGoogle:
+    """Serves the JWKS and token endpoints from memory"""
+
+    def __init__(self, *keys):
+        self.keys = list(keys)
+        self.id_token = None
+        self.requests = []
+
+    def handler(self, request):
+        self.requests.append(request.url.path)
+        if request.url.path == "/oauth2/v3/certs":
+            return httpx.Response(200, json={"keys": self.keys}, headers={"Cache-Control": "public, max-age=600"})
+        return httpx.Response(200, json={"id_token": self.id_token})
+
+
+@pytest.fixture
+def google(monkeypatch):
+    monkeypatch.setattr(google_oauth, "GOOGLE_CLIENT_ID", CLIENT_ID)
+    private_pem, public_jwk = make_key("k1")
+    fake = FakeGoogle(public_jwk)
+    fake.private_pem = private_pem
+    http.set_http_client(httpx.AsyncClient(transport=httpx.MockTransport(fake.handler)))
+    yield fake
+    http.set_http_client(None)
+
+
+def test_verifies_locally_after_one_fetch(google):
+    jwks = JWKSCache(min_refresh_interval=0)
+
+    async def main():
+        for _ in range(5):
+            claims = await verify_google_id_token(sign(google.private_pem, "k1"), jwks=jwks)
+            assert claims["email"] == "learner@example.com"
+
+    asyncio.run(main())
+    assert jwks.fetches == 1
+
+
+def test_unknown_kid_refetches_for_rotated_keys(google):
+    jwks = JWKSCache(min_refresh_interval=0)
+    rotated_pem, rotated_jwk = make_key("k2")
+
+    async def main():
+        await verify_google_id_token(sign(google.private_pem, "k1"), jwks=jwks)
+        google.keys.append(rotated_jwk)
+        return await verify_google_id_token(sign(rotated_pem, "k2"), jwks=jwks)
+
+    assert asyncio.run(main())["sub"] == "1234"
+    assert jwks.fetches == 2
+
+
+def test_rejects_bad_tokens(google):
+    jwks = JWKSCache(min_refresh_interval=60)
+    forged_pem, _ = make_key("k1")
+    bad_tokens = [
+        sign(google.private_pem, "k1", aud="someone-else"),
+        sign(google.private_pem, "k1", iss="https://evil.example.com"),
+        sign(google.private_pem, "k1", exp=int(time.time()) - 10),
+        sign(forged_pem, "k1"),
+        sign(google.private_pem, "missing"),
+        sign(google.private_pem, "missing-again"),
+        "not-a-jwt",
+    ]
+
+    async def main():
+        for token in bad_tokens:
+            with pytest.raises(InvalidIDToken):
+                await verify_google_id_token(token, jwks=jwks)
+
+    asyncio.run(main())
+    # Unknown key ids within the refresh interval don't refetch
+    assert jwks.fetches == 1
+
+
+def test_callback_uses_shared_client_and_verifies(google, monkeypatch):
+    monkeypatch.setattr(google_oauth, "google_jwks", JWKSCache())
+    app = FastAPI()
+    app.include_router(auth.router)
+    client = TestClient(app)
+
+    google.id_token = sign(google.private_pem, "k1")
+    response = client.get("/auth/callback", params={"code": "abc"})
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == "learner@example.com"
+
+    google.id_token = sign(google.private_pem, "k1", aud="someone-else")
+    assert client.get("/auth/callback", params={"code": "abc"}).status_code == 401
+    assert google.requests == ["/token", "/oauth2/v3/certs", "/token"]
+
+
+def test_rate_limit_identity_uses_verified_token(google, monkeypatch):
+    monkeypatch.setattr(google_oauth, "google_jwks", JWKSCache())
+    app = FastAPI()
+
+    @app.get("/whoami")
+    def whoami(identity: str = Depends(rate_limit)):
+        return {"identity": identity}
+
+    client = TestClient(app)
+    token = sign(google.private_pem, "k1")
+
+    # A verified account is one bucket whatever X-User-Id claims
+    for spoofed in ("alice", "bob"):
+        response = client.get("/whoami", headers={"Authorization": f"Bearer {token}", "X-User-Id": spoofed})
+        assert response.json()["identity"] == "user:1234"
+
+    # Without a valid token the caller is limited by address, whatever it claims
+    forged = sign(make_key("k1")[0], "k1")
+    response = client.get("/whoami", headers={"Authorization": f"Bearer {forged}", "X-User-Id": "1234"})
+    assert response.json()["identity"] == "ip:testclient"
+    assert client.get("/whoami", headers={"X-User-Id": "5678"}).json()["identity"] == "ip:testclient"
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import circuit_breaker
+from core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from routes import tts
+
+
+def make_breaker(**overrides):
+    options = dict(deadline=0.05, slow_call_seconds=0.02, window=10, min_calls=4, failure_rate=0.5, open_seconds=0.1, half_open_probes=1)
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+async def attempt(breaker, make_call):
+    async with breaker.guard() as guarded:
+        return await guarded.call(make_call())
+
+
+async def fail():
+    raise ConnectionError("unavailable")
+
+
+def test_opens_on_failures_then_probes_and_closes():
+    breaker = make_breaker()
+
+    async def main():
+        for _ in range(4):
+            with pytest.raises(ConnectionError):
+                await attempt(breaker, fail)
+        assert breaker.state == OPEN
+
+        started = time.perf_counter()
+        with pytest.raises(CircuitOpen) as rejected:
+            await attempt(breaker, lambda: asyncio.sleep(0))
+        assert time.perf_counter() - started < 0.05
+        assert rejected.value.status_code == 503
+
+        await asyncio.sleep(0.1)
+        assert breaker.available()
+        await attempt(breaker, lambda: asyncio.sleep(0))
+        assert breaker.state == CLOSED
+
+    asyncio.run(main())
+
+
+def test_deadline_misses_and_slow_calls_count_as_failures():
+    breaker = make_breaker(min_calls=2, failure_rate=1.0)
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await attempt(breaker, lambda: asyncio.sleep(1))
+        # Completes within the deadline but over the slow-call threshold
+        await attempt(breaker, lambda: asyncio.sleep(0.03))
+        assert breaker.state == OPEN
+
+        # A failed half-open probe opens the circuit again
+        await asyncio.sleep(0.1)
+        with pytest.raises(ConnectionError):
+            await attempt(breaker, fail)
+        assert breaker.state == OPEN
+
+    asyncio.run(main())
+
+
+def test_open_tts_circuit_serves_mock_without_calling_google(fake_tts, tts_cache, monkeypatch):
+    client = fake_tts(error_rate=1.0)
+    monkeypatch.setitem(circuit_breaker.breakers, "tts", CircuitBreaker("tts", deadline=1, slow_call_seconds=1, min_calls=3))
+    app = FastAPI()
+    app.include_router(tts.router)
+    http = TestClient(app)
+
+    for i in range(5):
+        response = http.post("/tts", json={"text": f"word {i}"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/mp3"
+
+    # The first three failures opened the circuit; the rest never reached the client
+    assert client.calls == 3
+    assert circuit_breaker.health()["tts"]["state"] == OPEN
+    assert circuit_breaker.health()["stt"]["state"] == CLOSED
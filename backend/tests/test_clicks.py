@@ -0,0 +1,160 @@
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from schemas.emoji_click import EmojiClickEvent
+from services.click_ingest import ClickIngestor, IngestQueueFull
+from services.firestore import FirestoreStorage
+
+
+class RecordingWriter:
+    def __init__(self, block=None):
+        self.batches = []
+        self.block = block
+
+    def __call__(self, events):
+        if self.block is not None:
+            self.block.wait()
+        self.batches.append(list(events))
+
+
+def click(i):
+    return EmojiClickEvent(user_id="u1", emoji=f"e{i}", timestamp=datetime(2025, 1, 1, 9, 0))
+
+
+def test_flushes_when_batch_size_reached():
+    writer = RecordingWriter()
+
+    async def main():
+        ingestor = ClickIngestor(writer, batch_size=5, flush_interval=10, max_pending=100)
+        await ingestor.submit_many([click(i) for i in range(10)])
+        for _ in range(100):
+            if len(writer.batches) == 2:
+                break
+            await asyncio.sleep(0.01)
+        await ingestor.stop()
+
+    asyncio.run(main())
+    assert [len(b) for b in writer.batches] == [5, 5]
+
+
+def test_flushes_after_interval():
+    writer = RecordingWriter()
+
+    async def main():
+        ingestor = ClickIngestor(writer, batch_size=100, flush_interval=0.05, max_pending=100)
+        await ingestor.submit(click(1))
+        await asyncio.sleep(0.3)
+        flushed = len(writer.batches)
+        await ingestor.stop()
+        return flushed
+
+    assert asyncio.run(main()) == 1
+    assert [e.emoji for e in writer.batches[0]] == ["e1"]
+
+
+def test_stop_flushes_pending_events():
+    writer = RecordingWriter()
+
+    async def main():
+        ingestor = ClickIngestor(writer, batch_size=3, flush_interval=10, max_pending=100)
+        await ingestor.submit_many([click(i) for i in range(7)])
+        await ingestor.stop()
+
+    asyncio.run(main())
+    assert sorted(e.emoji for b in writer.batches for e in b) == sorted(f"e{i}" for i in range(7))
+
+
+def test_backpressure_when_buffer_full():
+    release = threading.Event()
+    writer = RecordingWriter(block=release)
+
+    async def main():
+        ingestor = ClickIngestor(writer, batch_size=1, flush_interval=0, max_pending=2, enqueue_timeout=0.05)
+        await ingestor.submit(click(0))
+        await asyncio.sleep(0.05)  # the flusher takes click 0 and blocks in the writer
+        await ingestor.submit_many([click(1), click(2)])
+        with pytest.raises(IngestQueueFull):
+            await ingestor.submit(click(3))
+        release.set()
+        await ingestor.stop()
+
+    asyncio.run(main())
+    assert sum(len(b) for b in writer.batches) == 3
+
+
+def test_batch_that_does_not_fit_is_refused_whole():
+    writer = RecordingWriter()
+
+    async def main():
+        ingestor = ClickIngestor(writer, batch_size=10, flush_interval=10, max_pending=5)
+        with pytest.raises(IngestQueueFull):
+            await ingestor.submit_many([click(i) for i in range(6)])
+        assert ingestor.pending == 0
+        await ingestor.submit_many([click(i) for i in range(5)])
+        await ingestor.stop()
+
+    asyncio.run(main())
+    assert sum(len(b) for b in writer.batches) == 5
+
+
+class FlakyBatch:
+    def __init__(self, db):
+        self.db = db
+        self.sets = []
+
+    def set(self, ref, data, merge=False):
+        self.sets.append((ref, data))
+
+    def commit(self):
+        assert len(self.sets) <= 500, "Firestore rejects batches of more than 500 writes"
+        self.db.commits += 1
+        if self.db.commits in self.db.fail_commits:
+            raise ConnectionError("deadline exceeded")
+        self.db.committed.extend(self.sets)
+
+
+class FlakyFirestore:
+    """Just enough of the Firestore client for save_emoji_clicks; the listed commits fail"""
+
+    def __init__(self, fail_commits):
+        self.fail_commits = set(fail_commits)
+        self.commits = 0
+        self.committed = []
+
+    def batch(self):
+        return FlakyBatch(self)
+
+    def collection(self, name):
+        class Collection:
+            def document(self, doc_id=None):
+                return (name, doc_id)
+
+        return Collection()
+
+
+def test_failed_chunk_is_retried_without_reapplying_committed_counters():
+    db = FlakyFirestore(fail_commits=[2])
+    storage = FirestoreStorage(client=db)
+    events = [click(i % 3) for i in range(600)]
+
+    async def main():
+        ingestor = ClickIngestor(storage.save_emoji_clicks, batch_size=1000, flush_interval=0, max_pending=1000)
+        await ingestor.submit_many(events)
+        await ingestor.stop()
+        return ingestor
+
+    ingestor = asyncio.run(main())
+    assert ingestor.written == 600 and ingestor.dropped == 0
+    clicks = [data for ref, data in db.committed if ref[0] == "emoji_clicks"]
+    assert len(clicks) == 600
+    counted = sum(
+        increment.value for ref, data in db.committed if ref[0] == "emoji_counters" for increment in data["counts"].values()
+    )
+    assert counted == 600
+    population = sum(
+        increment.value for ref, data in db.committed if ref[0] == "population_counters" for increment in data["counts"].values()
+    )
+    assert population == 600
@@ -0,0 +1,76 @@
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from core.compression import CompressionMiddleware, choose_encoding
+from core.responses import FastJSONResponse
+
+AUDIO = b"\xff\xfb" + b"\x00" * 4000
+
+
+def make_client():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return {"words": [{"word": "butterfly", "score": np.float64(87.5)}] * 200}
+
+    @app.get("/small")
+    def small():
+        return {"status": "ok"}
+
+    @app.get("/audio")
+    def audio():
+        return Response(AUDIO, media_type="audio/mp3")
+
+    return TestClient(app)
+
+
+def test_choose_encoding_respects_q_values():
+    assert choose_encoding("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.5", ("br", "gzip")) == "gzip"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+    assert choose_encoding("*", ("gzip",)) == "gzip"
+
+
+def test_large_json_is_compressed_and_decodes():
+    client = make_client()
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json()["words"][0] == {"word": "butterfly", "score": 87.5}
+
+
+def test_small_audio_and_unaccepted_responses_are_not_compressed():
+    client = make_client()
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+    audio = client.get("/audio", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in audio.headers
+    assert audio.content == AUDIO
+
+
+def test_app_routes_render_with_orjson(monkeypatch):
+    import main
+
+    rendered = []
+    render = FastJSONResponse.render
+
+    def counting_render(self, content):
+        rendered.append(content)
+        return render(self, content)
+
+    monkeypatch.setattr(FastJSONResponse, "render", counting_render)
+    client = TestClient(main.app)
+
+    assert client.get("/").json()["status"] == "online"
+    # Routes with a response_model go through the same class
+    response = client.post("/practice/score-batch", json={"pairs": [{"expected": "coffee", "spoken": "coffee"}]})
+    assert response.json()["results"][0]["status"] == "perfect"
+    assert len(rendered) == 2
+    # Non-str keys and NumPy scalars: only the orjson path can encode these
+    assert FastJSONResponse({1: np.float32(0.5)}).body == b'{"1":0.5}'
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from core import executor
+from routes import tts
+
+
+def run_requests(count):
+    async def main():
+        requests = [tts.TTSRequest(text=f"word {i}") for i in range(count)]
+        return await asyncio.gather(*(tts.text_to_speech(r) for r in requests))
+
+    return asyncio.run(main())
+
+
+def test_slow_tts_calls_overlap(fake_tts, tts_cache):
+    client = fake_tts(latency_ms=200)
+    executor.configure_backend("tts", 8)
+
+    started = time.perf_counter()
+    responses = run_requests(8)
+    elapsed = time.perf_counter() - started
+
+    assert [r.body for r in responses] == [b"ID3" + f"word {i}".encode() for i in range(8)]
+    assert client.peak == 8
+    # Serialized on the event loop this would take 8 * 0.2s
+    assert elapsed < 0.8
+
+
+def test_backend_concurrency_limit(fake_tts, tts_cache):
+    client = fake_tts(latency_ms=50)
+    executor.configure_backend("tts", 2)
+
+    run_requests(6)
+
+    assert client.peak == 2
+
+
+def test_event_loop_stays_responsive():
+    executor.configure_backend("stt", 1)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await executor.run_blocking("stt", time.sleep, 0.2)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 10
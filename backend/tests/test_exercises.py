@@ -0,0 +1,42 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import speech
+
+app = FastAPI()
+app.include_router(speech.router)
+client = TestClient(app)
+
+
+def test_filters_match_previous_behaviour():
+    everything = client.get("/speech/exercises").json()
+    assert [ex["id"] for ex in everything] == ["ex1", "ex2", "ex3", "ex4", "ex5"]
+
+    medium_general = client.get("/speech/exercises", params={"difficulty": "medium", "category": "general"}).json()
+    assert [ex["id"] for ex in medium_general] == ["ex2"]
+
+    by_word = client.get("/speech/exercises", params={"word": "need"}).json()
+    assert [ex["id"] for ex in by_word] == ["ex3", "ex4"]
+
+
+def test_cursor_pagination_walks_all_pages():
+    seen, params = [], {"limit": 2}
+    while True:
+        response = client.get("/speech/exercises", params=params)
+        seen.extend(ex["id"] for ex in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params = {"limit": 2, "cursor": cursor}
+    assert seen == ["ex1", "ex2", "ex3", "ex4", "ex5"]
+
+    assert client.get("/speech/exercises", params={"cursor": "not a cursor!"}).status_code == 400
+
+
+def test_conditional_get_returns_304():
+    first = client.get("/speech/exercises")
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    assert client.get("/speech/exercises", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/speech/exercises", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/speech/exercises", headers={"If-None-Match": '"stale"'}).status_code == 200
@@ -0,0 +1,40 @@
+import json
+
+from core import config
+from scripts.build_lexicon import collect_words
+from utils import lexicon
+from utils.lexicon import LEXICON_VERSION, get_syllables, load_lexicon, syllabify, write_lexicon
+
+
+def test_lookup_prefers_the_lexicon(monkeypatch):
+    monkeypatch.setattr(lexicon, "_lexicon", {"butterfly": ("but", "ter", "fly")})
+    assert get_syllables("butterfly") == ("but", "ter", "fly")
+
+
+def test_unknown_words_fall_back_to_rules_and_are_memoized(monkeypatch):
+    monkeypatch.setattr(lexicon, "_lexicon", {})
+    word = "zzyzxquorble"
+    first = get_syllables(word)
+    assert first == syllabify(word)
+    assert "".join(first) == word
+    # Served from the memo: the very same tuple
+    assert get_syllables(word) is first
+    assert get_syllables("") == ()
+
+
+def test_write_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "lexicon.json")
+    assert write_lexicon(path, ["coffee", "computer", "coffee"]) == 2
+    assert load_lexicon(path) == {"coffee": syllabify("coffee"), "computer": syllabify("computer")}
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": LEXICON_VERSION + 1, "syllables": {"coffee": "cof|fee"}}, f)
+    assert load_lexicon(path) == {}
+    assert load_lexicon(str(tmp_path / "missing.json")) == {}
+
+
+def test_shipped_lexicon_is_up_to_date(tmp_path):
+    # data/lexicon.json must be rebuilt (python -m scripts.build_lexicon) when the catalog changes
+    path = str(tmp_path / "lexicon.json")
+    write_lexicon(path, collect_words())
+    assert load_lexicon(config.LEXICON_PATH) == load_lexicon(path)
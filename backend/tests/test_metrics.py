@@ -0,0 +1,79 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import metrics
+from core.executor import run_blocking
+from services.text_to_speech import synthesize_audio
+
+
+def sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not in output")
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = metrics.Histogram("test_seconds", "Test", ("op",), buckets=(0.1, 1.0))
+    child = hist.labels("a")
+    for value in (0.05, 0.5, 5.0):
+        child.observe(value)
+
+    text = hist.render()
+    assert sample(text, 'test_seconds_bucket{op="a",le="0.1"}') == 1
+    assert sample(text, 'test_seconds_bucket{op="a",le="1"}') == 2
+    assert sample(text, 'test_seconds_bucket{op="a",le="+Inf"}') == 3
+    assert sample(text, 'test_seconds_count{op="a"}') == 3
+    assert sample(text, 'test_seconds_sum{op="a"}') == 5.55
+
+
+def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.post("/echo/{name}")
+    async def echo(name: str):
+        return {"name": name}
+
+    client = TestClient(app)
+    for name in ("a", "b"):
+        assert client.post(f"/echo/{name}", content=b"x" * 10).status_code == 200
+    client.get("/nope")
+
+    text = metrics.REGISTRY.render()
+    assert sample(text, 'neurospeak_http_requests_total{method="POST",route="/echo/{name}",status="200"}') == 2
+    assert sample(text, 'neurospeak_http_request_duration_seconds_count{method="POST",route="/echo/{name}"}') == 2
+    assert sample(text, 'neurospeak_http_request_size_bytes_sum{route="/echo/{name}"}') == 20
+    assert sample(text, 'neurospeak_http_requests_total{method="GET",route="unmatched",status="404"}') >= 1
+
+
+def test_run_blocking_records_backend_calls_and_errors():
+    def flaky():
+        raise RuntimeError("down")
+
+    async def main():
+        await run_blocking("tts", len, b"abc")
+        try:
+            await run_blocking("tts", flaky)
+        except RuntimeError:
+            pass
+
+    before = metrics.BACKEND_CALL_ERRORS.labels("tts", "flaky").value
+    asyncio.run(main())
+
+    text = metrics.REGISTRY.render()
+    assert sample(text, 'neurospeak_backend_call_duration_seconds_count{backend="tts",operation="len"}') >= 1
+    assert metrics.BACKEND_CALL_ERRORS.labels("tts", "flaky").value == before + 1
+
+
+def test_tts_synthesis_is_timed_once(fake_tts):
+    def backend_calls(backend):
+        text = metrics.REGISTRY.render()
+        prefix = f'neurospeak_backend_call_duration_seconds_count{{backend="{backend}",'
+        return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(prefix))
+
+    before = backend_calls("tts")
+    asyncio.run(run_blocking("tts", synthesize_audio, fake_tts(), "hello"))
+    assert backend_calls("tts") == before + 1
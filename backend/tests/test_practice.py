@@ -0,0 +1,166 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import admission, circuit_breaker, clients
+from core.admission import BackendQueue
+from core.circuit_breaker import CLOSED, CircuitBreaker
+from core.timing import StageTimer
+from routes import practice
+from services import speech_to_text, text_to_speech
+from services.speech_to_text import prepare_transcription
+from services.stt_cache import TranscriptCache
+from services.text_to_speech import pronunciation_cache_key
+from services.tts_cache import TTSCache
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeSpeechClient:
+    def __init__(self, transcript, delay=0.0):
+        self.transcript = transcript
+        self.delay = delay
+        self.calls = 0
+
+    def recognize(self, config, audio):
+        self.calls += 1
+        time.sleep(self.delay)
+
+        class Alternative:
+            transcript = self.transcript
+
+        class Result:
+            alternatives = [Alternative()]
+
+        class Response:
+            results = [Result()]
+
+        return Response()
+
+
+def read_recording():
+    with open(os.path.join(BACKEND_DIR, "recording.wav"), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(practice, "stt_cache", TranscriptCache(max_entries=100, max_bytes=10**6, ttl=60))
+    monkeypatch.setattr(speech_to_text, "stt_cache", practice.stt_cache)
+    # The reference pronunciation is already cached, so no TTS call is made
+    tts_cache = TTSCache(str(tmp_path), 10**6, 10**6, 100)
+    tts_cache.put(pronunciation_cache_key("butterfly"), b"ID3butterfly")
+    monkeypatch.setattr(text_to_speech, "tts_cache", tts_cache)
+    app = FastAPI()
+    app.include_router(practice.router)
+    return TestClient(app)
+
+
+def word_check(client):
+    return client.post(
+        "/practice/word-check",
+        data={"word": "butterfly"},
+        files={"audio": ("attempt.wav", read_recording(), "audio/wav")},
+    )
+
+
+def test_missed_deadline_answers_503_with_retry_after(client, monkeypatch):
+    clients.set_client("speech", FakeSpeechClient("butterfly", delay=0.3))
+    monkeypatch.setitem(circuit_breaker.breakers, "stt", CircuitBreaker("stt", deadline=0.05, slow_call_seconds=0.05))
+
+    response = word_check(client)
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_cached_transcript_skips_slot_and_breaker(client, monkeypatch):
+    speech_client = FakeSpeechClient("butterfly")
+    clients.set_client("speech", speech_client)
+    # No STT slot available at all: only a cache hit can be answered
+    monkeypatch.setitem(admission._queues, "stt", BackendQueue("stt", max_concurrency=0, max_queue=0, timeout=1))
+    _, _, cache_key = prepare_transcription(read_recording())
+    practice.stt_cache.put(cache_key, "butterfly")
+
+    response = word_check(client)
+    assert response.status_code == 200
+    assert response.json()["spoken"] == "butterfly"
+    assert speech_client.calls == 0
+    assert circuit_breaker.health()["stt"]["recent_calls"] == 0
+
+
+def test_unsupported_recording_is_415(client):
+    speech_client = FakeSpeechClient("butterfly")
+    clients.set_client("speech", speech_client)
+
+    response = client.post(
+        "/practice/word-check",
+        data={"word": "butterfly"},
+        files={"audio": ("attempt.m4a", b"\x00\x00\x00\x20ftypM4A " + b"\x00" * 64, "audio/mp4")},
+    )
+    assert response.status_code == 415
+    assert speech_client.calls == 0
+
+
+def test_admission_wait_does_not_count_as_slow_call():
+    breaker = CircuitBreaker("test", deadline=1, slow_call_seconds=0.05, min_calls=2, failure_rate=0.5)
+    queue = BackendQueue("test", max_concurrency=1, max_queue=4, timeout=1)
+
+    async def call():
+        async with breaker.guard() as attempt:
+            async with queue.slot():
+                await attempt.call(asyncio.sleep(0.03))
+
+    async def main():
+        # Each call takes 0.03s but the later ones wait up to 0.09s for the slot
+        await asyncio.gather(*(call() for _ in range(4)))
+
+    asyncio.run(main())
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["recent_failures"] == 0
+
+
+def test_stage_timer_renders_server_timing():
+    timer = StageTimer()
+
+    async def main():
+        return await timer.measure("stt", asyncio.sleep(0.01, result="hello"))
+
+    assert asyncio.run(main()) == "hello"
+    with timer.stage("score"):
+        pass
+    timer.describe("stt", "recognized")
+
+    parts = timer.header().split(", ")
+    assert [part.split(";")[0] for part in parts] == ["stt", "score", "total"]
+    assert parts[0].endswith(';desc="recognized"')
+    assert float(parts[0].split("dur=")[1].split(";")[0]) >= 10
+    assert timer.header(total=None).count(",") == 1
+
+
+def server_timing(response):
+    stages = {}
+    for part in response.headers["Server-Timing"].split(", "):
+        name, *params = part.split(";")
+        stages[name] = dict(param.split("=", 1) for param in params)
+    return stages
+
+
+def test_word_check_reports_server_timing(client):
+    clients.set_client("speech", FakeSpeechClient("butterfly"))
+
+    response = word_check(client)
+    assert response.status_code == 200
+    stages = server_timing(response)
+    # STT and TTS run concurrently, so either may finish first
+    assert sorted(stages) == ["score", "stt", "total", "tts"]
+    assert list(stages)[-2:] == ["score", "total"]
+    assert stages["stt"]["desc"] == '"recognized"'
+    assert stages["tts"]["desc"] == '"cache"'
+    assert float(stages["total"]["dur"]) >= float(stages["stt"]["dur"])
+
+    # The same recording again is answered from the transcript cache
+    assert server_timing(word_check(client))["stt"]["desc"] == '"cache"'
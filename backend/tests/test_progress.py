@@ -0,0 +1,67 @@
+import statistics
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from logic import progress_stats
+from routes import practice, speech
+from services.sqlite_store import SQLiteStorage
+from services.storage import set_storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "test.db"), pool_size=2)
+    set_storage(storage)
+    yield storage
+    set_storage(None)
+    storage.close()
+
+
+@pytest.fixture
+def client(storage):
+    app = FastAPI()
+    app.include_router(speech.router)
+    app.include_router(practice.router)
+    return TestClient(app)
+
+
+def test_running_stats_match_batch_statistics():
+    scores = [40, 55.5, 70, 62, 90, 85]
+    stats = None
+    for i, score in enumerate(scores):
+        stats = progress_stats.add_score(stats, score, f"t{i}", window=4)
+
+    summary = progress_stats.summarize(stats)
+    assert summary["attempts"] == len(scores)
+    assert summary["mean"] == round(statistics.mean(scores), 2)
+    assert summary["variance"] == round(statistics.variance(scores), 2)
+    assert summary["best"] == 90
+    assert summary["recent"] == [70, 62, 90, 85]
+    assert summary["trend"] > 0
+
+
+def test_progress_is_persisted_and_aggregated(client, storage):
+    for exercise_id, score in [("ex1", 50), ("ex1", 70), ("ex2", 90)]:
+        response = client.post("/speech/progress", json={"user_id": "u1", "exercise_id": exercise_id, "score": score})
+        assert response.status_code == 200
+    assert response.json()["exercise"]["attempts"] == 1
+
+    client.post("/practice/session-complete", params={"user_id": "u1"}, json=[{"score": 60}, {"score": 80}])
+
+    progress = client.get("/speech/progress/u1").json()
+    assert progress["overall"]["attempts"] == 3
+    assert progress["overall"]["mean"] == 70
+    assert progress["exercises"]["ex1"]["best"] == 70
+    assert progress["exercises"]["ex1"]["trend"] == 20
+    assert progress["sessions"]["last"] == 70
+
+    with storage.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM progress_records").fetchone()[0] == 4
+
+
+def test_unknown_user_has_empty_progress(client):
+    progress = client.get("/speech/progress/nobody").json()
+    assert progress["overall"]["attempts"] == 0
+    assert progress["exercises"] == {}
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.time_utils import get_time_bucket
+from logic import population, recommend_engine
+from schemas.emoji_click import EmojiClickEvent
+from scripts.backfill_emoji_counters import count_clicks_by_bucket
+from services.sqlite_store import SQLiteStorage
+from services.storage import set_storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "test.db"), pool_size=2)
+    set_storage(storage)
+    yield storage
+    set_storage(None)
+    storage.close()
+
+
+def clicks(user_id, emojis, when):
+    return [EmojiClickEvent(user_id=user_id, emoji=e, timestamp=when) for e in emojis]
+
+
+def other_bucket_time(now):
+    for hours in range(1, 24):
+        candidate = now + timedelta(hours=hours)
+        if get_time_bucket(candidate) != get_time_bucket(now):
+            return candidate
+
+
+def test_recommends_most_clicked_in_current_bucket(storage):
+    now = datetime.now()
+    storage.save_emoji_clicks(clicks("u1", ["🍎", "🍎", "🍎", "💧", "💧", "😀"], now))
+    storage.save_emoji_clicks(clicks("u1", ["🚗"] * 10, other_bucket_time(now)))
+    storage.save_emoji_clicks(clicks("u2", ["🏠"] * 10, now))
+
+    assert recommend_engine.get_recommended_emojis("u1") == ["🍎", "💧", "😀"]
+    assert recommend_engine.get_recommended_emojis("u1", k=1) == ["🍎"]
+    assert recommend_engine.get_recommended_emojis("nobody") == []
+
+
+def test_counters_match_raw_click_history(storage):
+    now = datetime.now()
+    for emoji in ["🍎", "💧", "🍎"]:
+        storage.save_emoji_click(clicks("u1", [emoji], now)[0])
+    storage.save_emoji_clicks(clicks("u1", ["🚗", "🍎"], other_bucket_time(now)))
+
+    rebuilt = count_clicks_by_bucket(storage.get_user_emoji_clicks("u1"))
+    for (user_id, bucket), counts in rebuilt.items():
+        assert storage.get_emoji_counts(user_id, bucket) == dict(counts)
+
+
+def test_set_emoji_counts_overwrites(storage):
+    now = datetime.now()
+    bucket = get_time_bucket(now)
+    storage.save_emoji_clicks(clicks("u1", ["🍎", "💧"], now))
+    storage.set_emoji_counts("u1", bucket, {"😀": 4})
+
+    assert storage.get_emoji_counts("u1", bucket) == {"😀": 4}
+
+
+def test_sparse_users_are_filled_from_population_snapshot(storage, monkeypatch):
+    now = datetime.now()
+    storage.save_emoji_clicks(clicks("u1", ["🍎", "🍎", "💧"], now))
+    storage.save_emoji_clicks(clicks("u2", ["🏠"] * 5 + ["🍎"] * 4, now))
+    storage.save_emoji_clicks(clicks("u3", ["🚗"] * 20, other_bucket_time(now)))
+
+    def full_scan():
+        raise AssertionError("the snapshot must come from the population counters, not raw clicks")
+
+    monkeypatch.setattr(storage, "stream_all_emoji_clicks", full_scan)
+    assert storage.get_population_counts()[get_time_bucket(now)] == {"🍎": 6, "💧": 1, "🏠": 5}
+    try:
+        snapshot = population.refresh_snapshot()
+        assert snapshot.clicks == 32
+        assert snapshot.top(get_time_bucket(now))[:2] == ("🍎", "🏠")
+
+        # Personal favourites first, then this bucket's population ranking, then the all-day one
+        assert recommend_engine.get_recommended_emojis("u1", k=4) == ["🍎", "💧", "🏠", "🚗"]
+        assert recommend_engine.get_recommended_emojis("nobody", k=2) == ["🍎", "🏠"]
+    finally:
+        population.publish(population.PopulationSnapshot())
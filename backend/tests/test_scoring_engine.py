@@ -0,0 +1,75 @@
+import difflib
+import random
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import config
+from routes import practice
+from utils.scoring_engine import similarity_batch
+from utils.speech_analysis import compare_words, compare_words_batch
+
+
+def lcs_ratio(a, b):
+    rows = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i, ca in enumerate(a):
+        for j, cb in enumerate(b):
+            rows[i + 1][j + 1] = rows[i][j] + 1 if ca == cb else max(rows[i][j + 1], rows[i + 1][j])
+    return 2 * rows[-1][-1] / (len(a) + len(b)) if a or b else 1.0
+
+
+def test_similarity_matches_reference_dynamic_program():
+    rng = random.Random(7)
+    pairs = []
+    for _ in range(500):
+        # Cover both the bit-parallel (<= 64 chars) and the fallback path
+        a = "".join(rng.choice("abcé") for _ in range(rng.choice([0, 1, 5, 30, 64, 65, 100])))
+        b = "".join(rng.choice("abcé") for _ in range(rng.randint(0, 90)))
+        pairs.append((a, b))
+
+    for (a, b), ratio in zip(pairs, similarity_batch(pairs)):
+        assert abs(ratio - lcs_ratio(a, b)) < 1e-9
+
+
+def test_long_pairs_match_reference_whichever_side_is_shorter():
+    rng = random.Random(11)
+    a = "".join(rng.choice("abcdé ") for _ in range(300))
+    b = "".join(rng.choice("abcdé ") for _ in range(120))
+    expected = lcs_ratio(a, b)
+    assert list(similarity_batch([(a, b), (b, a), (a[:64], b), (b, a[:64])])) == [
+        pytest.approx(expected), pytest.approx(expected), pytest.approx(lcs_ratio(a[:64], b)), pytest.approx(lcs_ratio(a[:64], b))
+    ]
+
+
+def test_similarity_never_below_difflib():
+    words = ["hello", "coffee", "computer", "extravaganza", "language", "practice"]
+    pairs = [(w, w[::-1]) for w in words] + [(w, w[1:] + "x") for w in words]
+    for (a, b), ratio in zip(pairs, similarity_batch(pairs)):
+        assert ratio >= difflib.SequenceMatcher(None, a, b).ratio() - 1e-9
+
+
+def test_compare_words_batch_matches_single_calls():
+    pairs = [("coffee", "coffee"), ("computer", "compuder"), ("language", "lang"), ("world", "")]
+    assert compare_words_batch(pairs) == [compare_words(e, s) for e, s in pairs]
+    assert compare_words_batch(pairs)[0]["status"] == "perfect"
+    assert [f["status"] for f in compare_words("language", "lang")["syllable_feedback"]] == ["needs_work", "missing", "missing"]
+
+
+def test_score_batch_rejects_oversized_input(monkeypatch):
+    app = FastAPI()
+    app.include_router(practice.router)
+    client = TestClient(app)
+
+    ok = client.post("/practice/score-batch", json={"pairs": [{"expected": "coffee", "spoken": "cofee"}]})
+    assert ok.status_code == 200
+    assert ok.json()["results"][0]["expected"] == "coffee"
+
+    too_long = "a" * (config.SCORE_PAIR_MAX_CHARS + 1)
+    response = client.post("/practice/score-batch", json={"pairs": [{"expected": "coffee", "spoken": too_long}]})
+    assert response.status_code == 422
+
+    monkeypatch.setattr(config, "SCORE_BATCH_MAX_CHARS", 100)
+    pairs = [{"expected": "extravaganza", "spoken": "extravaganza"}] * 5
+    assert client.post("/practice/score-batch", json={"pairs": pairs}).status_code == 413
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.singleflight import SINGLEFLIGHT_CALLS, AsyncSingleFlight, SingleFlight
+from routes import tts
+
+
+def test_identical_tts_requests_share_one_synthesis(fake_tts, tts_cache):
+    client = fake_tts(latency_ms=100)
+    coalesced = SINGLEFLIGHT_CALLS.labels("tts", "coalesced")
+    before = coalesced.value
+
+    async def main():
+        requests = [tts.TTSRequest(text="Today we practice the letter B")] * 20 + [tts.TTSRequest(text="other")]
+        return await asyncio.gather(*(tts.text_to_speech(r) for r in requests))
+
+    responses = asyncio.run(main())
+    assert {r.body for r in responses[:20]} == {b"ID3Today we practice the letter B"}
+    assert responses[20].body == b"ID3other"
+    # One synthesis per distinct text, the other 19 joined the first
+    assert sorted(client.texts) == ["Today we practice the letter B", "other"]
+    assert coalesced.value - before == 19
+
+
+def test_thread_group_shares_result_and_errors():
+    group = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def slow_read(key):
+        calls.append(key)
+        release.wait(1)
+        return {"key": key}
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(group.do, "user1", slow_read, "user1") for _ in range(8)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result() for f in futures]
+    assert calls == ["user1"]
+    assert all(result is results[0] for result in results)
+
+    # Finished calls aren't remembered, and failures reach every waiter
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError("backend down")
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(group.do, "user1", failing) for _ in range(4)]
+        for f in futures:
+            with pytest.raises(RuntimeError):
+                f.result()
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    group = AsyncSingleFlight("test-async")
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.create_task(group.do("k", fetch))
+        second = asyncio.create_task(group.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from core.executor import BACKEND_LIMITS
+from routes import speech
+from services.streaming_stt import StreamingSession
+
+
+class FakeStreamingRecognizer:
+    """Offline stand-in for GoogleStreamingRecognizer: each audio chunk is the UTF-8 text of one word"""
+
+    def __init__(self):
+        self.settings = None
+
+    def recognize(self, settings, audio_chunks):
+        self.settings = settings
+        words = []
+        for chunk in audio_chunks:
+            words.append(chunk.decode())
+            yield " ".join(words), False
+        yield " ".join(words), True
+
+
+def make_client(monkeypatch, recognizer):
+    monkeypatch.setattr(speech, "streaming_recognizer", recognizer)
+    app = FastAPI()
+    app.include_router(speech.router)
+    return TestClient(app)
+
+
+def test_stream_sends_interim_and_final_feedback(monkeypatch):
+    recognizer = FakeStreamingRecognizer()
+    client = make_client(monkeypatch, recognizer)
+
+    with client.websocket_connect("/speech/stream") as ws:
+        ws.send_json({"target_text": "Hello how are you", "encoding": "LINEAR16", "sample_rate": 16000})
+        assert ws.receive_json() == {"type": "ready"}
+
+        ws.send_bytes(b"hello")
+        first = ws.receive_json()
+        assert first["type"] == "interim"
+        assert first["transcript"] == "hello"
+        assert first["phonemeAnalysis"] == [{"phoneme": "hello", "correct": True, "feedback": "Good pronunciation"}]
+
+        ws.send_bytes(b"now")
+        second = ws.receive_json()
+        assert [w["correct"] for w in second["phonemeAnalysis"]] == [True, False]
+
+        ws.send_bytes(b"are")
+        ws.send_bytes(b"you")
+        ws.send_json({"event": "end"})
+
+        messages = []
+        while True:
+            message = ws.receive_json()
+            messages.append(message)
+            if message["type"] == "final":
+                break
+
+    final = messages[-1]
+    assert final["transcription"] == "hello now are you"
+    assert [w["correct"] for w in final["phonemeAnalysis"]] == [True, False, True, True]
+    assert final["suggestions"]
+    assert recognizer.settings["encoding"] == "LINEAR16"
+
+
+def test_stream_falls_back_to_mock_without_recognizer(monkeypatch):
+    client = make_client(monkeypatch, None)
+
+    with client.websocket_connect("/speech/stream") as ws:
+        ws.send_json({"target_text": "I need help"})
+        ws.send_bytes(b"\x00\x01")
+        ws.send_json({"event": "end"})
+        final = ws.receive_json()
+
+    assert final["type"] == "final"
+    assert [w["phoneme"] for w in final["phonemeAnalysis"]] == ["i", "need", "help"]
+
+
+def receive_final(ws):
+    while True:
+        message = ws.receive_json()
+        if message["type"] == "final":
+            return message
+
+
+def test_streams_beyond_the_limit_are_refused(monkeypatch):
+    monkeypatch.setitem(BACKEND_LIMITS, "stt_stream", 1)
+    client = make_client(monkeypatch, FakeStreamingRecognizer())
+
+    with client.websocket_connect("/speech/stream") as first:
+        first.send_json({"target_text": "hello"})
+        assert first.receive_json() == {"type": "ready"}
+
+        with client.websocket_connect("/speech/stream") as second:
+            second.send_json({"target_text": "hello"})
+            refused = second.receive_json()
+            assert refused["type"] == "error"
+            assert refused["retry_after"] >= 1
+            with pytest.raises(WebSocketDisconnect) as closed:
+                second.receive_json()
+            assert closed.value.code == 1013
+
+        first.send_bytes(b"hello")
+        first.send_json({"event": "end"})
+        assert receive_final(first)["transcription"] == "hello"
+
+
+def test_idle_and_overlong_streams_are_finalized(monkeypatch):
+    client = make_client(monkeypatch, FakeStreamingRecognizer())
+    monkeypatch.setattr(speech, "STT_STREAM_IDLE_TIMEOUT", 0.2)
+
+    with client.websocket_connect("/speech/stream") as ws:
+        ws.send_json({"target_text": "hello there"})
+        assert ws.receive_json() == {"type": "ready"}
+        ws.send_bytes(b"hello")
+        # No end message: the server stops waiting and scores what it heard
+        assert receive_final(ws)["transcription"] == "hello"
+
+    monkeypatch.setattr(speech, "STT_STREAM_IDLE_TIMEOUT", 10)
+    monkeypatch.setattr(speech, "STT_STREAM_MAX_SECONDS", 0.3)
+    with client.websocket_connect("/speech/stream") as ws:
+        ws.send_json({"target_text": "hello there"})
+        assert ws.receive_json() == {"type": "ready"}
+        ws.send_bytes(b"hello")
+        assert receive_final(ws)["transcription"] == "hello"
+
+
+def test_session_buffer_is_bounded():
+    class StalledRecognizer:
+        def recognize(self, settings, audio_chunks):
+            return iter(())
+
+    async def main():
+        session = StreamingSession(StalledRecognizer(), {}, max_buffered=2)
+        assert session.feed(b"a") and session.feed(b"b")
+        assert not session.feed(b"c")
+        # Closing a full buffer doesn't block the event loop
+        session.close()
+
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+import io
+import os
+import struct
+import wave
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from core import clients
+from routes import speech
+from services.stt_cache import TranscriptCache
+from utils.upload import receive_audio_upload
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+app = FastAPI()
+app.include_router(speech.router)
+client = TestClient(app)
+
+
+class FakeSpeechClient:
+    def __init__(self, transcript):
+        self.transcript = transcript
+        self.calls = []
+
+    def recognize(self, config, audio):
+        self.calls.append((config, audio))
+
+        class Alternative:
+            transcript = self.transcript
+
+        class Result:
+            alternatives = [Alternative()]
+
+        class Response:
+            results = [Result()]
+
+        return Response()
+
+
+def read_recording():
+    with open(os.path.join(BACKEND_DIR, "recording.wav"), "rb") as f:
+        return f.read()
+
+
+def test_binary_upload_is_preprocessed_and_scored(monkeypatch):
+    fake = FakeSpeechClient("hello how are you today")
+    clients.set_client("speech", fake)
+
+    response = client.post(
+        "/speech/analyze/binary",
+        params={"target_text": "Hello, how are you today?"},
+        content=read_recording(),
+        headers={"Content-Type": "audio/wav"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["transcription"] == "hello how are you today"
+    config, audio = fake.calls[0]
+    assert config.sample_rate_hertz == 16000
+    assert len(audio.content) < len(read_recording()) / 3
+
+
+def test_rejects_oversized_upload_from_content_length(monkeypatch):
+    clients.set_client("speech", FakeSpeechClient("x"))
+    response = client.post(
+        "/speech/analyze/binary",
+        params={"target_text": "hi"},
+        content=b"\x00" * (11 * 1024 * 1024),
+    )
+    assert response.status_code == 413
+
+
+def test_rejects_wav_declaring_too_long_duration(monkeypatch):
+    fake = FakeSpeechClient("x")
+    clients.set_client("speech", fake)
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b"\x00\x00" * 100)
+    data = bytearray(buf.getvalue())
+    # Claim 2 minutes of audio in the data chunk header
+    data[40:44] = struct.pack("<I", 8000 * 2 * 120)
+
+    response = client.post("/speech/analyze/binary", params={"target_text": "hi"}, content=bytes(data))
+    assert response.status_code == 413
+    assert fake.calls == []
+
+
+def test_rejects_webm_longer_than_the_limit(make_webm):
+    fake = FakeSpeechClient("x")
+    clients.set_client("speech", fake)
+
+    long_webm = make_webm(90)
+    assert len(long_webm) < 1024 * 1024
+    response = client.post("/speech/analyze/binary", params={"target_text": "hi"}, content=long_webm)
+    assert response.status_code == 413
+
+    # No timecodes to read: bounded by size instead
+    opaque = b"\x1a\x45\xdf\xa3" + b"\x00" * (3 * 1024 * 1024)
+    response = client.post("/speech/analyze/binary", params={"target_text": "hi"}, content=opaque)
+    assert response.status_code == 413
+    assert fake.calls == []
+
+    response = client.post("/speech/analyze/binary", params={"target_text": "hi"}, content=make_webm(10))
+    assert response.status_code == 200
+    assert len(fake.calls) == 1
+
+
+def test_unsupported_container_is_415_without_calling_stt():
+    fake = FakeSpeechClient("x")
+    clients.set_client("speech", fake)
+    mp3 = b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\xff\xfb\x90\x00" * 100
+    response = client.post("/speech/analyze/binary", params={"target_text": "hi"}, content=mp3)
+    assert response.status_code == 415
+    assert fake.calls == []
+
+
+def test_rejects_empty_upload():
+    response = client.post("/speech/analyze/binary", params={"target_text": "hi"}, content=b"")
+    assert response.status_code == 400
+
+
+def test_resubmitted_recording_uses_cached_transcript(monkeypatch):
+    fake = FakeSpeechClient("hello how are you today")
+    clients.set_client("speech", fake)
+    monkeypatch.setattr(speech, "stt_cache", TranscriptCache(max_entries=8, max_bytes=4096, ttl=60))
+
+    scores = []
+    for _ in range(3):
+        response = client.post(
+            "/speech/analyze/binary",
+            params={"target_text": "Hello, how are you today?"},
+            content=read_recording(),
+        )
+        scores.append(response.json()["score"])
+
+    assert len(set(scores)) == 1
+    assert len(fake.calls) == 1
+    assert speech.stt_cache.stats()["hits"] == 2
+
+
+def test_spooled_and_in_memory_uploads_yield_the_same_bytes():
+    upload_app = FastAPI()
+    held = []
+
+    @upload_app.post("/echo")
+    async def echo(request: Request, spool_bytes: int):
+        async with receive_audio_upload(request, spool_bytes=spool_bytes) as audio:
+            # A slice that outlives the upload must not break the cleanup
+            held.append(audio[:4])
+            return Response(bytes(audio))
+
+    upload_client = TestClient(upload_app)
+    data = read_recording()
+    for spool_bytes in (16, len(data) * 2):
+        response = upload_client.post("/echo", params={"spool_bytes": spool_bytes}, content=data)
+        assert response.status_code == 200
+        assert response.content == data
+    assert all(bytes(head) == b"RIFF" for head in held)
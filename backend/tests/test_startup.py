@@ -0,0 +1,84 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from core import clients
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter: the point is what a cold import does
+SCRIPT = """
+import main
+from core import clients
+from fastapi.testclient import TestClient
+
+assert clients._clients == {}, "a client was built at import time"
+with TestClient(main.app) as client:
+    assert client.get("/health").status_code == 200
+    response = client.post("/speech/analyze", json={"audio_base64": "", "target_text": "hello"})
+    assert response.status_code == 200
+print("ok")
+"""
+
+
+def test_main_imports_and_serves_without_credentials(tmp_path):
+    env = dict(
+        os.environ,
+        GOOGLE_APPLICATION_CREDENTIALS=str(tmp_path / "missing.json"),
+        WARMUP_CLIENTS="",
+        STORAGE_BACKEND="sqlite",
+        SQLITE_PATH=str(tmp_path / "test.db"),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.strip().endswith("ok")
+
+
+def test_requests_wait_for_a_build_in_progress_without_blocking_other_clients(monkeypatch):
+    release = threading.Event()
+    builds = []
+
+    def slow_speech_client():
+        builds.append("speech")
+        release.wait(2)
+        return "speech-client"
+
+    monkeypatch.setitem(clients.FACTORIES, "speech", slow_speech_client)
+    monkeypatch.setitem(clients.FACTORIES, "tts", lambda: "tts-client")
+
+    async def main():
+        # e.g. the startup warmup
+        warmup = asyncio.ensure_future(clients.warmup(["speech"]))
+        await asyncio.sleep(0.05)
+
+        # A request during the build waits for it rather than getting the mock...
+        waiting = asyncio.ensure_future(clients.load_optional_client("speech"))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        # ...while building a different client doesn't wait on it
+        started = time.perf_counter()
+        assert await clients.load_optional_client("tts") == "tts-client"
+        assert time.perf_counter() - started < 0.5
+
+        release.set()
+        assert await waiting == "speech-client"
+        assert await warmup == {"speech": True}
+
+    asyncio.run(main())
+    assert builds == ["speech"]
+
+
+def test_failed_build_falls_back_to_mock(monkeypatch):
+    def broken():
+        raise RuntimeError("no credentials")
+
+    monkeypatch.setitem(clients.FACTORIES, "speech", broken)
+    assert asyncio.run(clients.load_optional_client("speech")) is None
+    # Not retried before CLIENT_RETRY_SECONDS
+    monkeypatch.setitem(clients.FACTORIES, "speech", lambda: "speech-client")
+    assert asyncio.run(clients.load_optional_client("speech")) is None
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import tts
+from services.tts_cache import TTSCache, make_cache_key
+
+
+def make_cache(directory, max_disk_bytes=10**6, max_memory_entries=100):
+    return TTSCache(str(directory), max_disk_bytes=max_disk_bytes, max_memory_bytes=10**6, max_memory_entries=max_memory_entries)
+
+
+def test_disk_round_trip_across_instances(tmp_path):
+    key = make_cache_key("butterfly", "en-US-Neural2-F")
+    path = make_cache(tmp_path).put(key, b"ID3butterfly")
+    assert os.path.basename(path) == key + ".mp3"
+
+    # A fresh process has an empty memory tier but finds the file
+    restarted = make_cache(tmp_path)
+    assert restarted.contains(key)
+    assert restarted.get(key) == b"ID3butterfly"
+    assert (restarted.hits, restarted.misses) == (1, 0)
+    assert restarted.get(make_cache_key("caterpillar", "en-US-Neural2-F")) is None
+    assert restarted.misses == 1
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = make_cache(tmp_path, max_disk_bytes=250)
+    keys = [make_cache_key(f"word {i}", "voice") for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, bytes(100))
+        os.utime(cache.path_for(key), (time.time() - 100 + i, time.time() - 100 + i))
+
+    # Reading the oldest file refreshes it, so the other one goes first
+    assert make_cache(tmp_path).get(keys[0]) is not None
+    cache.put(keys[2], bytes(100))
+
+    assert os.path.exists(cache.path_for(keys[0]))
+    assert not os.path.exists(cache.path_for(keys[1]))
+    assert os.path.exists(cache.path_for(keys[2]))
+
+
+def test_contains_is_decided_by_the_file_not_the_memory_tier(tmp_path):
+    cache = make_cache(tmp_path)
+    key = make_cache_key("butterfly", "voice")
+    cache.put(key, b"ID3butterfly")
+
+    # Another worker evicted the file while the entry is still in our memory tier:
+    # the URL must keep resolving, so the file is written back
+    os.unlink(cache.path_for(key))
+    assert cache.contains(key)
+    with open(cache.path_for(key), "rb") as f:
+        assert f.read() == b"ID3butterfly"
+
+    # Neither on disk nor in memory
+    other = make_cache_key("caterpillar", "voice")
+    assert not cache.contains(other)
+    assert not os.path.exists(cache.path_for(other))
+
+
+def test_tts_route_does_file_io_on_the_disk_executor(tmp_path, monkeypatch, fake_tts):
+    cache = make_cache(tmp_path)
+    threads = []
+    for method in ("get", "put"):
+        original = getattr(cache, method)
+
+        def recording(*args, original=original, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(cache, method, recording)
+    monkeypatch.setattr(tts, "tts_cache", cache)
+    fake_tts()
+    app = FastAPI()
+    app.include_router(tts.router)
+    client = TestClient(app)
+
+    assert client.post("/tts", json={"text": "hello"}).headers["X-Cache"] == "MISS"
+    assert client.post("/tts", json={"text": "hello"}).headers["X-Cache"] == "HIT"
+    # Miss: file lookup and write off the loop; the hit was answered from memory
+    assert len(threads) == 2
+    assert all(name.startswith("disk-io") for name in threads)
@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+from benchmarks.fakes import FakeTTSClient, FaultInjector
+from scripts import prewarm_tts
+from services.tts_cache import TTSCache
+
+
+def run_prewarm(cache, client, phrases):
+    manifest, missing, _ = prewarm_tts.plan(phrases)
+    manifest.update(asyncio.run(prewarm_tts.synthesize_missing(client, phrases, missing)))
+    cache.save_manifest(manifest)
+    return missing
+
+
+def test_prewarm_is_incremental_and_served_from_manifest(tmp_path, monkeypatch):
+    cache = TTSCache(str(tmp_path), max_disk_bytes=1, max_memory_bytes=1024 * 1024, max_memory_entries=16)
+    monkeypatch.setattr(prewarm_tts, "tts_cache", cache)
+    phrases = prewarm_tts.collect_phrases()
+    # Answers the checked-in hello.mp3, so the manifest gets a real duration
+    client = FakeTTSClient(FaultInjector())
+
+    assert len(run_prewarm(cache, client, phrases)) == len(phrases)
+    entry = next(iter(cache.load_manifest().values()))
+    assert entry["duration_ms"] == 768
+    assert entry["bytes"] == len(client.audio)
+
+    # Nothing changed: no synthesis on the second run
+    assert run_prewarm(cache, client, phrases) == []
+    assert client.injector.calls == len(phrases)
+
+    # A corrupted file is re-rendered
+    key = next(iter(phrases))
+    with open(cache.path_for(key), "wb") as f:
+        f.write(b"garbage")
+    assert run_prewarm(cache, client, phrases) == [key]
+
+    # Pinned entries are answered from the manifest and survive eviction, even over the cap
+    cache.evict()
+    assert all(cache.contains(k) for k in phrases)
+    assert os.path.exists(cache.manifest_path)
@@ -0,0 +1,348 @@
+"""Acoustic features computed locally from PCM audio, without a transcript.
+
+`AcousticAnalyzer` takes samples in chunks of any size and analyses them
+in 40 ms frames every 10 ms. Everything it keeps between chunks is a small
+sample carry-over, running aggregates and a pitch contour capped at
+MAX_CONTOUR_POINTS, so a long recording is processed in constant memory.
+`WavStream` decodes a PCM WAV body chunk by chunk to feed it.
+
+Per frame:
+- loudness is the RMS level in dBFS
+- a frame is silent below max(SILENCE_DB, running peak - DYNAMIC_RANGE_DB)
+- otherwise it is voiced when its normalized autocorrelation peaks at
+  least VOICING_THRESHOLD within the 75-400 Hz pitch range (that lag
+  gives f0), and unvoiced speech if not
+- pauses are silent runs of at least MIN_PAUSE_MS between two stretches
+  of speech
+- syllables are counted as loudness peaks within voiced runs that rise
+  and fall by at least SYLLABLE_DIP_DB, which gives the speaking rate
+"""
+import math
+import struct
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.audio_preprocess import BytesLike, WavInfo, decode_pcm, parse_wav_header
+
+ANALYSIS_MAX_RATE = 16000
+# Below telephone rate a 10 ms hop is a handful of samples and the pitch range doesn't fit
+MIN_SAMPLE_RATE = 8000
+FRAME_MS = 40
+HOP_MS = 10
+MIN_PITCH_HZ = 75
+MAX_PITCH_HZ = 400
+VOICING_THRESHOLD = 0.5
+SILENCE_DB = -45.0
+DYNAMIC_RANGE_DB = 40.0
+MIN_PAUSE_MS = 250
+SYLLABLE_DIP_DB = 3.0
+MIN_SYLLABLE_MS = 100
+CLIP_LEVEL = 0.99
+MAX_CONTOUR_POINTS = 500
+MAX_PAUSES_LISTED = 50
+# (format tag, bits per sample) decode_pcm understands: integer PCM and 32-bit float
+SUPPORTED_WAV_FORMATS = {(1, 8), (1, 16), (1, 24), (1, 32), (3, 32)}
+
+
+class _Running:
+    """Count, mean, variance, min and max of a stream of values, updated a batch at a time"""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values: np.ndarray) -> None:
+        # Chan et al. parallel update, so a whole chunk of frames is one step
+        n = len(values)
+        if n == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def summary(self, digits: int = 1) -> Dict:
+        if not self.count:
+            return {"mean": None, "stddev": None, "min": None, "max": None}
+        stddev = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+        return {
+            "mean": round(self.mean, digits),
+            "stddev": round(stddev, digits),
+            "min": round(self.min, digits),
+            "max": round(self.max, digits),
+        }
+
+
+class AcousticAnalyzer:
+    def __init__(self, sample_rate: int):
+        if sample_rate < MIN_SAMPLE_RATE:
+            raise ValueError(f"Sample rate {sample_rate} Hz is below the {MIN_SAMPLE_RATE} Hz minimum")
+        # Integer decimation (block mean) to at most ANALYSIS_MAX_RATE keeps chunk boundaries seamless
+        self.decimation = max(1, sample_rate // ANALYSIS_MAX_RATE)
+        self.sample_rate = sample_rate
+        self.rate = sample_rate / self.decimation
+        self.frame_len = int(self.rate * FRAME_MS / 1000)
+        self.hop = int(self.rate * HOP_MS / 1000)
+        self.min_lag = int(self.rate / MAX_PITCH_HZ)
+        self.max_lag = min(self.frame_len - 1, int(math.ceil(self.rate / MIN_PITCH_HZ)))
+        self.fft_size = 1 << (2 * self.frame_len - 1).bit_length()
+        self.window = np.hanning(self.frame_len).astype(np.float32)
+        # Autocorrelation of the window itself, to undo its taper at longer lags
+        window_ac = np.fft.irfft(np.abs(np.fft.rfft(self.window, self.fft_size)) ** 2)[: self.max_lag + 2]
+        self.window_ac = (window_ac / window_ac[0]).astype(np.float32)
+
+        self._pending = np.zeros(0, dtype=np.float32)  # not yet decimated (< decimation samples)
+        self._carry = np.zeros(0, dtype=np.float32)  # decimated samples not yet fully framed
+        self.frames = 0
+        self.input_samples = 0
+        self.clipped_samples = 0
+        self.peak_db = -math.inf
+
+        self.loudness = _Running()
+        self.pitch = _Running()
+        self.voiced_frames = 0
+        self.unvoiced_frames = 0
+        self.silent_frames = 0
+        self.first_speech_frame: Optional[int] = None
+        self.last_speech_frame: Optional[int] = None
+
+        self._silence_run = 0
+        self.pause_count = 0
+        self.pause_total_frames = 0
+        self.longest_pause_frames = 0
+        self.pauses: List[Dict] = []
+
+        self.syllables = 0
+        self._syllable_state = "valley"
+        self._extreme_db = math.inf
+        self._last_syllable_frame = -10**9
+
+        self._contour: List[List[float]] = []
+        self._contour_stride = 1
+
+    # Input
+
+    def feed(self, samples: np.ndarray) -> None:
+        """Analyse the next chunk of float32 samples in [-1, 1], shape (n,) or (n, channels)"""
+        if samples.ndim == 2:
+            samples = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+        samples = samples.astype(np.float32, copy=False)
+        self.input_samples += len(samples)
+        self.clipped_samples += int(np.count_nonzero(np.abs(samples) >= CLIP_LEVEL))
+
+        if self.decimation > 1:
+            samples = np.concatenate([self._pending, samples])
+            usable = len(samples) - len(samples) % self.decimation
+            self._pending = samples[usable:]
+            samples = samples[:usable].reshape(-1, self.decimation).mean(axis=1)
+
+        buffer = np.concatenate([self._carry, samples])
+        count = (len(buffer) - self.frame_len) // self.hop + 1 if len(buffer) >= self.frame_len else 0
+        if count > 0:
+            frames = np.lib.stride_tricks.as_strided(
+                buffer, shape=(count, self.frame_len), strides=(buffer.strides[0] * self.hop, buffer.strides[0])
+            )
+            self._analyse(frames)
+        self._carry = buffer[count * self.hop:].copy()
+
+    # Per-chunk frame analysis
+
+    def _analyse(self, frames: np.ndarray) -> None:
+        rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+        level_db = (20 * np.log10(np.maximum(rms, 1e-9))).astype(np.float32)
+
+        spectrum = np.fft.rfft(frames * self.window, self.fft_size, axis=1)
+        ac = np.fft.irfft(np.abs(spectrum) ** 2, axis=1)[:, : self.max_lag + 2]
+        energy = np.maximum(ac[:, :1], 1e-12)
+        normalized = ac / energy / self.window_ac
+        search = normalized[:, self.min_lag : self.max_lag + 1]
+        best = search.argmax(axis=1)
+        periodicity = search[np.arange(len(frames)), best]
+        lag = (best + self.min_lag).astype(np.float64)
+        # Parabolic interpolation around the peak for sub-sample lag
+        rows = np.arange(len(frames))
+        left = normalized[rows, np.maximum(lag.astype(int) - 1, 0)]
+        center = normalized[rows, lag.astype(int)]
+        right = normalized[rows, np.minimum(lag.astype(int) + 1, self.max_lag + 1)]
+        denominator = left - 2 * center + right
+        safe = np.where(np.abs(denominator) > 1e-9, denominator, 1.0)
+        shift = np.where(np.abs(denominator) > 1e-9, 0.5 * (left - right) / safe, 0.0)
+        f0 = self.rate / (lag + np.clip(shift, -0.5, 0.5))
+
+        # Aggregates for the whole chunk at once; the running peak makes the silence threshold causal
+        peak = np.maximum.accumulate(np.concatenate([[self.peak_db], level_db]))[1:]
+        self.peak_db = float(peak[-1])
+        speech = level_db >= np.maximum(SILENCE_DB, peak - DYNAMIC_RANGE_DB)
+        voiced = speech & (periodicity >= VOICING_THRESHOLD)
+        self.loudness.add(level_db[speech])
+        self.pitch.add(f0[voiced])
+        self.voiced_frames += int(voiced.sum())
+        self.unvoiced_frames += int((speech & ~voiced).sum())
+        self.silent_frames += int((~speech).sum())
+
+        # Runs, peaks and the contour depend on order, so they walk the frames
+        for i in range(len(frames)):
+            self._frame(self.frames + i, bool(speech[i]), bool(voiced[i]), float(level_db[i]), float(f0[i]))
+        self.frames += len(frames)
+
+    def _frame(self, index: int, speech: bool, voiced: bool, level_db: float, f0: float) -> None:
+        if not speech:
+            self._silence_run += 1
+            self._syllable_state, self._extreme_db = "valley", math.inf
+            return
+
+        if self._silence_run and self.first_speech_frame is not None:
+            self._end_silence(index)
+        self._silence_run = 0
+        if self.first_speech_frame is None:
+            self.first_speech_frame = index
+        self.last_speech_frame = index
+
+        if voiced:
+            self._contour_point(index, f0)
+            self._track_syllable(index, level_db)
+        else:
+            self._syllable_state, self._extreme_db = "valley", math.inf
+
+    def _end_silence(self, index: int) -> None:
+        run_ms = self._silence_run * HOP_MS
+        if run_ms < MIN_PAUSE_MS:
+            return
+        self.pause_count += 1
+        self.pause_total_frames += self._silence_run
+        self.longest_pause_frames = max(self.longest_pause_frames, self._silence_run)
+        if len(self.pauses) < MAX_PAUSES_LISTED:
+            self.pauses.append({"start_ms": (index - self._silence_run) * HOP_MS, "duration_ms": run_ms})
+
+    def _track_syllable(self, index: int, level_db: float) -> None:
+        # Peak picking on the loudness envelope: a syllable is a rise of SYLLABLE_DIP_DB above
+        # the last valley followed by a fall of SYLLABLE_DIP_DB below the peak (or the end of voicing)
+        if self._syllable_state == "valley":
+            self._extreme_db = min(self._extreme_db, level_db)
+            if level_db >= self._extreme_db + SYLLABLE_DIP_DB and index - self._last_syllable_frame >= MIN_SYLLABLE_MS // HOP_MS:
+                self.syllables += 1
+                self._last_syllable_frame = index
+                self._syllable_state, self._extreme_db = "peak", level_db
+            elif self._extreme_db == math.inf or level_db < self._extreme_db:
+                self._extreme_db = level_db
+        else:
+            self._extreme_db = max(self._extreme_db, level_db)
+            if level_db <= self._extreme_db - SYLLABLE_DIP_DB:
+                self._syllable_state, self._extreme_db = "valley", level_db
+
+    def _contour_point(self, index: int, f0: float) -> None:
+        if index % self._contour_stride:
+            return
+        self._contour.append([index * HOP_MS, round(f0, 1)])
+        if len(self._contour) >= MAX_CONTOUR_POINTS:
+            # Halve the resolution instead of growing with the recording
+            self._contour_stride *= 2
+            self._contour = [point for point in self._contour if (point[0] // HOP_MS) % self._contour_stride == 0]
+
+    # Results
+
+    def summary(self) -> Dict:
+        duration = self.input_samples / self.sample_rate
+        speech_frames = self.voiced_frames + self.unvoiced_frames
+        if self.first_speech_frame is not None:
+            span_frames = self.last_speech_frame - self.first_speech_frame + 1
+        else:
+            span_frames = 0
+        speaking_seconds = span_frames * HOP_MS / 1000
+        articulation_seconds = max(0.0, speaking_seconds - self.pause_total_frames * HOP_MS / 1000)
+        return {
+            "duration_ms": round(duration * 1000),
+            "speech_ms": speech_frames * HOP_MS,
+            "loudness": dict(
+                self.loudness.summary(),
+                peak_dbfs=round(self.peak_db, 1) if self.frames else None,
+                clipped_ratio=round(self.clipped_samples / self.input_samples, 4) if self.input_samples else 0.0,
+            ),
+            "voicing": {
+                "voiced_ratio": round(self.voiced_frames / speech_frames, 3) if speech_frames else 0.0,
+                "speech_ratio": round(speech_frames / self.frames, 3) if self.frames else 0.0,
+            },
+            "pauses": {
+                "count": self.pause_count,
+                "total_ms": self.pause_total_frames * HOP_MS,
+                "longest_ms": self.longest_pause_frames * HOP_MS,
+                "mean_ms": round(self.pause_total_frames * HOP_MS / self.pause_count) if self.pause_count else 0,
+                "leading_silence_ms": self.first_speech_frame * HOP_MS if self.first_speech_frame is not None else None,
+                "items": self.pauses,
+            },
+            "rate": {
+                "syllables": self.syllables,
+                # Over the whole speaking span, and excluding pauses
+                "syllables_per_second": round(self.syllables / speaking_seconds, 2) if speaking_seconds else 0.0,
+                "articulation_rate": round(self.syllables / articulation_seconds, 2) if articulation_seconds else 0.0,
+            },
+            "pitch": dict(self.pitch.summary(), contour_step_ms=HOP_MS * self._contour_stride, contour=self._contour),
+        }
+
+
+class WavStream:
+    """Decodes a PCM WAV byte stream chunk by chunk into an AcousticAnalyzer"""
+
+    def __init__(self, max_header_bytes: int = 64 * 1024):
+        self.max_header_bytes = max_header_bytes
+        self.info: Optional[WavInfo] = None
+        self.analyzer: Optional[AcousticAnalyzer] = None
+        self._head = bytearray()
+        self._remainder = b""
+        self._data_left = 0
+
+    def feed(self, chunk: BytesLike) -> None:
+        """Raises ValueError if the stream is not a PCM WAV we can decode"""
+        if self.info is None:
+            self._head += chunk
+            try:
+                info = parse_wav_header(self._head)
+            except struct.error:
+                info = None  # fmt chunk only partly received
+            if info is None:
+                if len(self._head) > self.max_header_bytes or (len(self._head) >= 12 and self._head[:4] != b"RIFF"):
+                    raise ValueError("Not a PCM WAV stream")
+                return
+            if (info.format_tag, info.bits_per_sample) not in SUPPORTED_WAV_FORMATS or not info.channels:
+                raise ValueError("Unsupported WAV sample format")
+            self.info = info
+            self.analyzer = AcousticAnalyzer(info.sample_rate)
+            self._data_left = info.declared_data_size or math.inf
+            chunk = bytes(self._head[info.data_offset:])
+            self._head = bytearray()
+
+        if self._data_left is not math.inf:
+            chunk = bytes(chunk[: int(self._data_left)])
+            self._data_left -= len(chunk)
+        data = self._remainder + bytes(chunk)
+        frame_bytes = self.info.channels * self.info.bits_per_sample // 8
+        usable = len(data) - len(data) % frame_bytes
+        self._remainder = data[usable:]
+        if usable:
+            samples = decode_pcm(data, replace(self.info, data_offset=0, data_size=usable))
+            self.analyzer.feed(samples)
+
+    def summary(self) -> Dict:
+        if self.analyzer is None:
+            raise ValueError("Not a PCM WAV stream")
+        return self.analyzer.summary()
+
+
+def analyze_wav(data: BytesLike, chunk_size: int = 64 * 1024) -> Dict:
+    stream = WavStream()
+    view = memoryview(data)
+    for offset in range(0, len(view), chunk_size):
+        stream.feed(view[offset:offset + chunk_size])
+    return stream.summary()
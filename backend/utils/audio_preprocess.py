@@ -0,0 +1,405 @@
+"""Audio preprocessing before speech recognition.
+
+Detects the container from the first bytes of the upload. PCM WAV is
+decoded, trimmed of leading/trailing silence with an energy-based voice
+activity detector, downmixed to mono and resampled to 16 kHz, then sent
+as raw LINEAR16. Compressed formats we can't decode here (WebM/Ogg Opus,
+FLAC) pass through untouched, without a copy, with the matching encoding,
+so every upload needs exactly one recognize call. Their duration is read
+from the container (`compressed_duration_seconds`) so uploads can be
+capped without decoding. Anything else (MP3, MP4, unrecognized bytes)
+raises UnsupportedAudio rather than being sent under a guessed encoding.
+"""
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+FRAME_MS = 10
+PAD_MS = 150
+MIN_SPEECH_MS = 50
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class UnsupportedAudio(ValueError):
+    """The upload isn't in a container the recognizer is sent; routes answer 415"""
+
+
+@dataclass
+class PreparedAudio:
+    content: BytesLike  # the upload's own buffer for pass-through formats
+    container: str
+    encoding: Optional[str]  # google.cloud.speech RecognitionConfig.AudioEncoding name; None when the header says
+    sample_rate: Optional[int]
+    channels: int = 1
+    bytes_in: int = 0
+    trimmed_ms: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def bytes_out(self) -> int:
+        return len(self.content)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def config_kwargs(self) -> dict:
+        """Encoding fields for speech.RecognitionConfig; each is omitted when the header carries it"""
+        kwargs = {}
+        if self.encoding is not None:
+            kwargs["encoding"] = self.encoding
+        if self.sample_rate is not None:
+            kwargs["sample_rate_hertz"] = self.sample_rate
+        return kwargs
+
+
+@dataclass
+class WavInfo:
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int
+    declared_data_size: int = 0  # from the chunk header; 0 when the writer was streaming
+
+
+def sniff_container(data: BytesLike) -> str:
+    head = bytes(data[:12])
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return "unknown"
+
+
+def parse_wav_header(data: BytesLike) -> Optional[WavInfo]:
+    """Walk the RIFF chunks up to the start of `data`; None if this isn't a usable WAV"""
+    view = memoryview(data)
+    if len(view) < 12 or bytes(view[:4]) != b"RIFF" or bytes(view[8:12]) != b"WAVE":
+        return None
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", view, body)
+            if format_tag == 0xFFFE and chunk_size >= 26:
+                # WAVE_FORMAT_EXTENSIBLE: the real format is the first field of the subformat GUID
+                (format_tag,) = struct.unpack_from("<H", view, body + 24)
+            fmt = (format_tag, channels, sample_rate, bits)
+        elif chunk_id == b"data" and fmt is not None:
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF; trust the bytes we have
+            available = len(view) - body
+            streaming = chunk_size in (0, 0xFFFFFFFF)
+            size = available if streaming else min(chunk_size, available)
+            return WavInfo(fmt[0], fmt[1], fmt[2], fmt[3], body, size, 0 if streaming else chunk_size)
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def decode_pcm(data: BytesLike, info: WavInfo) -> Optional[np.ndarray]:
+    """Samples as float32 in [-1, 1] with shape (frames, channels), or None if the format is unsupported"""
+    raw = memoryview(data)[info.data_offset:info.data_offset + info.data_size]
+    width = info.bits_per_sample // 8
+    frame_bytes = width * info.channels
+    if not frame_bytes:
+        return None
+    raw = raw[:len(raw) - len(raw) % frame_bytes]
+
+    if info.format_tag == 1 and width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif info.format_tag == 1 and width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif info.format_tag == 1 and width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = (b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8
+        samples = ints.astype(np.float32) / 8388608.0
+    elif info.format_tag == 1 and width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    elif info.format_tag == 3 and width == 4:
+        samples = np.frombuffer(raw, dtype="<f4").astype(np.float32)
+    else:
+        return None
+    return samples.reshape(-1, info.channels)
+
+
+def frame_energy_db(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    count = len(samples) // frame_len
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame_len].reshape(count, frame_len)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-9))
+
+
+def detect_speech_bounds(samples: np.ndarray, sample_rate: int) -> Optional[Tuple[int, int]]:
+    """(start, end) sample indices of the voiced region, padded by PAD_MS, or None if nothing is voiced.
+
+    A frame is voiced when it is 12 dB above the noise floor (10th
+    percentile frame energy) and within 35 dB of the loudest frame; the
+    region starts and ends at runs of at least MIN_SPEECH_MS voiced frames,
+    so isolated clicks don't count as speech.
+    """
+    frame_len = max(1, sample_rate * FRAME_MS // 1000)
+    energy = frame_energy_db(samples, frame_len)
+    if len(energy) == 0:
+        return None
+    threshold = max(np.percentile(energy, 10) + 12, energy.max() - 35)
+    voiced = energy > threshold
+
+    min_run = max(1, MIN_SPEECH_MS // FRAME_MS)
+    runs = np.convolve(voiced.astype(np.int32), np.ones(min_run, dtype=np.int32), mode="valid") == min_run
+    starts = np.nonzero(runs)[0]
+    if len(starts) == 0:
+        return None
+
+    pad = PAD_MS // FRAME_MS
+    first = max(0, starts[0] - pad)
+    last = min(len(energy), starts[-1] + min_run + pad)
+    return first * frame_len, min(len(samples), last * frame_len)
+
+
+def _lowpass(samples: np.ndarray, cutoff: float, taps: int = 63) -> np.ndarray:
+    """Windowed-sinc FIR; cutoff is a fraction of the sample rate"""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = np.sinc(2 * cutoff * n) * np.hamming(taps)
+    kernel /= kernel.sum()
+    return np.convolve(samples, kernel.astype(np.float32), mode="same")
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Downsample mono audio; never upsamples (the recognizer accepts the original rate)"""
+    if src_rate <= dst_rate:
+        return samples
+    filtered = _lowpass(samples, 0.45 * dst_rate / src_rate)
+    if src_rate % dst_rate == 0:
+        return filtered[::src_rate // dst_rate]
+    duration = len(samples) / src_rate
+    positions = np.arange(int(duration * dst_rate)) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(filtered)), filtered).astype(np.float32)
+
+
+def _opus_sample_rate(data: BytesLike) -> int:
+    head = bytes(data[:512])
+    idx = head.find(b"OpusHead")
+    if idx >= 0 and idx + 16 <= len(head):
+        (rate,) = struct.unpack_from("<I", head, idx + 12)
+        if 8000 <= rate <= 48000:
+            return rate
+    return 48000
+
+
+# MPEG Layer III bitrates (kbps) and sample rates, indexed by header fields
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def mp3_duration_ms(data: BytesLike) -> int:
+    """Duration of a Layer III MP3 by walking its frame headers (no decoding).
+
+    Skips a leading ID3v2 tag and stops at the first byte that isn't a valid
+    frame header, e.g. a trailing ID3v1 tag.
+    """
+    buf = bytes(data)
+    pos = 0
+    if buf[:3] == b"ID3" and len(buf) >= 10:
+        size = buf[6] << 21 | buf[7] << 14 | buf[8] << 7 | buf[9]
+        pos = 10 + size
+
+    samples = 0
+    sample_rate = 0
+    while pos + 4 <= len(buf):
+        (header,) = struct.unpack_from(">I", buf, pos)
+        if header >> 21 != 0x7FF:
+            break
+        version = (header >> 19) & 0x3
+        layer = (header >> 17) & 0x3
+        bitrate_index = (header >> 12) & 0xF
+        rate_index = (header >> 10) & 0x3
+        padding = (header >> 9) & 0x1
+        if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+            break
+
+        mpeg1 = version == 3
+        bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        frame_samples = 1152 if mpeg1 else 576
+        pos += frame_samples // 8 * bitrate // sample_rate + padding
+        samples += frame_samples
+
+    if not sample_rate:
+        return 0
+    return samples * 1000 // sample_rate
+
+
+# EBML element IDs (marker bits included) walked to find the end of a WebM recording
+_EBML_SEGMENT = 0x18538067
+_EBML_INFO = 0x1549A966
+_EBML_TIMECODE_SCALE = 0x2AD7B1
+_EBML_DURATION = 0x4489
+_EBML_CLUSTER = 0x1F43B675
+_EBML_TIMECODE = 0xE7
+_EBML_BLOCK_GROUP = 0xA0
+_EBML_BLOCK = 0xA1
+_EBML_SIMPLE_BLOCK = 0xA3
+# Master elements descended into rather than skipped; MediaRecorder leaves Segment and Cluster sizes unknown
+_EBML_MASTERS = {_EBML_SEGMENT, _EBML_INFO, _EBML_CLUSTER, _EBML_BLOCK_GROUP}
+
+
+def _ebml_vint(view: memoryview, pos: int, keep_marker: bool) -> Tuple[Optional[int], int]:
+    """(value, length) of the variable-length integer at pos; value None for an all-ones (unknown) size"""
+    first = view[pos]
+    length = 9 - first.bit_length() if first else 9
+    if length > 8 or pos + length > len(view):
+        raise ValueError("Truncated EBML")
+    value = int.from_bytes(view[pos:pos + length], "big")
+    if keep_marker:
+        return value, length
+    value &= (1 << (7 * length)) - 1
+    return (None if value == (1 << (7 * length)) - 1 else value), length
+
+
+def _webm_duration_seconds(data: BytesLike) -> Optional[float]:
+    view = memoryview(data)
+    scale_ns = 1_000_000
+    declared = None
+    cluster = 0
+    end = None
+    pos = 0
+    try:
+        while pos < len(view):
+            element, id_len = _ebml_vint(view, pos, keep_marker=True)
+            size, size_len = _ebml_vint(view, pos + id_len, keep_marker=False)
+            body = pos + id_len + size_len
+            if element in _EBML_MASTERS:
+                pos = body
+                continue
+            if size is None or body + size > len(view):
+                break
+            if element == _EBML_TIMECODE_SCALE:
+                scale_ns = int.from_bytes(view[body:body + size], "big") or scale_ns
+            elif element == _EBML_DURATION and size in (4, 8):
+                (declared,) = struct.unpack_from(">f" if size == 4 else ">d", view, body)
+            elif element == _EBML_TIMECODE:
+                cluster = int.from_bytes(view[body:body + size], "big")
+            elif element in (_EBML_SIMPLE_BLOCK, _EBML_BLOCK):
+                _, track_len = _ebml_vint(view, body, keep_marker=False)
+                (relative,) = struct.unpack_from(">h", view, body + track_len)
+                end = max(end or 0, cluster + relative)
+            pos = body + size
+    except (ValueError, struct.error):
+        pass  # a truncated tail still leaves the timecodes read so far
+    ticks = [t for t in (declared, end) if t is not None]
+    return max(ticks) * scale_ns / 1e9 if ticks else None
+
+
+def _ogg_opus_duration_seconds(data: BytesLike) -> Optional[float]:
+    view = memoryview(data)
+    head = bytes(view[:512])
+    idx = head.find(b"OpusHead")
+    if idx < 0 or idx + 12 > len(head):
+        return None
+    (pre_skip,) = struct.unpack_from("<H", head, idx + 10)
+    # The last page's granule position counts 48 kHz samples from the start of the stream
+    tail_start = max(0, len(view) - 65536)
+    last = bytes(view[tail_start:]).rfind(b"OggS")
+    if last < 0 or tail_start + last + 14 > len(view):
+        return None
+    (granule,) = struct.unpack_from("<q", view, tail_start + last + 6)
+    return max(0, granule - pre_skip) / 48000 if granule >= 0 else None
+
+
+def _flac_duration_seconds(data: BytesLike) -> Optional[float]:
+    # STREAMINFO is always the first metadata block: 20 bits of sample rate, then 36 of total samples
+    if len(data) < 26:
+        return None
+    packed = int.from_bytes(bytes(data[18:26]), "big")
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    return total_samples / sample_rate if sample_rate and total_samples else None
+
+
+def compressed_duration_seconds(data: BytesLike) -> Optional[float]:
+    """Duration of a WebM, Ogg Opus or FLAC upload read from its container, without decoding.
+
+    None when the container doesn't say (or isn't one of these), e.g. a
+    WebM with no blocks or a FLAC whose encoder left the sample count out.
+    """
+    container = sniff_container(data)
+    if container == "webm":
+        return _webm_duration_seconds(data)
+    if container == "ogg":
+        return _ogg_opus_duration_seconds(data)
+    if container == "flac":
+        return _flac_duration_seconds(data)
+    return None
+
+
+def prepare_audio(data: BytesLike, target_rate: int = TARGET_SAMPLE_RATE) -> PreparedAudio:
+    started = time.perf_counter()
+    container = sniff_container(data)
+
+    if container == "wav":
+        info = parse_wav_header(data)
+        samples = decode_pcm(data, info) if info is not None else None
+        if samples is not None and len(samples):
+            mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+            bounds = detect_speech_bounds(mono, info.sample_rate)
+            trimmed_ms = 0
+            if bounds is not None:
+                trimmed_ms = int((len(mono) - (bounds[1] - bounds[0])) * 1000 / info.sample_rate)
+                mono = mono[bounds[0]:bounds[1]]
+            out = resample(mono, info.sample_rate, target_rate)
+            pcm = (np.clip(out, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+            prepared = PreparedAudio(
+                content=pcm,
+                container=container,
+                encoding="LINEAR16",
+                sample_rate=min(info.sample_rate, target_rate),
+                trimmed_ms=trimmed_ms,
+            )
+        elif info is not None:
+            # WAV payloads we don't decode (e.g. mu-law); the recognizer reads encoding and rate from the header
+            prepared = PreparedAudio(content=data, container=container, encoding=None, sample_rate=None)
+        else:
+            raise UnsupportedAudio("WAV upload without a readable fmt/data header")
+    elif container == "ogg":
+        prepared = PreparedAudio(content=data, container=container, encoding="OGG_OPUS", sample_rate=_opus_sample_rate(data))
+    elif container == "flac":
+        prepared = PreparedAudio(content=data, container=container, encoding="FLAC", sample_rate=None)
+    elif container == "webm":
+        # WebM/Opus is what MediaRecorder produces
+        prepared = PreparedAudio(content=data, container=container, encoding="WEBM_OPUS", sample_rate=48000)
+    else:
+        raise UnsupportedAudio(f"Unsupported audio container '{container}', expected WAV, WebM, Ogg Opus or FLAC")
+
+    prepared.bytes_in = len(data)
+    prepared.elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        f"Prepared {container} audio for STT as {prepared.encoding}@{prepared.sample_rate}: "
+        f"{prepared.bytes_in} -> {prepared.bytes_out} bytes ({prepared.bytes_saved} saved), "
+        f"trimmed {prepared.trimmed_ms} ms of silence in {prepared.elapsed_ms:.1f} ms"
+    )
+    return prepared
@@ -0,0 +1,95 @@
+import functools
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, Iterable, Tuple
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+LEXICON_VERSION = 1
+VOWELS = frozenset("aeiouy")
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+def syllabify(word: str) -> Tuple[str, ...]:
+    """Basic syllable separation - this could be enhanced with a proper NLP library"""
+    word = word.lower()
+    syllables = []
+    current = ""
+
+    for i, char in enumerate(word):
+        current += char
+        if char in VOWELS and (i == len(word) - 1 or word[i + 1] not in VOWELS):
+            syllables.append(current)
+            current = ""
+        elif char not in VOWELS and current and current[-1] in VOWELS:
+            syllables.append(current)
+            current = char
+
+    if current:
+        if len(syllables) > 0:
+            syllables[-1] += current
+        else:
+            syllables.append(current)
+
+    return tuple(syllables)
+
+
+def extract_words(text: str) -> Iterable[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def load_lexicon(path: str) -> Dict[str, Tuple[str, ...]]:
+    """Load the precomputed lexicon; entries are stored as "syl|la|ble" strings.
+
+    Returns an empty lexicon if the file is missing or from another version,
+    in which case every word goes through the memoized fallback.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        logger.info(f"No syllable lexicon at {path}, syllables will be computed on demand")
+        return {}
+    if data.get("version") != LEXICON_VERSION:
+        logger.warning(f"Ignoring syllable lexicon {path} with version {data.get('version')}")
+        return {}
+
+    entries = {
+        word: tuple(sys.intern(s) for s in split.split("|"))
+        for word, split in data.get("syllables", {}).items()
+    }
+    logger.info(f"Loaded syllable lexicon with {len(entries)} words from {path}")
+    return entries
+
+
+def write_lexicon(path: str, words: Iterable[str]) -> int:
+    entries = {word: "|".join(syllabify(word)) for word in sorted(set(words))}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": LEXICON_VERSION, "syllables": entries}, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return len(entries)
+
+
+_lexicon = load_lexicon(config.LEXICON_PATH)
+
+
+@functools.lru_cache(maxsize=config.LEXICON_CACHE_SIZE)
+def _syllabify_cached(word: str) -> Tuple[str, ...]:
+    return syllabify(word)
+
+
+def get_syllables(word: str) -> Tuple[str, ...]:
+    """Syllables for a lowercased word: a lexicon lookup for known words, memoized otherwise.
+
+    The returned tuple is shared between calls and must not be modified.
+    """
+    syllables = _lexicon.get(word)
+    if syllables is None:
+        syllables = _syllabify_cached(word)
+    return syllables
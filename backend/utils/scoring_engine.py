@@ -0,0 +1,163 @@
+"""Batch string similarity for pronunciation scoring.
+
+Similarity is the normalized indel edit distance, 2 * LCS(a, b) / (len(a) + len(b)),
+the same measure difflib.SequenceMatcher.ratio() approximates (difflib's
+matching heuristic can undercount the LCS, so scores here are equal or
+slightly higher). Both paths use the Allison-Dix bit-parallel LCS with the
+shorter string of each pair on the bit axis. Pairs whose shorter string
+fits in 64 characters are scored together with NumPy, one uint64 word per
+pair and grouped by length; longer pairs use Python's arbitrary-precision
+integers as the bit vector, one pair at a time.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_WORD_BITS = 64
+_EXPECTED_PAD = -1
+_SPOKEN_PAD = -2
+
+
+def _encode(strings: Sequence[str], pad: int) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    width = int(lengths.max()) if len(strings) else 0
+    codes = np.full((len(strings), max(width, 1)), pad, dtype=np.int64)
+    for row, s in enumerate(strings):
+        if s:
+            codes[row, :len(s)] = np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32)
+    return codes, lengths
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    return np.unpackbits(values.view(np.uint8)).reshape(len(values), -1).sum(axis=1)
+
+
+def _lcs_bit_parallel(a: np.ndarray, a_len: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Allison-Dix: bit i of v is cleared once a[i] is part of the running LCS
+    weights = np.left_shift(np.uint64(1), np.arange(a.shape[1], dtype=np.uint64))
+    match_masks = ((a[:, :, None] == b[:, None, :]) * weights[None, :, None]).sum(axis=1, dtype=np.uint64)
+
+    full = np.where(
+        a_len >= _WORD_BITS,
+        np.uint64(0xFFFFFFFFFFFFFFFF),
+        np.left_shift(np.uint64(1), np.minimum(a_len, _WORD_BITS - 1).astype(np.uint64)) - np.uint64(1),
+    )
+    v = full.copy()
+    with np.errstate(over="ignore"):
+        for j in range(b.shape[1]):
+            u = v & match_masks[:, j]
+            v = ((v + u) | (v - u)) & full
+    return a_len - _popcount(v)
+
+
+def _lcs_long(a: str, b: str) -> int:
+    # Same recurrence as _lcs_bit_parallel on one arbitrary-width integer
+    match_masks: Dict[str, int] = {}
+    for i, char in enumerate(a):
+        match_masks[char] = match_masks.get(char, 0) | (1 << i)
+    full = (1 << len(a)) - 1
+    v = full
+    for char in b:
+        u = v & match_masks.get(char, 0)
+        v = ((v + u) | (v - u)) & full
+    return len(a) - bin(v).count("1")
+
+
+def _length_bucket(n: int) -> int:
+    return 1 << max(n - 1, 0).bit_length()
+
+
+def similarity_batch(pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+    """Similarity in [0, 1] for each (expected, spoken) pair, in input order"""
+    if not pairs:
+        return np.zeros(0, dtype=np.float64)
+
+    # LCS is symmetric, so the shorter string of each pair goes on the bit
+    # axis. Short pairs are scored in groups of similar length (rounded up
+    # to a power of two), so one long string only widens its own group.
+    lcs = np.zeros(len(pairs), dtype=np.int64)
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    ordered = []
+    for i, (expected, spoken) in enumerate(pairs):
+        short, long = (expected, spoken) if len(expected) <= len(spoken) else (spoken, expected)
+        ordered.append((short, long))
+        if len(short) > _WORD_BITS:
+            lcs[i] = _lcs_long(short, long)
+        else:
+            groups.setdefault((_length_bucket(len(short)), _length_bucket(len(long))), []).append(i)
+
+    for idx in groups.values():
+        a, a_len = _encode([ordered[i][0] for i in idx], _EXPECTED_PAD)
+        b, _ = _encode([ordered[i][1] for i in idx], _SPOKEN_PAD)
+        lcs[idx] = _lcs_bit_parallel(a, a_len, b)
+
+    total = np.fromiter((len(a) + len(b) for a, b in pairs), dtype=np.int64, count=len(pairs))
+    return np.where(total > 0, 2.0 * lcs / np.maximum(total, 1), 1.0)
+
+
+def similarity(expected: str, spoken: str) -> float:
+    return float(similarity_batch([(expected, spoken)])[0])
+
+
+def score_syllables_batch(pairs: Sequence[Tuple[Sequence[str], Sequence[str]]]) -> List[List[Dict]]:
+    """Syllable-by-syllable feedback for many (expected_syllables, spoken_syllables) pairs.
+
+    All aligned syllable pairs from the whole batch are scored in one call.
+    """
+    flat = []
+    for expected_syllables, spoken_syllables in pairs:
+        for i in range(min(len(expected_syllables), len(spoken_syllables))):
+            flat.append((expected_syllables[i], spoken_syllables[i]))
+    ratios = similarity_batch(flat)
+
+    results = []
+    k = 0
+    for expected_syllables, spoken_syllables in pairs:
+        feedback = []
+        for i, exp_syl in enumerate(expected_syllables):
+            if i < len(spoken_syllables):
+                ratio = ratios[k]
+                k += 1
+                if ratio > 0.8:
+                    status = "good"
+                elif ratio > 0.5:
+                    status = "needs_work"
+                else:
+                    status = "poor"
+                feedback.append({"syllable": exp_syl, "status": status, "score": int(ratio * 100)})
+            else:
+                feedback.append({"syllable": exp_syl, "status": "missing", "score": 0})
+        results.append(feedback)
+    return results
+
+
+def analyze_words_batch(pairs: Sequence[Tuple[Sequence[str], Sequence[str]]]) -> List[List[Dict]]:
+    """phonemeAnalysis entries for many (target_words, transcribed_words) pairs"""
+    flat = []
+    for words_target, words_transcribed in pairs:
+        for i in range(min(len(words_target), len(words_transcribed))):
+            flat.append((words_target[i], words_transcribed[i]))
+    ratios = similarity_batch(flat)
+
+    results = []
+    k = 0
+    for words_target, words_transcribed in pairs:
+        analysis = []
+        for i, target_word in enumerate(words_target):
+            if i < len(words_transcribed):
+                transcribed_word = words_transcribed[i]
+                correct = bool(ratios[k] > 0.8)
+                k += 1
+                analysis.append({
+                    "phoneme": target_word,
+                    "correct": correct,
+                    "feedback": "Good pronunciation" if correct else f"Heard '{transcribed_word}' instead of '{target_word}'"
+                })
+            else:
+                analysis.append({
+                    "phoneme": target_word,
+                    "correct": False,
+                    "feedback": "Word was not detected"
+                })
+        results.append(analysis)
+    return results
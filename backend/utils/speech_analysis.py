@@ -1,92 +1,87 @@
-import difflib
-from typing import Dict, List
-
-def get_syllables(word: str) -> List[str]:
-    """Basic syllable separation - this could be enhanced with a proper NLP library"""
-    vowels = 'aeiouy'
-    word = word.lower()
-    syllables = []
-    current = ""
-    
-    for i, char in enumerate(word):
-        current += char
-        if char in vowels and (i == len(word)-1 or word[i+1] not in vowels):
-            syllables.append(current)
-            current = ""
-        elif char not in vowels and current and current[-1] in vowels:
-            syllables.append(current)
-            current = char
-    
-    if current:
-        if len(syllables) > 0:
-            syllables[-1] += current
-        else:
-            syllables.append(current)
-    
-    return syllables
+from typing import Dict, List, Sequence, Tuple
+from utils.scoring_engine import analyze_words_batch, score_syllables_batch, similarity
+from utils.lexicon import get_syllables
+from core.metrics import SCORING_SECONDS, timed
 
+@timed(SCORING_SECONDS, "compare_words")
 def compare_words(expected: str, spoken: str) -> Dict:
-    expected = expected.lower().strip()
-    spoken = spoken.lower().strip()
+    return compare_words_batch([(expected, spoken)])[0]
 
-    if expected == spoken:
-        return {
-            "status": "perfect",
-            "message": "Perfect! You pronounced it correctly.",
-            "syllable_feedback": [],
-            "score": 100
-        }
+@timed(SCORING_SECONDS, "compare_words_batch")
+def compare_words_batch(pairs: Sequence[Tuple[str, str]]) -> List[Dict]:
+    """compare_words for many (expected, spoken) pairs, scored in one engine call"""
+    normalized = [(expected.lower().strip(), spoken.lower().strip()) for expected, spoken in pairs]
+    to_score = [i for i, (expected, spoken) in enumerate(normalized) if expected != spoken]
+    syllable_feedbacks = score_syllables_batch([
+        (get_syllables(normalized[i][0]), get_syllables(normalized[i][1])) for i in to_score
+    ])
+
+    results = [{
+        "status": "perfect",
+        "message": "Perfect! You pronounced it correctly.",
+        "syllable_feedback": [],
+        "score": 100
+    } for _ in pairs]
 
-    expected_syllables = get_syllables(expected)
-    spoken_syllables = get_syllables(spoken)
-    
-    syllable_feedback = []
-    total_score = 0
-    
-    # Compare each syllable
-    for i, exp_syl in enumerate(expected_syllables):
-        if i < len(spoken_syllables):
-            matcher = difflib.SequenceMatcher(None, exp_syl, spoken_syllables[i])
-            ratio = matcher.ratio()
-            score = int(ratio * 100)
-            total_score += score
-            
-            if ratio > 0.8:
-                status = "good"
-            elif ratio > 0.5:
-                status = "needs_work"
-            else:
-                status = "poor"
-                
-            syllable_feedback.append({
-                "syllable": exp_syl,
-                "status": status,
-                "score": score
-            })
+    for i, syllable_feedback in zip(to_score, syllable_feedbacks):
+        # Calculate final score
+        final_score = sum(item["score"] for item in syllable_feedback) // max(len(syllable_feedback), 1)
+
+        # Generate overall feedback
+        if final_score > 80:
+            status = "good"
+            message = "Very good! Just a few minor improvements needed."
+        elif final_score > 50:
+            status = "needs_work"
+            message = "Keep practicing! Focus on the highlighted syllables."
         else:
-            syllable_feedback.append({
-                "syllable": exp_syl,
-                "status": "missing",
-                "score": 0
-            })
-    
-    # Calculate final score
-    final_score = total_score // len(expected_syllables)
-    
-    # Generate overall feedback
-    if final_score > 80:
-        status = "good"
-        message = "Very good! Just a few minor improvements needed."
-    elif final_score > 50:
-        status = "needs_work"
-        message = "Keep practicing! Focus on the highlighted syllables."
-    else:
-        status = "poor"
-        message = "Let's break this down and practice each syllable."
-        
+            status = "poor"
+            message = "Let's break this down and practice each syllable."
+
+        results[i] = {
+            "status": status,
+            "message": message,
+            "syllable_feedback": syllable_feedback,
+            "score": final_score
+        }
+    return results
+
+
+def get_suggestions(score: int) -> List[str]:
+    if score < 60:
+        return [
+            "Try speaking more slowly and clearly.",
+            "Practice each word individually before saying the full phrase.",
+        ]
+    elif score < 80:
+        return [
+            "Your pronunciation is good, but try to enunciate more clearly.",
+            "Focus on the words that were misheard.",
+        ]
+    return ["Excellent pronunciation! Keep practicing to maintain your skills."]
+
+
+@timed(SCORING_SECONDS, "analyze_words")
+def analyze_words(target_text: str, transcription: str, partial: bool = False) -> List[Dict]:
+    """Word-by-word comparison of a transcript against the target phrase.
+
+    With `partial=True` only the words heard so far are scored, so streaming
+    clients don't see "not detected" for words the speaker hasn't reached yet.
+    """
+    words_target = target_text.lower().split()
+    words_transcribed = transcription.lower().split()
+    if partial:
+        words_target = words_target[:len(words_transcribed)]
+    return analyze_words_batch([(words_target, words_transcribed)])[0]
+
+
+@timed(SCORING_SECONDS, "analyze_transcription")
+def analyze_transcription(target_text: str, transcription: str) -> Dict:
+    """Build the /speech/analyze payload for a transcript"""
+    score = int(similarity(transcription.lower(), target_text.lower()) * 100)
     return {
-        "status": status,
-        "message": message,
-        "syllable_feedback": syllable_feedback,
-        "score": final_score
-    }
\ No newline at end of file
+        "transcription": transcription,
+        "score": score,
+        "phonemeAnalysis": analyze_words(target_text, transcription),
+        "suggestions": get_suggestions(score)
+    }
@@ -0,0 +1,110 @@
+import mmap
+import tempfile
+from contextlib import ExitStack, asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import Request
+
+from core import config
+from utils.audio_preprocess import compressed_duration_seconds, parse_wav_header
+
+# Enough for the RIFF header plus any LIST/fact chunks before `data`
+HEADER_PROBE_BYTES = 4096
+# Size bound for compressed uploads whose container doesn't give a duration:
+# max_seconds at a bitrate well above what speech recorders use
+COMPRESSED_MAX_BITS_PER_SECOND = 256_000
+
+
+class UploadRejected(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _check_wav_duration(head: bytes, received: int, max_seconds: float) -> None:
+    info = parse_wav_header(head)
+    if info is None:
+        return
+    byte_rate = info.channels * info.bits_per_sample // 8 * info.sample_rate
+    if not byte_rate:
+        return
+    # Declared size when the writer filled it in, otherwise what has arrived so far
+    seconds = max(info.declared_data_size, received - info.data_offset) / byte_rate
+    if seconds > max_seconds:
+        raise UploadRejected(413, f"Audio is longer than {max_seconds:g} seconds")
+
+
+def _check_compressed_duration(data: memoryview, max_seconds: float) -> None:
+    seconds = compressed_duration_seconds(data)
+    if seconds is None:
+        # The container doesn't say: bound the size instead
+        seconds = len(data) * 8 / COMPRESSED_MAX_BITS_PER_SECOND
+    if seconds > max_seconds:
+        raise UploadRejected(413, f"Audio is longer than {max_seconds:g} seconds")
+
+
+@asynccontextmanager
+async def receive_audio_upload(
+    request: Request,
+    max_bytes: int = config.SPEECH_UPLOAD_MAX_BYTES,
+    max_seconds: float = config.SPEECH_UPLOAD_MAX_SECONDS,
+    spool_bytes: int = config.SPEECH_UPLOAD_SPOOL_BYTES,
+) -> AsyncIterator[memoryview]:
+    """Read a raw audio request body in chunks and yield it as a memoryview.
+
+    The body is rejected from Content-Length before anything is read, and
+    again as soon as the bytes received (or, for WAV, the duration declared
+    in the header) go over the limits. Other containers are checked once
+    the body is in, against the duration their container records (or a
+    size bound when it records none). Uploads up to `spool_bytes` are read
+    into memory; larger ones spill to a temp file that is memory-mapped, so
+    a big upload is never copied into the Python heap.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise UploadRejected(413, f"Audio upload exceeds {max_bytes} bytes")
+
+    with ExitStack() as cleanup:
+        # Unwound in reverse, each step running even if an earlier one fails
+        spool = cleanup.enter_context(tempfile.SpooledTemporaryFile(max_size=spool_bytes))
+        received = 0
+        head = b""
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            received += len(chunk)
+            if received > max_bytes:
+                raise UploadRejected(413, f"Audio upload exceeds {max_bytes} bytes")
+            if len(head) < HEADER_PROBE_BYTES:
+                head += chunk[:HEADER_PROBE_BYTES - len(head)]
+            if head[:4] == b"RIFF":
+                _check_wav_duration(head, received, max_seconds)
+            spool.write(chunk)
+
+        if received == 0:
+            raise UploadRejected(400, "Empty audio upload")
+
+        if spool.tell() > spool_bytes:
+            # Already on disk past max_size; rollover() just makes sure
+            spool.rollover()
+            spool.flush()
+            mapped = mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+            cleanup.callback(_release, mapped.close)
+            view = memoryview(mapped)
+        else:
+            # At most spool_bytes, so this copy is small
+            spool.seek(0)
+            view = memoryview(spool.read())
+        cleanup.callback(_release, view.release)
+        if head[:4] != b"RIFF":
+            _check_compressed_duration(view, max_seconds)
+        yield view
+
+
+def _release(close) -> None:
+    try:
+        close()
+    except BufferError:
+        # A caller still holds a slice of the buffer; it is freed with the last reference
+        pass